@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Load the CompanyInfo snapshot as each worker starts rather than on its
+# first request
+from core.models import CompanyInfo  # noqa: E402
+
+CompanyInfo.prewarm()
@@ -1,15 +1,80 @@
-from django.contrib import admin
-from .models import Service, Portfolio, Testimonial, Contact, CompanyInfo, TeamMember
+from django.contrib import admin, messages
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections
+from django.utils import timezone
+from .cache import bump_version
+from .models import Service, Portfolio, Testimonial, Contact, CompanyInfo, TeamMember, Technology
+from .models import ArchivedContact, BackgroundJob, update_contact_status
+from .ordering import OrderingError, apply_order
+from .pagination import EstimatedCountPaginator
+from .snapshots import schedule_refresh
+
+
+class ReorderAdminMixin:
+    """
+    "Move to top/bottom" actions that renumber `order` for the whole table
+    with one bulk update (see core/ordering.py), instead of editing and
+    saving rows one by one. Add them to the admin's `actions`.
+    """
+    
+    def move_selected(self, request, queryset, to_top):
+        selected = list(queryset.order_by('order', 'pk').values_list('pk', flat=True))
+        others = (
+            self.model.objects.exclude(pk__in=selected).order_by('order', 'pk').values_list('pk', flat=True)
+        )
+        ids = selected + list(others) if to_top else list(others) + selected
+        try:
+            updated = apply_order(self.model, ids)
+        except OrderingError as exc:
+            # Rows added or deleted meanwhile
+            self.message_user(request, f'Not moved ({exc}); please try again.', messages.ERROR)
+            return
+        self.message_user(request, f'{len(selected)} item(s) moved, {updated} renumbered.')
+    
+    @admin.action(description='Move selected to the top')
+    def move_to_top(self, request, queryset):
+        self.move_selected(request, queryset, to_top=True)
+    
+    @admin.action(description='Move selected to the bottom')
+    def move_to_bottom(self, request, queryset):
+        self.move_selected(request, queryset, to_top=False)
+
+
+class LargeTableAdminMixin:
+    """
+    Changelist settings for tables that grow to hundreds of thousands of
+    rows: no unfiltered COUNT(*), estimated counts for big results, and
+    search on the model's GIN indexed `search_vector` on PostgreSQL
+    (maintained by a trigger, see migration 0013) instead of `icontains`
+    over every search field. Other databases keep Django's default search.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_config = 'english'
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or connections[queryset.db].vendor != 'postgresql':
+            return super().get_search_results(request, queryset, search_term)
+        query = SearchQuery(search_term, config=self.search_config, search_type='websearch')
+        return queryset.filter(search_vector=query), False
+
+
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug']
+    search_fields = ['name']
+    prepopulated_fields = {'slug': ('name',)}
 
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(ReorderAdminMixin, admin.ModelAdmin):
     list_display = ['title', 'order', 'is_active', 'pricing_info', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['title', 'short_description', 'technologies']
     prepopulated_fields = {'slug': ('title',)}
     list_editable = ['order', 'is_active']
     ordering = ['order', 'title']
+    actions = ['move_to_top', 'move_to_bottom']
     
     fieldsets = (
         ('Basic Information', {
@@ -25,7 +90,7 @@ class ServiceAdmin(admin.ModelAdmin):
 
 
 @admin.register(Portfolio)
-class PortfolioAdmin(admin.ModelAdmin):
+class PortfolioAdmin(ReorderAdminMixin, admin.ModelAdmin):
     list_display = ['title', 'client_company', 'status', 'project_date', 'featured', 'order', 'is_active']
     list_filter = ['status', 'featured', 'is_active', 'project_date']
     search_fields = ['title', 'client_name', 'client_company', 'technologies']
@@ -33,6 +98,7 @@ class PortfolioAdmin(admin.ModelAdmin):
     list_editable = ['featured', 'order', 'is_active']
     date_hierarchy = 'project_date'
     ordering = ['-featured', 'order', '-project_date']
+    actions = ['move_to_top', 'move_to_bottom']
     
     fieldsets = (
         ('Basic Information', {
@@ -54,12 +120,16 @@ class PortfolioAdmin(admin.ModelAdmin):
 
 
 @admin.register(Testimonial)
-class TestimonialAdmin(admin.ModelAdmin):
-    list_display = ['client_name', 'client_company', 'rating', 'source', 'featured', 'order', 'is_active']
+class TestimonialAdmin(LargeTableAdminMixin, ReorderAdminMixin, admin.ModelAdmin):
+    list_display = [
+        'client_name', 'client_company', 'project', 'rating', 'source', 'featured', 'order', 'is_active'
+    ]
+    list_select_related = ['project']
     list_filter = ['rating', 'source', 'featured', 'is_active', 'created_at']
     search_fields = ['client_name', 'client_company', 'review']
     list_editable = ['featured', 'order', 'is_active']
     ordering = ['-featured', 'order', '-created_at']
+    actions = ['show_on_site', 'hide_from_site', 'move_to_top', 'move_to_bottom']
     
     fieldsets = (
         ('Client Information', {
@@ -75,17 +145,34 @@ class TestimonialAdmin(admin.ModelAdmin):
             'fields': ('featured', 'order', 'is_active')
         }),
     )
+    
+    def set_active(self, request, queryset, is_active):
+        # One UPDATE; it sends no signals, so invalidate here
+        updated = queryset.exclude(is_active=is_active).update(is_active=is_active, updated_at=timezone.now())
+        if updated:
+            bump_version(Testimonial)
+            schedule_refresh(Testimonial)
+        self.message_user(request, f'{updated} testimonial(s) updated.')
+    
+    @admin.action(description='Show selected testimonials on the site')
+    def show_on_site(self, request, queryset):
+        self.set_active(request, queryset, True)
+    
+    @admin.action(description='Hide selected testimonials from the site')
+    def hide_from_site(self, request, queryset):
+        self.set_active(request, queryset, False)
 
 
 @admin.register(Contact)
-class ContactAdmin(admin.ModelAdmin):
+class ContactAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'company', 'inquiry_type', 'status', 'submitted_at']
+    # The date filter's fixed ranges are cheap, unlike date_hierarchy, which
+    # reads the distinct years/months of the whole table on every page
     list_filter = ['inquiry_type', 'status', 'submitted_at']
     search_fields = ['name', 'email', 'company', 'subject', 'message']
-    list_editable = ['status']
     readonly_fields = ['submitted_at', 'updated_at']
-    date_hierarchy = 'submitted_at'
     ordering = ['-submitted_at']
+    actions = ['mark_in_progress', 'mark_responded', 'mark_closed']
     
     fieldsets = (
         ('Contact Information', {
@@ -102,6 +189,37 @@ class ContactAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         # Prevent adding contacts from admin (they come from frontend)
         return False
+    
+    def set_status(self, request, queryset, status):
+        updated = update_contact_status(queryset, status)
+        self.message_user(request, f'{updated} submission(s) marked as {status.replace("_", " ")}.')
+    
+    @admin.action(description='Mark selected submissions as in progress')
+    def mark_in_progress(self, request, queryset):
+        self.set_status(request, queryset, 'in_progress')
+    
+    @admin.action(description='Mark selected submissions as responded')
+    def mark_responded(self, request, queryset):
+        self.set_status(request, queryset, 'responded')
+    
+    @admin.action(description='Mark selected submissions as closed')
+    def mark_closed(self, request, queryset):
+        self.set_status(request, queryset, 'closed')
+
+
+@admin.register(ArchivedContact)
+class ArchivedContactAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ['name', 'email', 'company', 'inquiry_type', 'status', 'submitted_at', 'archived_at']
+    list_filter = ['inquiry_type', 'status']
+    search_fields = ['name', 'email', 'company', 'subject', 'message']
+    ordering = ['-submitted_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        # Archived submissions are kept as they were (see core/archive.py)
+        return False
 
 
 @admin.register(CompanyInfo)
@@ -137,12 +255,13 @@ class CompanyInfoAdmin(admin.ModelAdmin):
 
 
 @admin.register(TeamMember)
-class TeamMemberAdmin(admin.ModelAdmin):
+class TeamMemberAdmin(ReorderAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'position', 'order', 'is_active']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'position', 'bio', 'skills']
     list_editable = ['order', 'is_active']
     ordering = ['order', 'name']
+    actions = ['move_to_top', 'move_to_bottom']
     
     fieldsets = (
         ('Basic Information', {
@@ -157,6 +276,23 @@ class TeamMemberAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_after', 'updated_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['attempts', 'locked_at', 'last_error', 'created_at', 'updated_at']
+    actions = ['retry_jobs']
+    
+    @admin.action(description='Retry selected dead jobs now')
+    def retry_jobs(self, request, queryset):
+        # Only the ones that ran out of attempts: running jobs are in
+        # progress, and retrying a succeeded one would send its emails again
+        updated = queryset.filter(status='dead').update(
+            status='pending', attempts=0, run_after=timezone.now(), locked_at=None
+        )
+        self.message_user(request, f'{updated} dead job(s) queued for retry.')
+
+
 # Customize admin site
 admin.site.site_header = "Software Company Admin"
 admin.site.site_title = "Admin Portal"
@@ -0,0 +1,90 @@
+"""
+Archiving of old contact submissions.
+
+Closed and responded submissions older than CONTACT_ARCHIVE_AFTER_DAYS are
+moved from Contact to ArchivedContact, so the inbox (ContactViewSet, the
+admin changelist) only ever works on recent and open submissions. Archived
+rows keep their id and timestamps and stay searchable through
+/api/contact-archive/.
+
+Rows are moved in batches, each copied and deleted in its own transaction,
+so an interrupted run loses nothing and the next run simply continues with
+what is left. On PostgreSQL each batch locks its rows with SKIP LOCKED, so
+two runs (or a run and an admin editing a contact) don't block each other.
+The deletes bypass model signals: the daily rollups in ContactDailyStat
+count submissions received, and archiving doesn't change those.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import ArchivedContact, Contact
+
+COPIED_FIELDS = [field.attname for field in Contact._meta.concrete_fields]
+
+
+def archivable_contacts(older_than_days=None, statuses=None, now=None):
+    """Contacts due to be archived"""
+    if older_than_days is None:
+        older_than_days = settings.CONTACT_ARCHIVE_AFTER_DAYS
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    return Contact.objects.filter(
+        status__in=statuses or settings.CONTACT_ARCHIVE_STATUSES, submitted_at__lt=cutoff
+    )
+
+
+def archive_batch(queryset, batch_size):
+    """Move up to `batch_size` rows of `queryset` to the archive; returns the count"""
+    with transaction.atomic():
+        ids = list(
+            queryset.order_by('submitted_at', 'id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        moved = Contact.objects.filter(pk__in=ids)
+        # Copied with INSERT ... SELECT; building model instances for the
+        # rows would take most of the time
+        select, params = moved.values_list(*COPIED_FIELDS).query.sql_with_params()
+        quote = connection.ops.quote_name
+        columns = ', '.join(
+            quote(ArchivedContact._meta.get_field(name).column) for name in [*COPIED_FIELDS, 'archived_at']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote(ArchivedContact._meta.db_table)} ({columns}) '
+                f'SELECT moved.*, %s FROM ({select}) moved',
+                [connection.ops.adapt_datetimefield_value(timezone.now()), *params]
+            )
+        # A plain DELETE, without loading the rows for signals
+        moved._raw_delete(moved.db)
+    return len(ids)
+
+
+def archive_contacts(older_than_days=None, statuses=None, batch_size=1000, max_batches=None,
+                     pause=0, log=None):
+    """Archive every archivable contact (or `max_batches` batches); returns the count"""
+    queryset = archivable_contacts(older_than_days, statuses)
+    archived = batches = 0
+    start = time.perf_counter()
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(queryset, batch_size)
+        if not count:
+            break
+        archived += count
+        batches += 1
+        if log:
+            elapsed = time.perf_counter() - start
+            log(f'Batch {batches}: {archived} archived ({archived / elapsed:.0f} rows/s)')
+        if pause:
+            # Leave the database some room between batches
+            time.sleep(pause)
+    if archived:
+        bump_version(Contact)
+        bump_version(ArchivedContact)
+    return archived
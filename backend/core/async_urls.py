@@ -0,0 +1,39 @@
+"""
+URL patterns for the async read-only endpoints (see core/async_views.py).
+
+Mirrors the GET routes of the router in core/urls.py, which places these
+in front of the sync routes when ASYNC_READ_API is enabled.
+"""
+from django.urls import path, re_path
+
+from .async_views import AsyncCompanyInfoView, AsyncHomeView, AsyncReadView
+from .views import (
+    ServiceViewSet, PortfolioViewSet, TestimonialViewSet, CompanyInfoViewSet,
+    TeamMemberViewSet, JobOpeningViewSet, BlogPostViewSet
+)
+
+
+def viewset_urls(prefix, viewset_class, basename, featured=False, view_class=AsyncReadView):
+    def view(action):
+        return view_class.as_view(viewset_class=viewset_class, basename=basename, action=action)
+
+    # Named like the router's routes, so metrics and reverse() don't depend
+    # on which of the two served the request
+    lookup = viewset_class.lookup_url_kwarg or viewset_class.lookup_field
+    patterns = [re_path(rf'^{prefix}/$', view('list'), name=f'{basename}-list')]
+    if featured:
+        patterns.append(re_path(rf'^{prefix}/featured/$', view('featured'), name=f'{basename}-featured'))
+    patterns.append(re_path(rf'^{prefix}/(?P<{lookup}>[^/.]+)/$', view('retrieve'), name=f'{basename}-detail'))
+    return patterns
+
+
+urlpatterns = [
+    path('home/', AsyncHomeView.as_view(), name='home'),
+    *viewset_urls('services', ServiceViewSet, 'service'),
+    *viewset_urls('portfolio', PortfolioViewSet, 'portfolio', featured=True),
+    *viewset_urls('testimonials', TestimonialViewSet, 'testimonial', featured=True),
+    *viewset_urls('company-info', CompanyInfoViewSet, 'company-info', view_class=AsyncCompanyInfoView),
+    *viewset_urls('team', TeamMemberViewSet, 'team'),
+    *viewset_urls('jobs', JobOpeningViewSet, 'job'),
+    *viewset_urls('posts', BlogPostViewSet, 'post'),
+]
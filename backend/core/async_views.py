@@ -0,0 +1,174 @@
+"""
+Async (ASGI) versions of the read-only API endpoints.
+
+DRF has no async views, so these are plain Django async views that reuse
+the configuration of the matching DRF viewset - queryset, filter backends,
+pagination, serializers, cache models and validators - but evaluate every
+queryset with the async ORM. Under an ASGI server one process can then keep
+many requests waiting on the database at once instead of pinning a sync
+worker per request. Responses and cache entries are identical to the sync
+views; core/async_urls.py routes them in place of the sync endpoints when
+ASYNC_READ_API is enabled.
+"""
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from .cache import (
+    HITS_KEY, MISSES_KEY, _aincrement, aget_versions, build_cache_key, get_cache, get_timeout
+)
+from .metrics import TimedJSONRenderer
+from .models import CompanyInfo
+from .views import HomeView
+
+
+class AsyncReadView(View):
+    """
+    Async GET for one action (`list`, `retrieve` or `featured`) of a
+    read-only viewset registered with the router as `basename`.
+    """
+    viewset_class = None
+    basename = None
+    action = 'list'
+    http_method_names = ['get', 'head', 'options']
+    renderer = TimedJSONRenderer()
+
+    def get_viewset(self, request, kwargs):
+        viewset = self.viewset_class(
+            basename=self.basename, action=self.action, args=(), kwargs=kwargs, format_kwarg=None
+        )
+        viewset.request = Request(request)
+        viewset.headers = {}
+        return viewset
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            self.renderer.render(data), status=status, content_type='application/json'
+        )
+
+    async def get(self, request, **kwargs):
+        viewset = self.get_viewset(request, kwargs)
+        try:
+            if hasattr(viewset, 'get_cache_models'):
+                return await self.get_cached_response(viewset, viewset.request)
+            return self.render(await self.get_data(viewset))
+        except Http404 as exc:
+            return self.handle_exception(exceptions.NotFound(*exc.args))
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    def handle_exception(self, exc):
+        # Same body as DRF's default exception handler
+        if isinstance(exc.detail, (list, dict)):
+            return self.render(exc.detail, exc.status_code)
+        return self.render({'detail': exc.detail}, exc.status_code)
+
+    async def get_cached_response(self, viewset, request):
+        """Async counterpart of core.cache.cache_response"""
+        cache = get_cache()
+        versions = await aget_versions(viewset.get_cache_models())
+        key = build_cache_key(request, f'{self.basename}.{self.action}', versions)
+        entry = await cache.aget(key)
+        if entry is not None:
+            await _aincrement(HITS_KEY)
+            data, validators = entry
+            response = None
+            if validators is not None:
+                response = validators.not_modified(request)
+            if response is None:
+                response = self.render(data)
+                if validators is not None:
+                    validators.apply(response)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        await _aincrement(MISSES_KEY)
+        validators = await self.get_validators(viewset, request, versions)
+        if validators is not None:
+            response = validators.not_modified(request)
+            if response is not None:
+                return response
+
+        data = await self.get_data(viewset)
+        await cache.aset(key, (data, validators), get_timeout())
+        response = self.render(data)
+        if validators is not None:
+            validators.apply(response)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    async def get_validators(self, viewset, request, versions):
+        return await viewset.aget_validators(request, *versions)
+
+    async def get_data(self, viewset):
+        return await getattr(self, f'{self.action}_data')(viewset)
+
+    async def list_data(self, viewset):
+        request = viewset.request
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        paginator = viewset.paginator
+        page = None
+        if paginator is not None:
+            page = await paginator.apaginate_queryset(queryset, request, view=viewset)
+        if page is None:
+            data = viewset.get_serializer([obj async for obj in queryset], many=True).data
+        else:
+            data = paginator.get_paginated_response(viewset.get_serializer(page, many=True).data).data
+        if hasattr(viewset, 'get_technology_facet_queryset'):
+            data['facets'] = {
+                'tech': [row async for row in viewset.get_technology_facet_queryset(request)]
+            }
+        return data
+
+    async def retrieve_data(self, viewset):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        lookup = {viewset.lookup_field: viewset.kwargs[lookup_url_kwarg]}
+        try:
+            instance = await queryset.aget(**lookup)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        return viewset.get_serializer(instance).data
+
+    async def featured_data(self, viewset):
+        items = [obj async for obj in viewset.get_featured_queryset()]
+        return viewset.featured_serializer_class(items, many=True).data
+
+
+class AsyncCompanyInfoView(AsyncReadView):
+    """Async counterpart of CompanyInfoViewSet.list"""
+
+    async def get(self, request, **kwargs):
+        if self.action != 'list':
+            return await super().get(request, **kwargs)
+        viewset = self.get_viewset(request, kwargs)
+        data = await self.list_data(viewset)
+        validators = viewset.get_validators(viewset.request, data)
+        return validators.not_modified(viewset.request) or validators.apply(self.render(data))
+
+    async def list_data(self, viewset):
+        return viewset.get_serializer(await CompanyInfo.aload()).data
+
+
+class AsyncHomeView(AsyncReadView):
+    """Async counterpart of HomeView"""
+    viewset_class = HomeView
+    basename = 'home'
+    action = 'get'
+
+    def get_viewset(self, request, kwargs):
+        view = self.viewset_class()
+        view.request = Request(request)
+        return view
+
+    async def get_validators(self, viewset, request, versions):
+        # Built from the cache versions alone; no query involved
+        return viewset.get_validators(request, *versions)
+
+    async def get_data(self, viewset):
+        sections = {}
+        for name, queryset in viewset.get_section_querysets().items():
+            sections[name] = [obj async for obj in queryset]
+        return viewset.serialize(viewset.request, await CompanyInfo.aload(), sections)
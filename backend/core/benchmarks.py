@@ -0,0 +1,431 @@
+"""
+Repeatable benchmarks for the API.
+
+`seed_benchmark_data` fills the database with a synthetic dataset of a given
+scale using bulk inserts; `benchmark_api` requests every route registered in
+core/urls.py against it and records throughput, latency percentiles and
+query counts as JSON, so runs from two commits can be compared.
+
+Synthetic rows are recognisable (slugs starting with SEED_PREFIX, titles
+and names starting with SEED_TITLE_PREFIX, contacts at SEED_EMAIL_DOMAIN) and
+are replaced on every seed, or removed with `seed_benchmark_data --flush`,
+without touching real content. They are inserted and deleted without model
+signals, so the cache versions, technology counts and search index are
+refreshed once at the end.
+
+The commands that write (seeding, the temporary staff user) refuse to run
+unless DEBUG is on or --allow-non-debug is given, as DATABASE_URL otherwise
+most likely points at production.
+"""
+import random
+import subprocess
+import time
+from datetime import date, timedelta
+from statistics import mean, median
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import (
+    ArchivedContact, BlogPost, Contact, ContactDailyStat, JobOpening, Portfolio, Service, TeamMember,
+    Technology, Testimonial, technology_slug
+)
+from .search import search_index
+
+SEED_PREFIX = 'bench-'
+SEED_TITLE_PREFIX = '[bench] '
+SEED_EMAIL_DOMAIN = 'bench.example.com'
+SEED_USERNAME = 'bench-admin'
+
+# Rows per model for each --scale
+SCALES = {
+    'tiny': {
+        'services': 5, 'portfolio': 10, 'testimonials': 20, 'posts': 20,
+        'jobs': 5, 'team': 5, 'contacts': 50,
+    },
+    'small': {
+        'services': 20, 'portfolio': 200, 'testimonials': 400, 'posts': 500,
+        'jobs': 50, 'team': 20, 'contacts': 10_000,
+    },
+    'large': {
+        'services': 100, 'portfolio': 5_000, 'testimonials': 10_000, 'posts': 10_000,
+        'jobs': 500, 'team': 100, 'contacts': 1_000_000,
+    },
+}
+
+TECHNOLOGIES = [
+    'Django', 'React', 'PostgreSQL', 'Redis', 'Docker', 'Kubernetes', 'TypeScript',
+    'Python', 'Go', 'AWS', 'Flutter', 'Next.js', 'Tailwind CSS', 'GraphQL',
+]
+WORDS = (
+    'api app build cache client cloud code data deploy design django fast team '
+    'feature frontend launch mobile model product query react release scale '
+    'search secure server service ship speed stack test user web workflow'
+).split()
+
+
+class BenchmarkError(Exception):
+    """The benchmarks would write to a database that may not be disposable"""
+
+
+def check_database(allow_non_debug=False):
+    """Refuse to seed or create users outside development unless told to"""
+    if not (settings.DEBUG or allow_non_debug):
+        raise BenchmarkError(
+            'DEBUG is off, so this may be the production database. Point DATABASE_URL '
+            'at a separate database and set DEBUG=True, or pass --allow-non-debug.'
+        )
+
+
+class DatasetSeeder:
+    """Replace the synthetic rows with `counts` new ones"""
+
+    def __init__(self, counts, batch_size=2000, seed=0, log=None):
+        self.counts = counts
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+    def text(self, words):
+        return ' '.join(self.random.choices(WORDS, k=words)).capitalize() + '.'
+
+    def technologies(self):
+        return self.random.sample(TECHNOLOGIES, self.random.randint(2, 5))
+
+    def insert(self, model, objects):
+        """bulk_create `objects` (any iterable) in batches and return them"""
+        created = []
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created += model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            created += model.objects.bulk_create(batch)
+        self.log(f'{model._meta.verbose_name_plural}: {len(created)}')
+        return created
+
+    def insert_quietly(self, model, objects):
+        """Like insert(), without keeping the objects (for large tables)"""
+        count = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+        count += len(batch)
+        self.log(f'{model._meta.verbose_name_plural}: {count}')
+
+    def flush(self):
+        """Delete the synthetic rows left by a previous seed"""
+        querysets = [
+            Testimonial.objects.filter(project__slug__startswith=SEED_PREFIX),
+            Service.technology_tags.through.objects.filter(service__slug__startswith=SEED_PREFIX),
+            Portfolio.technology_tags.through.objects.filter(portfolio__slug__startswith=SEED_PREFIX),
+            Service.objects.filter(slug__startswith=SEED_PREFIX),
+            Portfolio.objects.filter(slug__startswith=SEED_PREFIX),
+            BlogPost.objects.filter(slug__startswith=SEED_PREFIX),
+            JobOpening.objects.filter(slug__startswith=SEED_PREFIX),
+            TeamMember.objects.filter(name__startswith=SEED_PREFIX),
+            Contact.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}'),
+            ArchivedContact.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}'),
+        ]
+        for queryset in querysets:
+            # A plain DELETE; Model.delete() would load every row to send
+            # signals, which is far too slow for a million contacts
+            queryset._raw_delete(queryset.db)
+
+    def seed(self):
+        self.flush()
+        tags = {tag.slug: tag for tag in Technology.from_names(TECHNOLOGIES)}
+
+        services = self.insert(Service, self.build_services())
+        self.tag(Service, 'service', services, tags)
+        portfolio = self.insert(Portfolio, self.build_portfolio())
+        self.tag(Portfolio, 'portfolio', portfolio, tags)
+        self.insert_quietly(Testimonial, self.build_testimonials(portfolio))
+        self.insert_quietly(BlogPost, self.build_posts())
+        self.insert_quietly(JobOpening, self.build_jobs())
+        self.insert_quietly(TeamMember, self.build_team())
+        self.insert_quietly(Contact, self.build_contacts())
+        # bulk_create skips the signals that maintain the rollups
+        ContactDailyStat.rebuild()
+
+        self.changed([tag.id for tag in tags.values()])
+
+    def changed(self, tag_ids):
+        Technology.refresh_counts(tag_ids)
+        for model in (Service, Portfolio, Testimonial, BlogPost, JobOpening, TeamMember, Contact, Technology):
+            bump_version(model)
+
+    def tag(self, model, name, objects, tags):
+        through = model.technology_tags.through
+        self.insert_quietly(through, (
+            through(**{f'{name}_id': obj.pk, 'technology_id': tags[technology_slug(tech)].pk})
+            for obj in objects
+            for tech in obj.technologies_list
+        ))
+
+    def build_services(self):
+        for i in range(self.counts['services']):
+            technologies = self.technologies()
+            steps = [self.text(4) for _ in range(5)]
+            yield Service(
+                title=f'{SEED_TITLE_PREFIX}Service {i}', slug=f'{SEED_PREFIX}service-{i}',
+                short_description=self.text(20), full_description=self.text(300),
+                icon='fas fa-code', technologies=', '.join(technologies),
+                technologies_list=technologies, process_steps='\n'.join(steps),
+                process_steps_list=steps, pricing_info='From $1,000', order=i,
+            )
+
+    def build_portfolio(self):
+        today = date.today()
+        for i in range(self.counts['portfolio']):
+            technologies = self.technologies()
+            yield Portfolio(
+                title=f'{SEED_TITLE_PREFIX}Project {i}', slug=f'{SEED_PREFIX}project-{i}',
+                client_name='Client', client_company=f'Company {i}',
+                short_description=self.text(20), challenge=self.text(120),
+                solution=self.text(120), result=self.text(80),
+                thumbnail='portfolio/thumbnails/project.jpg',
+                technologies=', '.join(technologies), technologies_list=technologies,
+                project_date=today - timedelta(days=i), featured=i < 6, order=i,
+            )
+
+    def build_testimonials(self, portfolio):
+        for i in range(self.counts['testimonials'] if portfolio else 0):
+            yield Testimonial(
+                client_name=f'{SEED_TITLE_PREFIX}Client {i}', client_position='CEO', client_company=f'Company {i}',
+                review=self.text(60), rating=self.random.randint(3, 5),
+                project_id=portfolio[i % len(portfolio)].pk, featured=i < 6, order=i,
+            )
+
+    def build_posts(self):
+        now = timezone.now()
+        for i in range(self.counts['posts']):
+            yield BlogPost(
+                title=f'{SEED_TITLE_PREFIX}Post {i}', slug=f'{SEED_PREFIX}post-{i}',
+                excerpt=self.text(30) if i % 2 else '', content=self.text(800),
+                author='TeamError', category=self.random.choice(['Engineering', 'Design', 'News']),
+                published_at=now - timedelta(hours=i), is_published=True, read_time='4 min',
+            )
+
+    def build_jobs(self):
+        for i in range(self.counts['jobs']):
+            requirements = [self.text(6) for _ in range(6)]
+            benefits = [self.text(4) for _ in range(4)]
+            yield JobOpening(
+                title=f'{SEED_TITLE_PREFIX}Job {i}', slug=f'{SEED_PREFIX}job-{i}', department='Engineering',
+                location='Remote', employment_type='Full-time', description=self.text(250),
+                requirements='\n'.join(requirements), requirements_list=requirements,
+                benefits='\n'.join(benefits), benefits_list=benefits,
+            )
+
+    def build_team(self):
+        for i in range(self.counts['team']):
+            skills = self.technologies()
+            yield TeamMember(
+                name=f'{SEED_PREFIX}member-{i}', position='Engineer', bio=self.text(40),
+                photo='team/member.jpg', skills=', '.join(skills), skills_list=skills, order=i,
+            )
+
+    def build_contacts(self):
+        inquiry_types = [choice for choice, label in Contact.INQUIRY_TYPE]
+        for i in range(self.counts['contacts']):
+            yield Contact(
+                name=f'{SEED_TITLE_PREFIX}Contact {i}', email=f'contact-{i}@{SEED_EMAIL_DOMAIN}',
+                inquiry_type=inquiry_types[i % len(inquiry_types)],
+                subject=self.text(5), message=self.text(40),
+            )
+
+
+def seed_dataset(counts, batch_size=2000, seed=0, rebuild_search_index=True, log=None):
+    DatasetSeeder(counts, batch_size, seed, log).seed()
+    if rebuild_search_index:
+        search_index.rebuild()
+
+
+def flush_dataset(rebuild_search_index=True):
+    """Delete the synthetic rows"""
+    seeder = DatasetSeeder({})
+    tag_ids = list(Technology.objects.values_list('id', flat=True))
+    seeder.flush()
+    ContactDailyStat.rebuild()
+    seeder.changed(tag_ids)
+    if rebuild_search_index:
+        search_index.rebuild()
+
+
+# Extra cases benchmarked besides the plain list/detail/featured routes:
+# route name -> query string
+ROUTE_QUERIES = {
+    'search': 'q=django',
+}
+EXTRA_CASES = [
+    ('portfolio-list?tech', 'portfolio-list', 'tech=django'),
+    ('post-list?search', 'post-list', 'search=release'),
+]
+
+
+def get_routes():
+    """(name, path) for every GET route in core/urls.py"""
+    from .urls import router, urlpatterns
+
+    routes = []
+    for pattern in urlpatterns:
+        name = getattr(pattern, 'name', None)
+        if name:
+            query = ROUTE_QUERIES.get(name)
+            routes.append((name, reverse(name) + (f'?{query}' if query else '')))
+
+    for prefix, viewset, basename in router.registry:
+        routes.append((f'{basename}-list', reverse(f'{basename}-list')))
+        for action in viewset.get_extra_actions():
+            if not action.detail and 'get' in action.mapping:
+                name = f'{basename}-{action.url_name}'
+                routes.append((name, reverse(name)))
+        lookup_field = viewset.lookup_field
+        value = viewset.queryset.order_by('pk').values_list(lookup_field, flat=True).first()
+        if value is not None:
+            kwargs = {viewset.lookup_url_kwarg or lookup_field: value}
+            routes.append((f'{basename}-detail', reverse(f'{basename}-detail', kwargs=kwargs)))
+
+    for name, route, query in EXTRA_CASES:
+        routes.append((name, f'{reverse(route)}?{query}'))
+    return routes
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile"""
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, round(len(values) * percent / 100) - 1))]
+
+
+def get_staff_client(host):
+    """A client logged in as SEED_USERNAME; remove it with delete_staff_user()"""
+    user, created = get_user_model().objects.get_or_create(
+        username=SEED_USERNAME, defaults={'is_staff': True, 'is_superuser': True}
+    )
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+    return client
+
+
+def delete_staff_user():
+    get_user_model().objects.filter(username=SEED_USERNAME).delete()
+
+
+def measure(client, path, requests, warmup=3):
+    for _ in range(warmup):
+        response = client.get(path)
+    timings = []
+    queries = []
+    cache_hits = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            request_start = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - request_start) * 1000)
+        queries.append(len(captured))
+        cache_hits += response.get('X-Cache') == 'HIT'
+    elapsed = time.perf_counter() - start
+    return {
+        'path': path,
+        'status': response.status_code,
+        'requests': requests,
+        'throughput': round(requests / elapsed, 2),
+        'mean_ms': round(mean(timings), 3),
+        'p50_ms': round(median(timings), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(max(timings), 3),
+        'bytes': len(response.content),
+        'queries': max(queries),
+        'cache_hits': cache_hits,
+    }
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(requests=50, routes=None, host='testserver', log=None):
+    """Benchmark `routes` (default: get_routes()) and return the results"""
+    log = log or (lambda message: None)
+    client = Client(HTTP_HOST=host)
+    staff_client = None
+    results = {}
+    try:
+        for name, path in routes or get_routes():
+            result = measure(client, path, requests)
+            if result['status'] in (401, 403):
+                # Staff-only route
+                staff_client = staff_client or get_staff_client(host)
+                result = measure(staff_client, path, requests)
+            results[name] = result
+            log(
+                f"{name:<28} {result['status']} {result['throughput']:>8.1f} req/s "
+                f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms queries={result['queries']}"
+            )
+    finally:
+        if staff_client:
+            delete_staff_user()
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'commit': get_git_commit(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'requests': requests,
+            'dataset': {
+                model._meta.label: model.objects.count()
+                for model in (
+                    Service, Portfolio, Testimonial, BlogPost, JobOpening, TeamMember, Contact, ArchivedContact
+                )
+            },
+        },
+        'routes': results,
+    }
+
+
+def compare_results(previous, current, threshold=0.2):
+    """
+    Lines describing the change of every route present in both runs, and
+    whether any p50 latency grew by more than `threshold` or any query
+    count grew at all
+    """
+    lines = []
+    regressed = False
+    if previous['meta'].get('dataset') != current['meta'].get('dataset'):
+        lines.append('Warning: the runs used different datasets; reseed with the same scale')
+    for name, result in current['routes'].items():
+        before = previous['routes'].get(name)
+        if before is None:
+            continue
+        change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] if before['p50_ms'] else 0
+        slower = change > threshold
+        more_queries = result['queries'] > before['queries']
+        regressed = regressed or slower or more_queries
+        lines.append(
+            f"{name:<28} p50 {before['p50_ms']:.2f} -> {result['p50_ms']:.2f}ms ({change:+.0%}) "
+            f"queries {before['queries']} -> {result['queries']}"
+            + ('  REGRESSION' if slower or more_queries else '')
+        )
+    return lines, regressed
@@ -0,0 +1,258 @@
+"""
+Versioned read-through cache for the read-only API.
+
+Serialized responses are stored under a key built from the viewset, the
+action, the request URL and a version counter for every model the response
+depends on. Saving or deleting any of those models bumps its version (see
+core/signals.py), so stale entries are simply never looked up again and
+expire on their own.
+
+The versions must be the same in every worker process, or a worker that
+didn't see a bump keeps serving (and validating ETags against) old data.
+With a shared cache (Redis) they are kept in the cache itself. With the
+local-memory cache each process has its own, so the versions are kept in
+the CacheVersion table instead, at the cost of one query per lookup
+(API_CACHE_VERSION_STORE overrides the choice).
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from rest_framework.response import Response
+
+from .conditional import ConditionalGetMixin
+
+KEY_PREFIX = 'core'
+HITS_KEY = f'{KEY_PREFIX}:cache:hits'
+MISSES_KEY = f'{KEY_PREFIX}:cache:misses'
+# Cache backends whose data isn't shared between processes
+LOCAL_BACKENDS = {'LocMemCache', 'DummyCache'}
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+
+def _version_key(model):
+    return f'{KEY_PREFIX}:version:{model._meta.label_lower}'
+
+
+def versions_in_database():
+    store = getattr(settings, 'API_CACHE_VERSION_STORE', '')
+    if store:
+        return store == 'database'
+    return type(get_cache()).__name__ in LOCAL_BACKENDS
+
+
+def _new_version():
+    # A timestamp, so a counter that was evicted or deleted never rewinds
+    # onto versions that were already used
+    return int(time.time() * 1000)
+
+
+def get_versions(models):
+    """Return the current version of each model, initialising missing ones"""
+    if versions_in_database():
+        return _get_database_versions(models)
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(models):
+    """Async variant of get_versions, for core.async_views"""
+    if versions_in_database():
+        return await _aget_database_versions(models)
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, _new_version(), None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    if versions_in_database():
+        _bump_database_version(model)
+        return
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def _get_database_versions(models):
+    from .models import CacheVersion
+
+    labels = [model._meta.label_lower for model in models]
+    rows = CacheVersion.objects.filter(label__in=labels)
+    versions = dict(rows.values_list('label', 'version'))
+    missing = [label for label in labels if label not in versions]
+    if missing:
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(label=label, version=_new_version()) for label in missing],
+            ignore_conflicts=True
+        )
+        versions.update(rows.filter(label__in=missing).values_list('label', 'version'))
+    return [versions[label] for label in labels]
+
+
+async def _aget_database_versions(models):
+    from .models import CacheVersion
+
+    labels = [model._meta.label_lower for model in models]
+    rows = CacheVersion.objects.filter(label__in=labels)
+    versions = {label: version async for label, version in rows.values_list('label', 'version')}
+    missing = [label for label in labels if label not in versions]
+    if missing:
+        await CacheVersion.objects.abulk_create(
+            [CacheVersion(label=label, version=_new_version()) for label in missing],
+            ignore_conflicts=True
+        )
+        async for label, version in rows.filter(label__in=missing).values_list('label', 'version'):
+            versions[label] = version
+    return [versions[label] for label in labels]
+
+
+def _bump_database_version(model):
+    from .models import CacheVersion
+
+    label = model._meta.label_lower
+    if not CacheVersion.objects.filter(label=label).update(version=F('version') + 1):
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(label=label, version=_new_version())], ignore_conflicts=True
+        )
+
+
+def _increment(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+async def _aincrement(key):
+    cache = get_cache()
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, None)
+        await cache.aincr(key)
+
+
+def get_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+def build_cache_key(request, name, versions):
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = f'{request.get_host()}|{request.path}|{params}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    version = '.'.join(str(v) for v in versions)
+    return f'{KEY_PREFIX}:response:{name}:{version}:{digest}'
+
+
+def cache_response(func):
+    """
+    Cache the serialized data of a successful GET response.
+
+    Meant for methods on viewsets using CachedResponseMixin. The response's
+    validators are stored with it, so conditional requests for a cached
+    response are answered without any database access.
+    """
+    @wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return func(self, request, *args, **kwargs)
+
+        cache = get_cache()
+        name = f'{self.basename}.{func.__name__}'
+        versions = get_versions(self.get_cache_models())
+        key = build_cache_key(request, name, versions)
+        entry = cache.get(key)
+        if entry is not None:
+            _increment(HITS_KEY)
+            data, validators = entry
+            response = None
+            if validators is not None:
+                response = validators.not_modified(request)
+            if response is None:
+                response = Response(data)
+                if validators is not None:
+                    validators.apply(response)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _increment(MISSES_KEY)
+        validators = self.get_validators(request, *versions)
+        if validators is not None:
+            response = validators.not_modified(request)
+            if response is not None:
+                return response
+
+        response = func(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, (response.data, validators), get_timeout())
+            if validators is not None:
+                validators.apply(response)
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """
+    Serve list/retrieve (and any @cache_response action) from the cache,
+    honouring conditional GET headers.
+
+    `cache_models` lists every model the serialized output depends on and
+    defaults to the model of the viewset's queryset.
+    """
+    cache_models = None
+
+    def get_cache_models(self):
+        if self.cache_models is not None:
+            return self.cache_models
+        return [self.queryset.model]
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,92 @@
+"""
+Conditional GET support (ETag / 304) for read-only viewsets.
+
+Validators are computed with a single aggregate query (MAX of a timestamp
+plus a row count) before anything is serialized, so an unchanged resource is
+answered with 304 without touching the serializer. The ETag also covers the
+cache versions of every model in the response (see core/cache.py), which
+change on any save, delete or bulk update.
+
+No Last-Modified is sent: no timestamp column changes when a row is deleted
+or deactivated, or when an embedded object (a portfolio item's testimonials)
+is edited, so If-Modified-Since would be answered with stale 304s.
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+
+
+class Validators:
+    def __init__(self, etag):
+        self.etag = etag
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        return response
+
+    def not_modified(self, request):
+        """Return a 304 response if the client's copy is current, else None"""
+        response = get_conditional_response(request._request, etag=self.etag)
+        if response is not None:
+            self.apply(response)
+        return response
+
+
+def make_etag(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return '"%s"' % hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    Compute the ETag for list, retrieve and featured actions.
+
+    `timestamp_field` names the timestamp hashed into it; it defaults to
+    `updated_at`, which every core model except BlogPost and JobOpening has.
+    """
+    timestamp_field = 'updated_at'
+
+    def get_validator_queryset(self):
+        queryset = self.get_queryset()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        if self.action == 'featured':
+            return queryset.filter(featured=True)
+        return self.filter_queryset(queryset)
+
+    def get_validator_aggregates(self):
+        return {
+            'timestamp': Max(self.timestamp_field),
+            'count': Count('pk'),
+        }
+
+    def get_validators(self, request, *extra):
+        """Return Validators for the current action, or None for a 404"""
+        try:
+            queryset = self.get_validator_queryset().order_by()
+            result = queryset.aggregate(**self.get_validator_aggregates())
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup value; let the view itself answer with 404
+            return None
+        return self.make_validators(request, result, extra)
+
+    async def aget_validators(self, request, *extra):
+        """Async ORM variant of get_validators, for core.async_views"""
+        try:
+            queryset = self.get_validator_queryset().order_by()
+            result = await queryset.aaggregate(**self.get_validator_aggregates())
+        except (TypeError, ValueError, ValidationError):
+            return None
+        return self.make_validators(request, result, extra)
+
+    def make_validators(self, request, result, extra):
+        if self.action == 'retrieve' and not result['count']:
+            return None
+        etag = make_etag(
+            self.basename, self.action, request.get_full_path(),
+            result['timestamp'], result['count'], *extra
+        )
+        return Validators(etag)
@@ -0,0 +1,106 @@
+"""
+Sparse fieldsets and field expansion for the read-only API.
+
+`?fields=title,slug` keeps only the listed fields, `?omit=content` drops
+fields and `?expand=project` replaces a related field with its nested
+representation (see `expandable_fields` on the serializers). Values may be
+comma separated or repeated. Unknown names are ignored.
+
+Fields are removed before the serializer runs, so omitted
+SerializerMethodFields are never computed, and SparseFieldsetMixin defers
+the model columns that only omitted fields read, so they aren't fetched.
+"""
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+EXPAND_PARAM = 'expand'
+
+
+def get_param_list(request, param):
+    return {
+        name.strip()
+        for value in request.query_params.getlist(param)
+        for name in value.split(',')
+        if name.strip()
+    }
+
+
+def is_field_selected(request, name):
+    """Whether `?fields=` / `?omit=` keep the field called `name`"""
+    only = get_param_list(request, FIELDS_PARAM)
+    if only and name not in only:
+        return False
+    return name not in get_param_list(request, OMIT_PARAM)
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Apply the request's fields/omit/expand parameters to a ModelSerializer.
+
+    Only the serializer a view renders is affected (the one created through
+    `get_serializer()`, whose context has the view); nested serializers are
+    always rendered in full.
+    """
+    # name -> (serializer class, extra kwargs) used when the field is expanded
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or self.context.get('view') is None:
+            return fields
+        for name in get_param_list(request, EXPAND_PARAM) & set(self.expandable_fields):
+            serializer_class, kwargs = self.expandable_fields[name]
+            fields[name] = serializer_class(read_only=True, **kwargs)
+        return {
+            name: field for name, field in fields.items()
+            if is_field_selected(request, name)
+        }
+
+
+class SparseFieldsetMixin:
+    """
+    Narrow the viewset's queryset to what the requested fields need: defer
+    columns read only by omitted fields, and select/prefetch the relations
+    of expanded fields.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = getattr(self, 'request', None)
+        if request is None:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        model = queryset.model
+
+        for name in get_param_list(request, EXPAND_PARAM) & set(
+            getattr(serializer_class, 'expandable_fields', {})
+        ):
+            field = model._meta.get_field(name)
+            if field.many_to_one or field.one_to_one:
+                queryset = queryset.select_related(name)
+            else:
+                queryset = queryset.prefetch_related(name)
+
+        if get_param_list(request, FIELDS_PARAM) or get_param_list(request, OMIT_PARAM):
+            deferred = self.get_deferred_fields(serializer_class, model)
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        return queryset
+
+    def get_deferred_fields(self, serializer_class, model):
+        all_fields = serializer_class().fields
+        selected = {name for name in all_fields if is_field_selected(self.request, name)}
+
+        def source_root(field):
+            return field.source.split('.')[0]
+
+        needed = {source_root(field) for name, field in all_fields.items() if name in selected}
+        # Columns used to look up, order and paginate rows stay loaded
+        needed.add(self.lookup_field)
+        needed.update(name.lstrip('-') for name in getattr(self, 'keyset_ordering', []))
+        columns = {
+            field.name for field in model._meta.concrete_fields
+            if not field.is_relation and not field.primary_key
+        }
+        omitted = {source_root(field) for name, field in all_fields.items() if name not in selected}
+        return sorted((omitted & columns) - needed)
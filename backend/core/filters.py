@@ -0,0 +1,95 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Count, F
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+from rest_framework.settings import api_settings
+
+from .fieldsets import EXPAND_PARAM, FIELDS_PARAM, OMIT_PARAM
+from .models import Technology
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Ranked full-text search over the model's `search_vector` column.
+
+    On PostgreSQL the `?search=` terms are matched against the trigger
+    maintained, GIN indexed search vector and results are ordered by
+    relevance (unless an explicit `?ordering=` is given). Other databases
+    fall back to DRF's `icontains` search over the view's `search_fields`.
+
+    Must come after OrderingFilter in `filter_backends` so the relevance
+    ordering takes precedence over the view's default ordering.
+    """
+    search_config = 'english'
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        query = SearchQuery(
+            ' '.join(search_terms), config=self.search_config, search_type='websearch'
+        )
+        queryset = queryset.filter(search_vector=query)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        return queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', *(queryset.query.order_by or queryset.model._meta.ordering))
+
+
+class TechnologyFilter(BaseFilterBackend):
+    """
+    Filter by technology tag slug, e.g. `?tech=react&tech=django`.
+
+    Repeated values must all match. Uses the indexed technology_tags
+    relation rather than substring matching on the `technologies` text.
+    """
+    tech_param = 'tech'
+
+    def get_tech_slugs(self, request):
+        return [slug for slug in request.query_params.getlist(self.tech_param) if slug]
+
+    def filter_queryset(self, request, queryset, view):
+        for slug in self.get_tech_slugs(request):
+            queryset = queryset.filter(technology_tags__slug=slug)
+        return queryset
+
+
+class TechnologyFacetMixin:
+    """
+    Add per-technology counts for the current filter set to list responses.
+
+    Without filters the counts are read from the precomputed
+    `facet_count_field` on Technology; with filters they are counted over
+    the matching items only.
+    """
+    facet_count_field = None
+    facet_related_name = None
+    # Query parameters that change the shape of the page, not which items match
+    unfiltered_params = {
+        'page', 'pagination', 'cursor', 'ordering', 'format', FIELDS_PARAM, OMIT_PARAM, EXPAND_PARAM
+    }
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.data['facets'] = {'tech': self.get_technology_facets(request)}
+        return response
+
+    def get_technology_facets(self, request):
+        return list(self.get_technology_facet_queryset(request))
+
+    def get_technology_facet_queryset(self, request):
+        if set(request.query_params) <= self.unfiltered_params:
+            tags = Technology.objects.filter(**{f'{self.facet_count_field}__gt': 0}).annotate(
+                count=F(self.facet_count_field)
+            )
+        else:
+            matching = self.filter_queryset(self.get_queryset()).order_by().values('pk')
+            tags = Technology.objects.filter(
+                **{f'{self.facet_related_name}__in': matching}
+            ).annotate(count=Count(self.facet_related_name))
+        return tags.order_by('-count', 'name').values('slug', 'name', 'count')
@@ -0,0 +1,180 @@
+"""
+Responsive image derivatives.
+
+For every uploaded image a set of width-bounded WebP/AVIF copies is written
+next to the original (in a `_derived/` sub-directory) and recorded in the
+model's `image_derivatives` JSON field, which the serializers expose as
+srcset strings. Processing runs after the request has committed, in a
+background thread, and is idempotent: derivatives whose source hasn't
+changed are skipped, so the generate_image_derivatives command can be
+re-run over the existing MEDIA_ROOT at any time. Derivatives of an image
+that was replaced, cleared or whose row was deleted are removed.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, features
+
+from .cache import bump_version
+from .models import BlogPost, Portfolio, Service, TeamMember, Testimonial
+from .snapshots import schedule_refresh
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = {
+    Service: ['image'],
+    Portfolio: ['thumbnail', 'image1', 'image2', 'image3'],
+    Testimonial: ['client_photo'],
+    TeamMember: ['photo'],
+    BlogPost: ['featured_image'],
+}
+DEFAULT_WIDTHS = [320, 640, 1024, 1600]
+# Pillow format name and save options for each derivative format
+FORMAT_OPTIONS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'avif': ('AVIF', {'quality': 55}),
+}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-derivatives')
+
+
+def get_widths():
+    return getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', DEFAULT_WIDTHS)
+
+
+def get_formats():
+    formats = getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', list(FORMAT_OPTIONS))
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def derivative_name(source_name, width, fmt):
+    # The full file name, extension included, so photo.png and photo.jpg
+    # in the same directory don't share derivatives
+    directory, filename = os.path.split(source_name)
+    return f'{directory}/_derived/{filename}-{width}w.{fmt}'
+
+
+def derivative_files(entry):
+    """Names of the files listed in a manifest entry"""
+    return {name for variants in (entry or {}).get('variants', {}).values() for width, name in variants}
+
+
+def delete_derivatives(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError as exc:
+            logger.warning('Could not delete image derivative %s: %s', name, exc)
+
+
+def _prepare(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    if image.mode in ('LA', 'PA') or 'transparency' in image.info:
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def generate_derivatives(field_file, force=False):
+    """
+    Write derivatives for one image and return its manifest entry, or None
+    if the original can't be read.
+    """
+    try:
+        with field_file.open('rb'):
+            original = Image.open(field_file)
+            original.load()
+    except (OSError, ValueError) as exc:
+        logger.warning('Skipping image derivatives for %s: %s', field_file.name, exc)
+        return None
+
+    original = _prepare(original)
+    widths = sorted({min(width, original.width) for width in get_widths()})
+    variants = {}
+    for fmt in get_formats():
+        pil_format, options = FORMAT_OPTIONS[fmt]
+        variants[fmt] = []
+        for width in widths:
+            name = derivative_name(field_file.name, width, fmt)
+            if force or not default_storage.exists(name):
+                resized = original.copy()
+                resized.thumbnail((width, original.height), Image.LANCZOS)
+                buffer = BytesIO()
+                resized.save(buffer, pil_format, **options)
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                default_storage.save(name, ContentFile(buffer.getvalue()))
+            variants[fmt].append([width, name])
+    return {'source': field_file.name, 'width': original.width, 'variants': variants}
+
+
+def needs_processing(instance):
+    derivatives = instance.image_derivatives or {}
+    for field in IMAGE_FIELDS[type(instance)]:
+        name = getattr(instance, field).name or None
+        if (derivatives.get(field) or {}).get('source') != name:
+            return True
+    return False
+
+
+def process_instance_images(model, pk, force=False):
+    """Bring the derivatives of one object in line with its image fields"""
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    derivatives = dict(instance.image_derivatives or {})
+    previous = set().union(*map(derivative_files, derivatives.values()))
+    changed = False
+    for field in IMAGE_FIELDS[model]:
+        field_file = getattr(instance, field)
+        current = derivatives.get(field)
+        if not field_file.name:
+            changed |= derivatives.pop(field, None) is not None
+            continue
+        if not force and current and current.get('source') == field_file.name:
+            continue
+        entry = generate_derivatives(field_file, force=force)
+        if entry is not None:
+            derivatives[field] = entry
+            changed = True
+    if changed:
+        # Files of replaced or cleared images (and older naming schemes)
+        delete_derivatives(previous - set().union(*map(derivative_files, derivatives.values())))
+        # update() skips save signals, so invalidate the cached responses
+        # and snapshots ourselves
+        model.objects.filter(pk=pk).update(image_derivatives=derivatives)
+        bump_version(model)
+        schedule_refresh(model)
+
+
+def _process_in_background(model, pk):
+    close_old_connections()
+    try:
+        process_instance_images(model, pk)
+    except Exception:
+        logger.exception('Generating image derivatives for %s %s failed', model.__name__, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule_derivative_cleanup(instance):
+    """Delete a deleted object's derivatives once the transaction commits"""
+    names = set().union(*map(derivative_files, (instance.image_derivatives or {}).values()))
+    if names:
+        transaction.on_commit(lambda: delete_derivatives(names))
+
+
+def schedule_image_processing(instance):
+    """Process the instance's images once the current transaction commits"""
+    model, pk = type(instance), instance.pk
+    if getattr(settings, 'IMAGE_DERIVATIVES_ASYNC', True):
+        transaction.on_commit(lambda: _executor.submit(_process_in_background, model, pk))
+    else:
+        transaction.on_commit(lambda: process_instance_images(model, pk))
@@ -0,0 +1,122 @@
+"""
+Lightweight database-backed job queue.
+
+Side effects that shouldn't hold up a request (sending email, calling
+external services) are registered as tasks with the `@task` decorator and
+queued with `enqueue()`. The job row is written in the caller's transaction,
+so a job is only ever visible once the data it refers to has committed.
+The `run_jobs` management command executes due jobs; failures are retried
+with exponential backoff and, once `max_attempts` is reached, left in the
+`dead` state for inspection and retry from the admin.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 30
+MAX_RETRY_DELAY = 60 * 60
+# Running jobs not finished after this long are assumed to belong to a
+# worker that died and are handed out again
+DEFAULT_LOCK_TIMEOUT = 15 * 60
+
+_registry = {}
+
+
+def task(name):
+    """Register the decorated function as the handler for jobs called `name`"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def enqueue(name, payload=None, delay=0, max_attempts=None):
+    """Queue a job for `name`; `payload` is passed to the task as keyword arguments"""
+    if name not in _registry:
+        raise KeyError(f'Unknown task: {name}')
+    return BackgroundJob.objects.create(
+        name=name,
+        payload=payload or {},
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS),
+    )
+
+
+def get_retry_delay(attempts):
+    """Seconds to wait before retrying a job that has failed `attempts` times"""
+    base = getattr(settings, 'JOB_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+    return min(base * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def requeue_stale_jobs():
+    lock_timeout = getattr(settings, 'JOB_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+    cutoff = timezone.now() - timedelta(seconds=lock_timeout)
+    return BackgroundJob.objects.filter(status='running', locked_at__lt=cutoff).update(
+        status='pending', locked_at=None
+    )
+
+
+def claim_job():
+    """Mark the next due job as running and return it, or None if none is due"""
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = BackgroundJob.objects.filter(status='pending', run_after__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            # Lets several workers poll the table without handing out the same job
+            queryset = queryset.select_for_update(skip_locked=True)
+        job = queryset.order_by('run_after', 'id').first()
+        if job is None:
+            return None
+        job.status = 'running'
+        job.locked_at = now
+        job.attempts += 1
+        job.save(update_fields=['status', 'locked_at', 'attempts', 'updated_at'])
+    return job
+
+
+def run_job(job):
+    """Execute a claimed job and record the outcome"""
+    try:
+        get_task(job.name)(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'dead'
+            logger.error('Job %s failed permanently after %s attempts', job, job.attempts)
+        else:
+            job.status = 'pending'
+            job.run_after = timezone.now() + timedelta(seconds=get_retry_delay(job.attempts))
+            logger.warning('Job %s failed, retrying at %s', job, job.run_after)
+        job.save(update_fields=['status', 'locked_at', 'run_after', 'last_error', 'updated_at'])
+        return False
+    job.status = 'succeeded'
+    job.locked_at = None
+    job.save(update_fields=['status', 'locked_at', 'updated_at'])
+    return True
+
+
+def run_pending(limit=None):
+    """Run due jobs until none are left (or `limit` have run); return the number run"""
+    requeue_stale_jobs()
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.archive import archivable_contacts, archive_contacts
+
+
+class Command(BaseCommand):
+    help = (
+        'Move old closed/responded contact submissions to the archive table in '
+        'batches. Safe to interrupt and re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.CONTACT_ARCHIVE_AFTER_DAYS,
+            help='Archive submissions older than this (default CONTACT_ARCHIVE_AFTER_DAYS)'
+        )
+        parser.add_argument(
+            '--status', action='append', dest='statuses',
+            help='Status to archive; repeatable (default CONTACT_ARCHIVE_STATUSES)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to wait between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_contacts(options['older_than_days'], options['statuses']).count()
+            self.stdout.write(f'{count} contact submissions would be archived')
+            return
+        archived = archive_contacts(
+            options['older_than_days'], options['statuses'], options['batch_size'],
+            options['max_batches'], options['pause'],
+            log=self.stdout.write if options['verbosity'] > 1 else None
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} contact submissions'))
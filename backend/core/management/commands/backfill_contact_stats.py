@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import ContactDailyStat
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount the daily contact rollups behind /api/contact/stats/ from the '
+        'Contact table (after loaddata, raw SQL or the first deploy)'
+    )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows = ContactDailyStat.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {rows} daily rollups in {time.perf_counter() - start:.2f}s'
+        ))
@@ -0,0 +1,77 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from core.benchmarks import BenchmarkError, check_database, compare_results, get_routes, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every route in core/urls.py (throughput, p50/p99 latency, query '
+        'count) and optionally compare with an earlier run'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Requests per route (default: 50)')
+        parser.add_argument(
+            '--route', action='append', dest='routes', metavar='NAME',
+            help='Only benchmark this route, e.g. post-list (repeatable)'
+        )
+        parser.add_argument(
+            '--cache', action='store_true',
+            help='Keep the response cache enabled (default: every request reaches the database)'
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--compare', metavar='FILE', help='Compare with the results in FILE')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='p50 slowdown counted as a regression (default: 0.2 = 20%%)'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error if --compare finds a regression'
+        )
+        parser.add_argument(
+            '--allow-non-debug', action='store_true',
+            help='Run even though DEBUG is off (staff-only routes use a temporary superuser)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            check_database(options['allow_non_debug'])
+        except BenchmarkError as exc:
+            raise CommandError(str(exc))
+        previous = None
+        if options['compare']:
+            with open(options['compare']) as fh:
+                previous = json.load(fh)
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['cache']:
+            overrides['API_CACHE_TIMEOUT'] = 0
+        with override_settings(**overrides):
+            routes = get_routes()
+            if options['routes']:
+                unknown = set(options['routes']) - {name for name, path in routes}
+                if unknown:
+                    raise CommandError(f'Unknown route: {", ".join(sorted(unknown))}')
+                routes = [(name, path) for name, path in routes if name in options['routes']]
+            results = run_benchmarks(options['requests'], routes, log=self.stdout.write)
+        results['meta']['cache'] = options['cache']
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+        if previous is not None:
+            self.stdout.write(
+                f"Compared with {previous['meta'].get('commit') or options['compare']}:"
+            )
+            lines, regressed = compare_results(previous, results, options['threshold'])
+            for line in lines:
+                self.stdout.write(line)
+            if regressed and options['fail_on_regression']:
+                raise CommandError('Performance regression')
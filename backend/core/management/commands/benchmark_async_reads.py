@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+from urllib.parse import urlsplit
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from core.async_urls import urlpatterns as async_urlpatterns
+from core.urls import router
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare read throughput of the sync views (one request per worker thread, '
+        'like gunicorn sync workers) with the async views (many requests in flight '
+        'per worker event loop) at the same worker count'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/services/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Requests in flight per async worker (default: 16)'
+        )
+        parser.add_argument(
+            '--latency', type=float, default=0,
+            help='Milliseconds added to every query to simulate a remote database '
+                 '(e.g. 20 for a cross-region Neon round trip)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        self.sync_view = self.resolve(router.urls, path)
+        self.async_view = self.resolve(async_urlpatterns, path)
+        if options['latency']:
+            self.add_latency(options['latency'] / 1000)
+
+        self.sync_factory = RequestFactory()
+        self.async_factory = AsyncRequestFactory()
+
+        # Disable the response cache so every request reaches the database
+        with override_settings(
+            API_CACHE_TIMEOUT=0, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+        ):
+            for label, run in (('sync', self.run_sync), ('async', self.run_async)):
+                elapsed, timings = run(path, options)
+                self.stdout.write(
+                    f'{label:<6} workers={options["workers"]} requests={len(timings)} '
+                    f'throughput={len(timings) / elapsed:.1f} req/s '
+                    f'median={median(timings):.2f}ms max={max(timings):.2f}ms'
+                )
+
+    def resolve(self, patterns, path):
+        route = urlsplit(path).path.removeprefix('/api/')
+        for pattern in patterns:
+            match = pattern.resolve(route)
+            if match:
+                return match.func, match.kwargs
+        raise CommandError(f'No read-only endpoint matches {path}')
+
+    def add_latency(self, seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        connection_created.connect(install, weak=False)
+        for conn in connections.all():
+            if conn.connection is not None:
+                conn.execute_wrappers.append(delay)
+
+    def check_response(self, response, path):
+        if response.status_code != 200:
+            raise CommandError(f'{path} returned {response.status_code}')
+
+    def run_sync(self, path, options):
+        view, kwargs = self.sync_view
+
+        def request(_):
+            start = time.perf_counter()
+            response = view(self.sync_factory.get(path), **kwargs)
+            response.render()
+            self.check_response(response, path)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            timings = list(pool.map(request, range(options['requests'])))
+        return time.perf_counter() - start, timings
+
+    def run_async(self, path, options):
+        view, kwargs = self.async_view
+        timings = []
+        lock = threading.Lock()
+        per_worker = [
+            options['requests'] // options['workers'] + (i < options['requests'] % options['workers'])
+            for i in range(options['workers'])
+        ]
+
+        async def request():
+            # Like the ASGI handler: each request gets its own thread for
+            # the ORM's sync_to_async calls
+            async with ThreadSensitiveContext():
+                start = time.perf_counter()
+                response = await view(self.async_factory.get(path), **kwargs)
+                self.check_response(response, path)
+                elapsed = (time.perf_counter() - start) * 1000
+                await sync_to_async(connections.close_all)()
+                return elapsed
+
+        async def worker(count):
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def limited():
+                async with semaphore:
+                    return await request()
+
+            results = await asyncio.gather(*[limited() for _ in range(count)])
+            with lock:
+                timings.extend(results)
+
+        def run_worker(count):
+            asyncio.run(worker(count))
+            connections.close_all()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            list(pool.map(run_worker, per_worker))
+        return time.perf_counter() - start, timings
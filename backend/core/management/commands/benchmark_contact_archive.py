@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from core.archive import archive_contacts
+from core.benchmarks import SEED_EMAIL_DOMAIN, BenchmarkError, check_database, get_staff_client, measure
+from core.models import Contact
+
+ROUTES = [
+    ('contact-list', '/api/contact/'),
+    ('contact-list?cursor', '/api/contact/?pagination=cursor'),
+    ('contact-stats', '/api/contact/stats/'),
+]
+ARCHIVE_ROUTES = [
+    ('archive-list?cursor', '/api/contact-archive/?pagination=cursor'),
+    ('archive?email', f'/api/contact-archive/?email=contact-5@{SEED_EMAIL_DOMAIN}&pagination=cursor'),
+    ('archive?search', '/api/contact-archive/?search=contact-5&pagination=cursor'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the contact inbox before and after archiving, and the archive run '
+        'itself, on the seeded contacts (see seed_benchmark_data). Rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fraction', type=float, default=0.9,
+            help='Share of the seeded contacts made old and closed first (default: 0.9)'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--requests', type=int, default=20, help='Requests per route (default: 20)')
+        parser.add_argument(
+            '--allow-non-debug', action='store_true',
+            help='Run even though DEBUG is off (make sure DATABASE_URL is not production)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            check_database(options['allow_non_debug'])
+        except BenchmarkError as exc:
+            raise CommandError(str(exc))
+        seeded = Contact.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+        first = seeded.order_by('id').values_list('id', flat=True).first()
+        last = seeded.order_by('-id').values_list('id', flat=True).first()
+        if first is None:
+            raise CommandError('No seeded contacts; run seed_benchmark_data first')
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'], 'API_CACHE_TIMEOUT': 0}
+        with override_settings(**overrides), transaction.atomic():
+            # Created inside the transaction, so rolled back with everything else
+            client = get_staff_client('testserver')
+            cutoff_id = first + int((last - first + 1) * options['fraction'])
+            aged = seeded.filter(id__lt=cutoff_id).update(
+                status='closed', submitted_at=timezone.now() - timedelta(days=400)
+            )
+            self.stdout.write(f'{seeded.count()} seeded contacts, {aged} made old and closed')
+            self.run_routes('before', client, ROUTES, options['requests'])
+
+            start = time.perf_counter()
+            archived = archive_contacts(batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'archived {archived} contacts in {elapsed:.2f}s '
+                f'({archived / elapsed if elapsed else 0:.0f} rows/s, batches of {options["batch_size"]})'
+            )
+
+            self.run_routes('after', client, ROUTES + ARCHIVE_ROUTES, options['requests'])
+            transaction.set_rollback(True)
+
+    def run_routes(self, label, client, routes, requests):
+        for name, path in routes:
+            result = measure(client, path, requests)
+            self.stdout.write(
+                f"{label:<6} {name:<22} {result['status']} p50={result['p50_ms']:.2f}ms "
+                f"p99={result['p99_ms']:.2f}ms queries={result['queries']}"
+            )
@@ -0,0 +1,55 @@
+import time
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from core.cache import get_cache
+
+FAN_OUT_URLS = [
+    '/api/company-info/',
+    '/api/services/',
+    '/api/portfolio/featured/',
+    '/api/testimonials/featured/',
+]
+AGGREGATED_URLS = ['/api/home/']
+
+
+class Command(BaseCommand):
+    help = 'Compare homepage latency of the four-call fan-out against /api/home/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Clear the response cache before every iteration'
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        for label, urls in (('fan-out', FAN_OUT_URLS), ('aggregated', AGGREGATED_URLS)):
+            timings, queries = self.run(client, urls, options['iterations'], options['no_cache'])
+            self.stdout.write(
+                f'{label:<12} requests={len(urls)} '
+                f'median={median(timings):.2f}ms max={max(timings):.2f}ms '
+                f'max_queries={queries}'
+            )
+
+    def run(self, client, urls, iterations, no_cache):
+        timings = []
+        queries = 0
+        for _ in range(iterations):
+            if no_cache:
+                get_cache().clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                for url in urls:
+                    response = client.get(url)
+                    if response.status_code != 200:
+                        raise RuntimeError(f'{url} returned {response.status_code}')
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = max(queries, len(captured))
+        return timings, queries
@@ -0,0 +1,77 @@
+import time
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.serializers import (
+    BlogPostSerializer, JobOpeningSerializer, PortfolioListSerializer, ServiceSerializer
+)
+from core.views import BlogPostViewSet, JobOpeningViewSet, PortfolioViewSet, ServiceViewSet
+
+# endpoint -> (viewset, serializer the list used to render)
+LIST_VIEWSETS = {
+    'services': (ServiceViewSet, ServiceSerializer),
+    'portfolio': (PortfolioViewSet, PortfolioListSerializer),
+    'jobs': (JobOpeningViewSet, JobOpeningSerializer),
+    'posts': (BlogPostViewSet, BlogPostSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare one page of each list endpoint rendered with the serializer and '
+        'full rows it used before (before) against the list serializer and deferred '
+        'columns (after)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints', choices=sorted(LIST_VIEWSETS),
+            help='Only benchmark this endpoint (repeatable)'
+        )
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument(
+            '--page-size', type=int, default=settings.REST_FRAMEWORK['PAGE_SIZE']
+        )
+
+    def handle(self, *args, **options):
+        self.factory = APIRequestFactory()
+        renderer = JSONRenderer()
+        for name in options['endpoints'] or sorted(LIST_VIEWSETS):
+            viewset_class, full_serializer_class = LIST_VIEWSETS[name]
+            viewset = self.get_viewset(viewset_class, name)
+            before = (viewset.queryset.all(), full_serializer_class)
+            after = (viewset.get_queryset(), viewset.get_serializer_class())
+            results = {}
+            for label, (queryset, serializer_class) in (('before', before), ('after', after)):
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    rows = list(queryset.all()[:options['page_size']])
+                    content = renderer.render(
+                        serializer_class(rows, many=True, context={'request': viewset.request}).data
+                    )
+                    timings.append((time.perf_counter() - start) * 1000)
+                results[label] = (len(content), median(timings))
+
+            (before_bytes, before_ms), (after_bytes, after_ms) = results['before'], results['after']
+            self.stdout.write(
+                f'{name:<10} bytes {before_bytes} -> {after_bytes} '
+                f'({self.change(before_bytes, after_bytes)}), '
+                f'median {before_ms:.2f}ms -> {after_ms:.2f}ms '
+                f'({self.change(before_ms, after_ms)})'
+            )
+
+    def get_viewset(self, viewset_class, name):
+        viewset = viewset_class(action='list', args=(), kwargs={}, format_kwarg=None)
+        viewset.request = Request(self.factory.get(f'/api/{name}/'))
+        return viewset
+
+    def change(self, before, after):
+        if not before:
+            return 'n/a'
+        return f'{(after - before) / before:+.0%}'
@@ -0,0 +1,67 @@
+import time
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.metrics import registry
+
+METRICS_MIDDLEWARE = 'core.metrics.MetricsMiddleware'
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of the request metrics middleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/services/')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Disable the response cache so every request queries the database'
+        )
+
+    def handle(self, *args, **options):
+        without = [name for name in settings.MIDDLEWARE if name != METRICS_MIDDLEWARE]
+        variants = (
+            ('without', without, False),
+            ('metrics', [METRICS_MIDDLEWARE, *without], False),
+            ('timing', [METRICS_MIDDLEWARE, *without], True),
+        )
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if options['no_cache']:
+            overrides['API_CACHE_TIMEOUT'] = 0
+
+        results = {}
+        with override_settings(**overrides):
+            for label, middleware, server_timing in variants:
+                with override_settings(
+                    MIDDLEWARE=middleware, REQUEST_METRICS=True,
+                    REQUEST_METRICS_SERVER_TIMING=server_timing
+                ):
+                    results[label] = self.run(Client(), options['path'], options['requests'])
+        registry.reset()
+
+        baseline = results['without']
+        for label, timings in results.items():
+            overhead = median(timings) - median(baseline)
+            self.stdout.write(
+                f'{label:<8} median={median(timings) * 1000:.3f}ms '
+                f'p95={self.percentile(timings, 95) * 1000:.3f}ms '
+                f'overhead={overhead * 1e6:+.1f}us/request'
+            )
+
+    def run(self, client, path, count):
+        response = client.get(path)  # warm up: middleware chain, caches
+        if response.status_code != 200:
+            raise CommandError(f'{path} returned {response.status_code}')
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            client.get(path)
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def percentile(self, values, percent):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * percent / 100))]
@@ -0,0 +1,41 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.snapshots import brotli, export_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Write pre-compressed JSON snapshots of the public API for nginx to serve'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=settings.API_SNAPSHOT_ROOT,
+            help='Snapshot root directory (default: API_SNAPSHOT_ROOT)'
+        )
+        parser.add_argument(
+            '--base-url', default=settings.API_SNAPSHOT_BASE_URL,
+            help='Scheme and host used for absolute URLs (default: API_SNAPSHOT_BASE_URL)'
+        )
+        parser.add_argument(
+            '--model', action='append', dest='models', metavar='LABEL',
+            help='Only refresh endpoints depending on this model, e.g. core.Service (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError('Set API_SNAPSHOT_ROOT or pass --output')
+        models = None
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as exc:
+                raise CommandError(exc)
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('brotli is not installed; writing gzip copies only'))
+
+        stats = export_snapshot(models, root=options['output'], base_url=options['base_url'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot updated: {stats['written']} written, "
+            f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+        ))
@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ndjson import CONTENT_MODELS_BY_LABEL, export_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Stream the site content to NDJSON (one object per line) for import_content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-', help='Output file (default: stdout)')
+        parser.add_argument(
+            '--model', action='append', dest='models', metavar='LABEL',
+            help='Only export this model, e.g. core.portfolio (repeatable)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        labels = [label.lower() for label in options['models'] or []]
+        unknown = set(labels) - set(CONTENT_MODELS_BY_LABEL)
+        if unknown:
+            raise CommandError(f'Not a content model: {", ".join(sorted(unknown))}')
+
+        if options['output'] == '-':
+            counts = export_ndjson(sys.stdout, labels, options['batch_size'])
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                counts = export_ndjson(fh, labels, options['batch_size'])
+        self.stderr.write(
+            'Exported ' + ', '.join(f'{count} {label}' for label, count in counts.items())
+        )
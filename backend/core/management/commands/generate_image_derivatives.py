@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.images import IMAGE_FIELDS, process_instance_images
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive WebP/AVIF derivatives for every uploaded image'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate derivatives even if they already exist'
+        )
+
+    def handle(self, *args, **options):
+        for model in IMAGE_FIELDS:
+            pks = list(model.objects.values_list('pk', flat=True))
+            for pk in pks:
+                process_instance_images(model, pk, force=options['force'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {len(pks)} processed')
+        self.stdout.write(self.style.SUCCESS('Done'))
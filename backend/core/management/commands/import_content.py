@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.ndjson import ContentImportError, import_ndjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Create or update site content from NDJSON (see export_content) or a Django '
+        'fixture such as demo_data.json, in bulk'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="NDJSON or fixture file ('-' for stdin)")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--skip-search-index', action='store_true',
+            help="Don't rebuild the /api/search/ index afterwards"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['input'] == '-':
+                    stats = self.run(sys.stdin, options)
+                else:
+                    with open(options['input'], encoding='utf-8') as fh:
+                        stats = self.run(fh, options)
+        except (ContentImportError, OSError) as exc:
+            raise CommandError(exc)
+        for label, counts in stats.items():
+            if any(counts.values()):
+                self.stdout.write(
+                    f"{label}: {counts['created']} created, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged"
+                )
+        self.stdout.write(self.style.SUCCESS('Import finished'))
+
+    def run(self, stream, options):
+        return import_ndjson(
+            stream, options['batch_size'],
+            rebuild_search_index=not options['skip_search_index']
+        )
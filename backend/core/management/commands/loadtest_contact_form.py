@@ -0,0 +1,79 @@
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+
+from core.models import Contact
+from core.throttling import get_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Flood POST /api/contact/ from a few clients and report how many submissions '
+        'reached the database. Everything is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--ips', type=int, default=10, help='Distinct client addresses')
+        parser.add_argument('--emails', type=int, default=20, help='Distinct sender addresses')
+        parser.add_argument(
+            '--messages', type=int, default=50,
+            help='Distinct message bodies; fewer means more exact duplicates'
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='testserver')
+        statuses = Counter()
+        queries = Counter()
+
+        def count_queries(execute, sql, params, many, context):
+            queries['insert' if sql.lstrip().upper().startswith('INSERT') else 'other'] += 1
+            return execute(sql, params, many, context)
+
+        inserts = 0
+        rejected_queries = 0
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), transaction.atomic():
+            get_cache().clear()
+            before = Contact.objects.count()
+            start = time.perf_counter()
+            for i in range(options['requests']):
+                data = {
+                    'name': 'Load Test',
+                    'email': f'sender{i % options["emails"]}@example.com',
+                    'inquiry_type': 'general',
+                    'subject': 'Hello',
+                    'message': f'Message number {i % options["messages"]}',
+                }
+                client_id = i % options['ips']
+                queries.clear()
+                with connection.execute_wrapper(count_queries):
+                    response = client.post(
+                        '/api/contact/', data, content_type='application/json',
+                        REMOTE_ADDR=f'10.{client_id >> 16 & 255}.{client_id >> 8 & 255}.{client_id & 255}'
+                    )
+                statuses[response.status_code] += 1
+                inserts += queries['insert']
+                if response.status_code != 201:
+                    rejected_queries += queries['insert'] + queries['other']
+            elapsed = time.perf_counter() - start
+            created = Contact.objects.count() - before
+            transaction.set_rollback(True)
+        get_cache().clear()
+
+        rates = settings.CONTACT_RATE_LIMITS
+        self.stdout.write(
+            f"{options['requests']} requests in {elapsed:.2f}s "
+            f"({options['requests'] / elapsed:.0f} req/s), limits ip={rates.get('ip')} "
+            f"email={rates.get('email')}"
+        )
+        self.stdout.write('Responses: ' + ', '.join(
+            f'{code}={count}' for code, count in sorted(statuses.items())
+        ))
+        self.stdout.write(
+            f'Contacts created: {created}, INSERT statements: {inserts}, '
+            f'queries for rejected requests: {rejected_queries}'
+        )
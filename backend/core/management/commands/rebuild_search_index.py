@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.search import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the /api/search/ inverted index from the database'
+
+    def handle(self, *args, **options):
+        search_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {len(search_index.documents)} documents '
+            f'({len(search_index.postings)} tokens) into {search_index.path}'
+        ))
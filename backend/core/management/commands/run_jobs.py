@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (email notifications etc.)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the jobs that are currently due and exit'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2)'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Ran {count} job(s)'))
+            return
+        self.stdout.write('Waiting for jobs (Ctrl+C to stop)')
+        try:
+            while True:
+                # As Django does around each request: drop a connection that
+                # is past CONN_MAX_AGE or was closed by the server meanwhile
+                close_old_connections()
+                if not run_pending(limit=100):
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.benchmarks import SCALES, BenchmarkError, check_database, flush_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Replace the synthetic benchmark rows with a dataset of the given scale, '
+        'or delete them with --flush. Real content is left alone.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+        for name in SCALES['small']:
+            parser.add_argument(
+                f'--{name}', type=int, metavar='N',
+                help=f'Override the number of {name} for the scale'
+            )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument(
+            '--skip-search-index', action='store_true',
+            help="Don't rebuild the /api/search/ index afterwards"
+        )
+        parser.add_argument('--flush', action='store_true', help='Only delete the synthetic rows')
+        parser.add_argument(
+            '--allow-non-debug', action='store_true',
+            help='Run even though DEBUG is off (make sure DATABASE_URL is not production)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            check_database(options['allow_non_debug'])
+        except BenchmarkError as exc:
+            raise CommandError(str(exc))
+        rebuild_search_index = not options['skip_search_index']
+        if options['flush']:
+            with transaction.atomic():
+                flush_dataset(rebuild_search_index)
+            self.stdout.write(self.style.SUCCESS('Deleted the synthetic rows'))
+            return
+
+        counts = dict(SCALES[options['scale']])
+        for name in counts:
+            if options[name] is not None:
+                counts[name] = options[name]
+        with transaction.atomic():
+            seed_dataset(
+                counts, options['batch_size'], options['seed'],
+                rebuild_search_index=rebuild_search_index, log=self.stdout.write
+            )
+        self.stdout.write(self.style.SUCCESS(f'Seeded the {options["scale"]} dataset'))
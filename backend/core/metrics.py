@@ -0,0 +1,229 @@
+"""
+In-process request metrics.
+
+MetricsMiddleware records, per route (URL name, the same for the sync and
+async views) and method, the wall time
+of every request, the number and duration of its database queries, the time
+spent rendering the response body and the response size into fixed-bucket
+histograms. `/api/metrics/` exposes them in the Prometheus text format
+(staff only) and, with REQUEST_METRICS_SERVER_TIMING, responses carry a
+`Server-Timing` header with the same numbers.
+
+Queries are counted by a database execute wrapper (the hook behind
+`connection.execute_wrapper()`) installed on every connection; it only does
+work while a request is being measured, which it finds through a context
+variable, so it also sees the queries that async views run in
+`sync_to_async` threads. Counters are kept per process: with several
+workers each scrape reports the worker that served it.
+"""
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from threading import Lock
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import renderers
+
+METRIC_PREFIX = 'core_http'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# name -> (help text, buckets)
+HISTOGRAMS = {
+    'request_duration_seconds': ('Request wall time', DURATION_BUCKETS),
+    'db_queries': ('Database queries per request', QUERY_COUNT_BUCKETS),
+    'db_duration_seconds': ('Time spent in database queries per request', DURATION_BUCKETS),
+    # Only the JSON encoding: serializer.data is built inside the view
+    'render_duration_seconds': ('Time spent rendering the response body', DURATION_BUCKETS),
+    'response_size_bytes': ('Response body size', SIZE_BUCKETS),
+}
+
+_current = ContextVar('core_request_timer', default=None)
+
+
+class RequestTimer:
+    """Measurements of the request being handled"""
+    __slots__ = ('start', 'queries', 'db_time', 'render_time')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; cumulated when exported
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def format_labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.series = {}
+            self.responses = Counter()
+
+    def record(self, route, method, status, values):
+        """Add one request's `values` (histogram name -> value)"""
+        with self.lock:
+            histograms = self.series.get((route, method))
+            if histograms is None:
+                histograms = self.series[(route, method)] = {
+                    name: Histogram(buckets) for name, (help_text, buckets) in HISTOGRAMS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+            self.responses[(route, method, status)] += 1
+
+    def render(self):
+        """The Prometheus text exposition of every metric"""
+        with self.lock:
+            series = sorted(self.series.items())
+            responses = sorted(self.responses.items())
+            lines = [
+                f'# HELP {METRIC_PREFIX}_responses_total Responses by route, method and status',
+                f'# TYPE {METRIC_PREFIX}_responses_total counter',
+            ]
+            for (route, method, status), count in responses:
+                labels = format_labels(route=route, method=method, status=status)
+                lines.append(f'{METRIC_PREFIX}_responses_total{{{labels}}} {count}')
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                metric = f'{METRIC_PREFIX}_{name}'
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+                for (route, method), histograms in series:
+                    lines.extend(histograms[name].samples(metric, format_labels(route=route, method=method)))
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def record_query(execute, sql, params, many, context):
+    timer = _current.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.queries += 1
+        timer.db_time += time.perf_counter() - start
+
+
+def add_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorder():
+    """Wrap the queries of current and future database connections"""
+    connection_created.connect(add_query_recorder, dispatch_uid='core.metrics.record_query')
+    for connection in connections.all(initialized_only=True):
+        add_query_recorder(connection)
+
+
+class TimedJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer that adds its time to the current request's metrics"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        timer = _current.get()
+        if timer is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            timer.render_time += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """Record every request in `registry`; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = settings.REQUEST_METRICS_SERVER_TIMING
+        install_query_recorder()
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timer = RequestTimer()
+        token = _current.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timer)
+
+    async def __acall__(self, request):
+        timer = RequestTimer()
+        token = _current.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timer)
+
+    def finish(self, request, response, timer):
+        duration = time.perf_counter() - timer.start
+        match = request.resolver_match
+        route = (match.view_name or match.route) if match else 'unmatched'
+        if response.streaming:
+            size = int(response.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        registry.record(route, request.method, response.status_code, {
+            'request_duration_seconds': duration,
+            'db_queries': timer.queries,
+            'db_duration_seconds': timer.db_time,
+            'render_duration_seconds': timer.render_time,
+            'response_size_bytes': size,
+        })
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'db;dur={timer.db_time * 1000:.2f};desc="{timer.queries} queries", '
+                f'render;dur={timer.render_time * 1000:.2f}, '
+                f'total;dur={duration * 1000:.2f}'
+            )
+        return response
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=250)),
+                ('slug', models.SlugField(blank=True, max_length=250, unique=True)),
+                ('excerpt', models.TextField(blank=True)),
+                ('content', models.TextField()),
+                ('author', models.CharField(blank=True, max_length=200)),
+                ('featured_image', models.ImageField(blank=True, null=True, upload_to='blog/')),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('is_published', models.BooleanField(default=False)),
+                ('read_time', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'verbose_name': 'Blog Post',
+                'verbose_name_plural': 'Blog Posts',
+                'ordering': ['-published_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobOpening',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('department', models.CharField(blank=True, max_length=200)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('employment_type', models.CharField(blank=True, max_length=100)),
+                ('salary', models.CharField(blank=True, max_length=100)),
+                ('experience', models.CharField(blank=True, max_length=100)),
+                ('posted_at', models.DateTimeField(auto_now_add=True)),
+                ('description', models.TextField()),
+                ('requirements', models.TextField(blank=True, help_text='One requirement per line')),
+                ('benefits', models.TextField(blank=True, help_text='One benefit per line')),
+                ('is_active', models.BooleanField(default=True)),
+                ('slug', models.SlugField(blank=True, max_length=200, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Job Opening',
+                'verbose_name_plural': 'Job Openings',
+                'ordering': ['-posted_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:27
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core import search_sql
+
+# (table, [(column, weight), ...]) for each searchable model. Keep in sync
+# with the search_fields of the matching viewset in core/views.py.
+SEARCH_DOCUMENTS = [
+    ('core_blogpost', [('title', 'A'), ('category', 'B'), ('excerpt', 'B'), ('content', 'C')]),
+    ('core_portfolio', [('title', 'A'), ('technologies', 'B'), ('client_company', 'B'), ('short_description', 'C')]),
+    ('core_service', [('title', 'A'), ('technologies', 'B'), ('short_description', 'C')]),
+]
+
+
+def create_search_triggers(apps, schema_editor):
+    search_sql.create_search_triggers(schema_editor, SEARCH_DOCUMENTS)
+
+
+def drop_search_triggers(apps, schema_editor):
+    search_sql.drop_search_triggers(schema_editor, SEARCH_DOCUMENTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_blogpost_jobopening'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='portfolio',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
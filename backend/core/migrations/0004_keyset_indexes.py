@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['-published_at', '-id'], name='blogpost_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['-submitted_at', '-id'], name='contact_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolio',
+            index=models.Index(fields=['-featured', 'order', '-project_date', 'id'], name='portfolio_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blogpost',
+            name='blogpost_keyset_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='portfolio',
+            name='portfolio_keyset_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', '-id'], name='blogpost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-posted_at'], name='jobopening_active_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolio',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-featured', 'order', '-project_date', 'id'], name='portfolio_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'title'], name='service_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='teammember_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-featured', 'order', '-created_at'], name='testimonial_active_order_idx'),
+        ),
+    ]
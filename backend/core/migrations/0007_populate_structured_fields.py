@@ -0,0 +1,55 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+# (model, [(source field, parsed field, separator), ...])
+LIST_FIELDS = [
+    ('Service', [('technologies', 'technologies_list', ','), ('process_steps', 'process_steps_list', '\n')]),
+    ('Portfolio', [('technologies', 'technologies_list', ',')]),
+    ('TeamMember', [('skills', 'skills_list', ',')]),
+    ('CompanyInfo', [('values', 'values_list', '\n')]),
+    ('JobOpening', [('requirements', 'requirements_list', '\n'), ('benefits', 'benefits_list', '\n')]),
+]
+TAGGED_MODELS = ['Service', 'Portfolio']
+
+
+def split_list(text, separator):
+    return [item.strip() for item in (text or '').split(separator) if item.strip()]
+
+
+def populate(apps, schema_editor):
+    for model_name, fields in LIST_FIELDS:
+        Model = apps.get_model('core', model_name)
+        objects = list(Model.objects.all())
+        for obj in objects:
+            for source, target, separator in fields:
+                setattr(obj, target, split_list(getattr(obj, source), separator))
+        Model.objects.bulk_update(objects, [target for source, target, separator in fields], batch_size=500)
+
+    Technology = apps.get_model('core', 'Technology')
+    tags = {}
+    for model_name in TAGGED_MODELS:
+        Model = apps.get_model('core', model_name)
+        Through = Model.technology_tags.through
+        links = []
+        for obj in Model.objects.all():
+            for name in obj.technologies_list:
+                slug = slugify(name)
+                if not slug:
+                    continue
+                if slug not in tags:
+                    tags[slug] = Technology.objects.get_or_create(slug=slug, defaults={'name': name})[0]
+                links.append(Through(**{
+                    f'{model_name.lower()}_id': obj.pk, 'technology_id': tags[slug].pk
+                }))
+        Through.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_structured_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
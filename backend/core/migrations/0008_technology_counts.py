@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+def count_tags(apps, schema_editor):
+    Technology = apps.get_model('core', 'Technology')
+    tags = list(Technology.objects.annotate(
+        active_services=models.Count(
+            'services', filter=models.Q(services__is_active=True), distinct=True
+        ),
+        active_portfolio_items=models.Count(
+            'portfolio_items', filter=models.Q(portfolio_items__is_active=True), distinct=True
+        ),
+    ))
+    for tag in tags:
+        tag.service_count = tag.active_services
+        tag.portfolio_count = tag.active_portfolio_items
+    Technology.objects.bulk_update(tags, ['service_count', 'portfolio_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_populate_structured_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='technology',
+            name='portfolio_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='technology',
+            name='service_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('inquiry_type', models.CharField(choices=[('consultation', 'Free Consultation'), ('quote', 'Request Quote'), ('support', 'Support'), ('general', 'General Inquiry')], max_length=20)),
+                ('status', models.CharField(choices=[('new', 'New'), ('in_progress', 'In Progress'), ('responded', 'Responded'), ('closed', 'Closed')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contact Daily Stat',
+                'verbose_name_plural': 'Contact Daily Stats',
+                'ordering': ['day', 'inquiry_type', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'inquiry_type', 'status'), name='contactdailystat_unique')],
+            },
+        ),
+    ]
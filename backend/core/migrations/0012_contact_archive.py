@@ -0,0 +1,69 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:07
+
+import django.contrib.postgres.search
+import django.utils.timezone
+from django.db import migrations, models
+
+from core import search_sql
+
+# Keep in sync with the search_fields of ArchivedContactViewSet
+SEARCH_DOCUMENTS = [
+    ('core_archivedcontact', [('name', 'A'), ('email', 'A'), ('company', 'B'), ('subject', 'B'), ('message', 'C')]),
+]
+
+
+def create_search_trigger(apps, schema_editor):
+    search_sql.create_search_triggers(schema_editor, SEARCH_DOCUMENTS)
+
+
+def drop_search_trigger(apps, schema_editor):
+    search_sql.drop_search_triggers(schema_editor, SEARCH_DOCUMENTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_contact_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedContact',
+            fields=[
+                ('name', models.CharField(max_length=200)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('company', models.CharField(blank=True, max_length=200)),
+                ('inquiry_type', models.CharField(choices=[('consultation', 'Free Consultation'), ('quote', 'Request Quote'), ('support', 'Support'), ('general', 'General Inquiry')], default='general', max_length=20)),
+                ('subject', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('budget', models.CharField(blank=True, max_length=100)),
+                ('timeline', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('new', 'New'), ('in_progress', 'In Progress'), ('responded', 'Responded'), ('closed', 'Closed')], default='new', max_length=20)),
+                ('admin_notes', models.TextField(blank=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('submitted_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Contact Submission',
+                'verbose_name_plural': 'Archived Contact Submissions',
+                'ordering': ['-submitted_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['status', 'submitted_at'], name='contact_status_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcontact',
+            index=models.Index(fields=['-submitted_at', '-id'], name='archivedcontact_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcontact',
+            index=models.Index(fields=['email'], name='archivedcontact_email_idx'),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
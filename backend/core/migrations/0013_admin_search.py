@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:14
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core import search_sql
+
+# (table, [(column, weight), ...]) for the admin search of each model. Keep
+# in sync with the search_fields of the matching ModelAdmin in core/admin.py.
+SEARCH_DOCUMENTS = [
+    ('core_contact', [('name', 'A'), ('email', 'A'), ('company', 'B'), ('subject', 'B'), ('message', 'C')]),
+    ('core_testimonial', [('client_name', 'A'), ('client_company', 'A'), ('review', 'C')]),
+]
+
+
+def create_search_triggers(apps, schema_editor):
+    search_sql.create_search_triggers(schema_editor, SEARCH_DOCUMENTS)
+
+
+def drop_search_triggers(apps, schema_editor):
+    search_sql.drop_search_triggers(schema_editor, SEARCH_DOCUMENTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_contact_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
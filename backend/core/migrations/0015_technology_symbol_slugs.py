@@ -0,0 +1,60 @@
+from django.db import migrations
+from django.db.models import Count, Q
+from django.utils.text import slugify
+
+TAGGED_MODELS = ['Service', 'Portfolio']
+
+
+def technology_slug(name):
+    # Frozen copy of core.models.technology_slug
+    name = name.strip()
+    if name.startswith('.'):
+        name = 'dot ' + name[1:]
+    return slugify(name.replace('+', ' plus ').replace('#', ' sharp '))
+
+
+def reslug(apps, schema_editor):
+    """Give C++, C#, .NET ... their own tags and relink every item"""
+    Technology = apps.get_model('core', 'Technology')
+    for tag in Technology.objects.all():
+        slug = technology_slug(tag.name)
+        if slug and slug != tag.slug and not Technology.objects.filter(slug=slug).exists():
+            tag.slug = slug
+            tag.save(update_fields=['slug'])
+
+    tags = {tag.slug: tag for tag in Technology.objects.all()}
+    for model_name in TAGGED_MODELS:
+        Model = apps.get_model('core', model_name)
+        Through = Model.technology_tags.through
+        column = f'{model_name.lower()}_id'
+        links = []
+        for obj in Model.objects.all():
+            for name in obj.technologies_list:
+                slug = technology_slug(name)
+                if not slug:
+                    continue
+                if slug not in tags:
+                    tags[slug] = Technology.objects.create(slug=slug, name=name)
+                links.append(Through(**{column: obj.pk, 'technology_id': tags[slug].pk}))
+        Through.objects.all().delete()
+        Through.objects.bulk_create(links, ignore_conflicts=True, batch_size=500)
+
+    counted = list(Technology.objects.annotate(
+        active_services=Count('services', filter=Q(services__is_active=True), distinct=True),
+        active_portfolio_items=Count('portfolio_items', filter=Q(portfolio_items__is_active=True), distinct=True),
+    ))
+    for tag in counted:
+        tag.service_count = tag.active_services
+        tag.portfolio_count = tag.active_portfolio_items
+    Technology.objects.bulk_update(counted, ['service_count', 'portfolio_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_cache_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(reslug, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,111 @@
-from django.db import models
+import time
+from copy import copy
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import DatabaseError, IntegrityError, models, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .cache import aget_versions, bump_version, get_versions, versions_in_database
+
+
+def split_list(text, separator):
+    """Split a comma or newline separated text field into a clean list"""
+    return [item.strip() for item in (text or '').split(separator) if item.strip()]
+
+
+def technology_slug(name):
+    """
+    Slug of a technology name. Symbols are spelled out first, since slugify
+    alone turns C, C++ and C# all into "c" and .NET into "net".
+    """
+    name = name.strip()
+    if name.startswith('.'):
+        name = 'dot ' + name[1:]
+    return slugify(name.replace('+', ' plus ').replace('#', ' sharp '))
+
+
+class Technology(models.Model):
+    """Technology tag shared by services and portfolio items"""
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    
+    # Number of active items using the tag, kept up to date by
+    # refresh_counts() so facet lists don't need a GROUP BY
+    service_count = models.PositiveIntegerField(default=0, editable=False)
+    portfolio_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Technology'
+        verbose_name_plural = 'Technologies'
+    
+    @classmethod
+    def from_names(cls, names):
+        """Return the tags for `names`, creating any that don't exist yet"""
+        by_slug = {}
+        for name in names:
+            slug = technology_slug(name)
+            if slug:
+                by_slug.setdefault(slug, name)
+        existing = set(cls.objects.filter(slug__in=by_slug).values_list('slug', flat=True))
+        cls.objects.bulk_create(
+            [cls(name=name, slug=slug) for slug, name in by_slug.items() if slug not in existing],
+            ignore_conflicts=True
+        )
+        return list(cls.objects.filter(slug__in=by_slug))
+    
+    @classmethod
+    def refresh_counts(cls, ids):
+        """Recount active services and portfolio items for the given tags"""
+        if not ids:
+            return
+        tags = list(cls.objects.filter(id__in=ids).annotate(
+            active_services=models.Count(
+                'services', filter=models.Q(services__is_active=True), distinct=True
+            ),
+            active_portfolio_items=models.Count(
+                'portfolio_items', filter=models.Q(portfolio_items__is_active=True), distinct=True
+            ),
+        ))
+        for tag in tags:
+            tag.service_count = tag.active_services
+            tag.portfolio_count = tag.active_portfolio_items
+        cls.objects.bulk_update(tags, ['service_count', 'portfolio_count'])
+    
+    def __str__(self):
+        return self.name
+
+
+class TaggedQuerySet(models.QuerySet):
+    """
+    QuerySet of services and portfolio items. An update() of `is_active`
+    (including bulk_update(), which goes through it) sends no signals, so it
+    recounts the affected Technology tags itself.
+    """
+    
+    def update(self, **kwargs):
+        if 'is_active' not in kwargs:
+            return super().update(**kwargs)
+        # Read before the update: it may change which rows match the filter
+        tag_ids = set(self.model.technology_tags.through.objects.filter(
+            **{f'{self.model._meta.model_name}__in': self.values('pk')}
+        ).values_list('technology_id', flat=True))
+        updated = super().update(**kwargs)
+        if updated:
+            Technology.refresh_counts(tag_ids)
+        return updated
+
+
+def sync_technology_tags(instance):
+    """Point instance.technology_tags at its technologies_list and recount"""
+    previous = set(instance.technology_tags.values_list('id', flat=True))
+    tags = Technology.from_names(instance.technologies_list)
+    instance.technology_tags.set(tags)
+    Technology.refresh_counts(previous | {tag.id for tag in tags})
+
 
 class Service(models.Model):
     """Services offered by the company"""
@@ -10,6 +115,8 @@ class Service(models.Model):
     full_description = models.TextField()
     icon = models.CharField(max_length=100, help_text="Icon class name (e.g., 'fas fa-laptop-code')")
     image = models.ImageField(upload_to='services/', blank=True, null=True)
+    # Responsive WebP/AVIF copies of the images above (see core/images.py)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # Technologies used
     technologies = models.TextField(help_text="Comma-separated list of technologies")
@@ -20,6 +127,13 @@ class Service(models.Model):
         blank=True
     )
     
+    # Parsed from the text fields above on save
+    technologies_list = models.JSONField(default=list, blank=True, editable=False)
+    process_steps_list = models.JSONField(default=list, blank=True, editable=False)
+    technology_tags = models.ManyToManyField(
+        Technology, blank=True, editable=False, related_name='services'
+    )
+    
     # Pricing
     pricing_info = models.CharField(
         max_length=200,
@@ -34,18 +148,36 @@ class Service(models.Model):
     order = models.IntegerField(default=0, help_text="Display order")
     is_active = models.BooleanField(default=True)
     
+    # Full-text search document, maintained by a database trigger on
+    # PostgreSQL (see migration 0003); unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TaggedQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', 'title']
+        indexes = [
+            models.Index(
+                fields=['order', 'title'], condition=models.Q(is_active=True),
+                name='service_active_order_idx'
+            ),
+        ]
         verbose_name = 'Service'
         verbose_name_plural = 'Services'
     
-    def save(self, *args, **kwargs):
+    def set_derived_fields(self):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.technologies_list = split_list(self.technologies, ',')
+        self.process_steps_list = split_list(self.process_steps, '\n')
+    
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
         super().save(*args, **kwargs)
+        sync_technology_tags(self)
     
     def __str__(self):
         return self.title
@@ -75,9 +207,15 @@ class Portfolio(models.Model):
     image1 = models.ImageField(upload_to='portfolio/images/', blank=True, null=True)
     image2 = models.ImageField(upload_to='portfolio/images/', blank=True, null=True)
     image3 = models.ImageField(upload_to='portfolio/images/', blank=True, null=True)
+    # Responsive WebP/AVIF copies of the images above (see core/images.py)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # Tech stack
     technologies = models.TextField(help_text="Comma-separated list of technologies")
+    technologies_list = models.JSONField(default=list, blank=True, editable=False)
+    technology_tags = models.ManyToManyField(
+        Technology, blank=True, editable=False, related_name='portfolio_items'
+    )
     
     # Links
     live_url = models.URLField(blank=True, help_text="Live demo URL")
@@ -92,18 +230,37 @@ class Portfolio(models.Model):
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     
+    # Full-text search document, maintained by a database trigger on
+    # PostgreSQL (see migration 0003); unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TaggedQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-featured', 'order', '-project_date']
+        indexes = [
+            # Default ordering of active items, with the keyset pagination
+            # tie-breaker (core.pagination)
+            models.Index(
+                fields=['-featured', 'order', '-project_date', 'id'], condition=models.Q(is_active=True),
+                name='portfolio_active_order_idx'
+            ),
+        ]
         verbose_name = 'Portfolio Item'
         verbose_name_plural = 'Portfolio Items'
     
-    def save(self, *args, **kwargs):
+    def set_derived_fields(self):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.technologies_list = split_list(self.technologies, ',')
+    
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
         super().save(*args, **kwargs)
+        sync_technology_tags(self)
     
     def __str__(self):
         return self.title
@@ -118,6 +275,8 @@ class Testimonial(models.Model):
     client_company = models.CharField(max_length=200)
     client_country = models.CharField(max_length=100, blank=True)
     client_photo = models.ImageField(upload_to='testimonials/', blank=True, null=True)
+    # Responsive WebP/AVIF copies of the images above (see core/images.py)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # Review content
     review = models.TextField()
@@ -150,11 +309,21 @@ class Testimonial(models.Model):
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     
+    # Full-text search document for the admin, maintained by a database
+    # trigger on PostgreSQL (see migration 0013); unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-featured', 'order', '-created_at']
+        indexes = [
+            models.Index(
+                fields=['-featured', 'order', '-created_at'], condition=models.Q(is_active=True),
+                name='testimonial_active_order_idx'
+            ),
+        ]
         verbose_name = 'Testimonial'
         verbose_name_plural = 'Testimonials'
     
@@ -162,8 +331,8 @@ class Testimonial(models.Model):
         return f"{self.client_name} - {self.client_company}"
 
 
-class Contact(models.Model):
-    """Contact form submissions"""
+class BaseContact(models.Model):
+    """Fields shared by contact submissions and their archived copies"""
     INQUIRY_TYPE = [
         ('consultation', 'Free Consultation'),
         ('quote', 'Request Quote'),
@@ -202,13 +371,152 @@ class Contact(models.Model):
     # Notes (for admin)
     admin_notes = models.TextField(blank=True)
     
+    # Full-text search document for the admin and /api/contact-archive/,
+    # maintained by a database trigger on PostgreSQL (see migrations 0012 and
+    # 0013); unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    class Meta:
+        abstract = True
+    
+    def __str__(self):
+        return f"{self.name} - {self.inquiry_type} - {self.submitted_at.strftime('%Y-%m-%d')}"
+
+
+class Contact(BaseContact):
+    """Contact form submissions"""
+    
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Keyset pagination (core.pagination)
+            models.Index(fields=['-submitted_at', '-id'], name='contact_keyset_idx'),
+            # Finding old closed submissions to archive (core.archive)
+            models.Index(fields=['status', 'submitted_at'], name='contact_status_submitted_idx'),
+        ]
         verbose_name = 'Contact Submission'
         verbose_name_plural = 'Contact Submissions'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the row is counted under in ContactDailyStat, to move it on save
+        instance._stat_key = instance.stat_key()
+        return instance
+    
+    def stat_key(self):
+        """(day, inquiry_type, status) this contact counts towards"""
+        if self.submitted_at is None:
+            return None
+        return (timezone.localdate(self.submitted_at), self.inquiry_type, self.status)
+
+
+class ArchivedContact(BaseContact):
+    """
+    A contact submission moved out of the Contact table by core.archive,
+    keeping its id and timestamps. Read-only.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    submitted_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-submitted_at']
+        indexes = [
+            # Keyset pagination (core.pagination)
+            models.Index(fields=['-submitted_at', '-id'], name='archivedcontact_keyset_idx'),
+            models.Index(fields=['email'], name='archivedcontact_email_idx'),
+        ]
+        verbose_name = 'Archived Contact Submission'
+        verbose_name_plural = 'Archived Contact Submissions'
+
+
+class ContactDailyStat(models.Model):
+    """
+    Number of contact submissions received per day, inquiry type and
+    status. Kept up to date by the Contact save/delete signals, so inbox
+    statistics never scan the Contact table; rebuild() recounts everything.
+    Archiving a contact doesn't change the counts.
+    """
+    day = models.DateField()
+    inquiry_type = models.CharField(max_length=20, choices=Contact.INQUIRY_TYPE)
+    status = models.CharField(max_length=20, choices=Contact.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['day', 'inquiry_type', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'inquiry_type', 'status'], name='contactdailystat_unique'),
+        ]
+        verbose_name = 'Contact Daily Stat'
+        verbose_name_plural = 'Contact Daily Stats'
+    
+    @classmethod
+    def apply(cls, changes):
+        """Add each `{(day, inquiry_type, status): delta}` to its count"""
+        for (day, inquiry_type, status), delta in changes.items():
+            if not delta:
+                continue
+            key = {'day': day, 'inquiry_type': inquiry_type, 'status': status}
+            if cls.objects.filter(**key).update(count=models.F('count') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(count=delta, **key)
+            except IntegrityError:
+                # Created by a concurrent request since the update
+                cls.objects.filter(**key).update(count=models.F('count') + delta)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recount every day from the Contact and ArchivedContact tables"""
+        counts = {}
+        for model in (Contact, ArchivedContact):
+            rows = (
+                model.objects.order_by()
+                .values('inquiry_type', 'status', submitted_on=TruncDate('submitted_at'))
+                .annotate(total=models.Count('id'))
+                .values_list('submitted_on', 'inquiry_type', 'status', 'total')
+            )
+            for day, inquiry_type, status, total in rows:
+                key = (day, inquiry_type, status)
+                counts[key] = counts.get(key, 0) + total
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [cls(day=day, inquiry_type=inquiry_type, status=status, count=total)
+                 for (day, inquiry_type, status), total in counts.items()],
+                batch_size=1000
+            )
+        return len(counts)
+    
     def __str__(self):
-        return f"{self.name} - {self.inquiry_type} - {self.submitted_at.strftime('%Y-%m-%d')}"
+        return f"{self.day} {self.inquiry_type}/{self.status}: {self.count}"
+
+
+def update_contact_status(queryset, status):
+    """
+    Set the status of the contacts in `queryset` with a single UPDATE,
+    moving their counts in ContactDailyStat; returns the number changed
+    """
+    with transaction.atomic():
+        changing = queryset.exclude(status=status)
+        groups = (
+            changing.order_by()
+            .values('inquiry_type', 'status', submitted_on=TruncDate('submitted_at'))
+            .annotate(total=models.Count('id'))
+            .values_list('submitted_on', 'inquiry_type', 'status', 'total')
+        )
+        changes = {}
+        for day, inquiry_type, previous, total in groups:
+            changes[(day, inquiry_type, previous)] = changes.get((day, inquiry_type, previous), 0) - total
+            changes[(day, inquiry_type, status)] = changes.get((day, inquiry_type, status), 0) + total
+        updated = changing.update(status=status, updated_at=timezone.now())
+        ContactDailyStat.apply(changes)
+    # update() sends no signals
+    bump_version(Contact)
+    return updated
 
 
 class CompanyInfo(models.Model):
@@ -223,6 +531,7 @@ class CompanyInfo(models.Model):
     mission = models.TextField(blank=True)
     vision = models.TextField(blank=True)
     values = models.TextField(blank=True, help_text="Company values, one per line")
+    values_list = models.JSONField(default=list, blank=True, editable=False)
     
     # Contact details
     email = models.EmailField()
@@ -256,15 +565,84 @@ class CompanyInfo(models.Model):
         verbose_name = 'Company Information'
         verbose_name_plural = 'Company Information'
     
+    def set_derived_fields(self):
+        self.values_list = split_list(self.values, '\n')
+    
     def save(self, *args, **kwargs):
         # Ensure only one instance exists
         self.pk = 1
+        self.set_derived_fields()
         super().save(*args, **kwargs)
+        # This worker sees its own change right away
+        CompanyInfo._snapshot = None
+    
+    # Process-local (cache version, loaded at, instance) snapshot served by load()
+    _snapshot = None
+    
+    @classmethod
+    def _current_version(cls):
+        # With the versions in the CacheVersion table, checking one would
+        # cost a query per request, as much as reading the row itself; the
+        # snapshot is then trusted for COMPANY_INFO_MAX_AGE seconds instead
+        if versions_in_database():
+            return None
+        version, = get_versions([cls])
+        return version
+    
+    @classmethod
+    def _snapshot_for(cls, version):
+        snapshot = cls._snapshot
+        if snapshot is None or snapshot[0] != version:
+            return None
+        # Also reloaded now and then, in case a change never bumped the
+        # version (QuerySet.update(), a save in another worker, a counter
+        # lost with the cache)
+        if time.monotonic() - snapshot[1] >= settings.COMPANY_INFO_MAX_AGE:
+            return None
+        return snapshot
     
     @classmethod
     def load(cls):
-        obj, created = cls.objects.get_or_create(pk=1)
-        return obj
+        """
+        Return the singleton. It is read from the database only when the
+        CompanyInfo cache version in the shared cache has changed since the
+        last read, or the snapshot is older than COMPANY_INFO_MAX_AGE
+        seconds. With the versions in the database (no shared cache, see
+        core/cache.py) only the age is checked, so a save in another worker
+        shows up within COMPANY_INFO_MAX_AGE.
+        """
+        version = cls._current_version()
+        snapshot = cls._snapshot_for(version)
+        if snapshot is None:
+            obj, created = cls.objects.get_or_create(pk=1)
+            if created and version is not None:
+                # Creating the row bumped the version
+                version, = get_versions([cls])
+            snapshot = cls._snapshot = (version, time.monotonic(), obj)
+        return copy(snapshot[2])
+    
+    @classmethod
+    async def aload(cls):
+        version = None
+        if not versions_in_database():
+            version, = await aget_versions([cls])
+        snapshot = cls._snapshot_for(version)
+        if snapshot is None:
+            obj, created = await cls.objects.aget_or_create(pk=1)
+            if created and version is not None:
+                version, = await aget_versions([cls])
+            snapshot = cls._snapshot = (version, time.monotonic(), obj)
+        return copy(snapshot[2])
+    
+    @classmethod
+    def prewarm(cls):
+        """Load the snapshot ahead of the first request (see backend/wsgi.py)"""
+        try:
+            cls.load()
+        except DatabaseError:
+            # Not migrated yet, or the database is unreachable; load() will
+            # try again on the first request
+            pass
     
     def __str__(self):
         return self.company_name
@@ -276,6 +654,8 @@ class TeamMember(models.Model):
     position = models.CharField(max_length=200)
     bio = models.TextField(blank=True)
     photo = models.ImageField(upload_to='team/')
+    # Responsive WebP/AVIF copies of the images above (see core/images.py)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # Social links
     linkedin_url = models.URLField(blank=True)
@@ -284,6 +664,7 @@ class TeamMember(models.Model):
     
     # Skills
     skills = models.TextField(help_text="Comma-separated list of skills", blank=True)
+    skills_list = models.JSONField(default=list, blank=True, editable=False)
     
     # Display
     order = models.IntegerField(default=0)
@@ -294,9 +675,22 @@ class TeamMember(models.Model):
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(
+                fields=['order', 'name'], condition=models.Q(is_active=True),
+                name='teammember_active_order_idx'
+            ),
+        ]
         verbose_name = 'Team Member'
         verbose_name_plural = 'Team Members'
     
+    def set_derived_fields(self):
+        self.skills_list = split_list(self.skills, ',')
+    
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.name} - {self.position}"
 
@@ -313,24 +707,31 @@ class JobOpening(models.Model):
     description = models.TextField()
     requirements = models.TextField(blank=True, help_text="One requirement per line")
     benefits = models.TextField(blank=True, help_text="One benefit per line")
+    requirements_list = models.JSONField(default=list, blank=True, editable=False)
+    benefits_list = models.JSONField(default=list, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
 
     class Meta:
         ordering = ['-posted_at']
+        indexes = [
+            models.Index(
+                fields=['-posted_at'], condition=models.Q(is_active=True),
+                name='jobopening_active_posted_idx'
+            ),
+        ]
         verbose_name = 'Job Opening'
         verbose_name_plural = 'Job Openings'
 
-    def save(self, *args, **kwargs):
+    def set_derived_fields(self):
         if not self.slug:
             self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
-
-    def requirements_list(self):
-        return [r.strip() for r in self.requirements.split('\n') if r.strip()]
+        self.requirements_list = split_list(self.requirements, '\n')
+        self.benefits_list = split_list(self.benefits, '\n')
 
-    def benefits_list(self):
-        return [b.strip() for b in self.benefits.split('\n') if b.strip()]
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -344,20 +745,89 @@ class BlogPost(models.Model):
     content = models.TextField()
     author = models.CharField(max_length=200, blank=True)
     featured_image = models.ImageField(upload_to='blog/', blank=True, null=True)
+    # Responsive WebP/AVIF copies of the images above (see core/images.py)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     category = models.CharField(max_length=100, blank=True)
     published_at = models.DateTimeField(null=True, blank=True)
     is_published = models.BooleanField(default=False)
     read_time = models.CharField(max_length=50, blank=True)
+    # Full-text search document, maintained by a database trigger on
+    # PostgreSQL (see migration 0003); unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            # Default ordering of published posts, with the keyset
+            # pagination tie-breaker (core.pagination)
+            models.Index(
+                fields=['-published_at', '-id'], condition=models.Q(is_published=True),
+                name='blogpost_published_idx'
+            ),
+        ]
         verbose_name = 'Blog Post'
         verbose_name_plural = 'Blog Posts'
 
-    def save(self, *args, **kwargs):
+    def set_derived_fields(self):
         if not self.slug:
             self.slug = slugify(self.title)
+
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
+
+
+
+class BackgroundJob(models.Model):
+    """Database-backed job queue entry (see core/jobs.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('dead', 'Dead'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(
+                fields=['run_after', 'id'], condition=models.Q(status='pending'),
+                name='backgroundjob_pending_idx'
+            ),
+        ]
+        verbose_name = 'Background Job'
+        verbose_name_plural = 'Background Jobs'
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class CacheVersion(models.Model):
+    """
+    Cache version counter of one model, used by core.cache when the cache
+    itself is local to each process, so every worker sees every bump
+    """
+    label = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField()
+    
+    class Meta:
+        verbose_name = 'Cache Version'
+        verbose_name_plural = 'Cache Versions'
+    
+    def __str__(self):
+        return f"{self.label} v{self.version}"
@@ -0,0 +1,411 @@
+"""
+Streaming NDJSON import/export of the site content.
+
+Each line is one object: `{"model": "core.portfolio", "fields": {...}}`.
+Objects are identified by a natural key (the slug for most models) instead
+of a primary key, and `Testimonial.project` refers to the portfolio item's
+slug, so a file can be moved between databases. Objects must come after
+the ones they refer to, as export_ndjson() writes them.
+
+Testimonials (client name and company) and team members (name) have no
+unique natural key, so their records also carry the `id`: among the rows
+sharing the natural key, the one with that id is updated. A record that
+still matches several rows, or a row matched by two records, is reported
+as a ContentImportError rather than overwriting an arbitrary row.
+
+Timestamps (`created_at`, `updated_at`, `posted_at`) are exported and, when
+a record gives them, kept on import instead of being reset to the import
+time. A foreign key may be given by its attname (`project_id`) as a primary
+key instead of a natural key.
+
+Importing is an upsert: objects whose key already exists are updated
+(only the fields present in the file change), the rest are created, so
+importing the same file twice changes nothing. Rows are read and written in
+batches with bulk_create/bulk_update rather than one save() per object, so
+memory use doesn't grow with the file. Model signals don't fire; slugs and
+the other derived fields are set with `set_derived_fields()`, technology
+tags are synced per batch, and cache versions, tag counts, the search index
+and the API snapshot are refreshed once at the end.
+
+Django fixtures (a JSON array with primary keys, like demo_data.json) are
+accepted too; those are loaded whole, so keep them small.
+"""
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import (
+    BlogPost, CompanyInfo, JobOpening, Portfolio, Service, TeamMember, Technology, Testimonial,
+    technology_slug
+)
+from .search import search_index
+from .snapshots import schedule_refresh
+
+
+class ContentImportError(ValueError):
+    """A record that can't be imported"""
+
+
+class ContentModel:
+    """How one model is keyed and which of its fields are derived"""
+
+    def __init__(self, model, key, derived=(), foreign_keys=None, defaults=None, unique_key=True):
+        self.model = model
+        self.key = key
+        # Whether `key` identifies one row; if not, exported records carry the id
+        self.unique_key = unique_key
+        self.derived = list(derived)
+        # field name -> (related model, natural key field)
+        self.foreign_keys = foreign_keys or {}
+        # values every imported object gets (e.g. the CompanyInfo singleton's pk)
+        self.defaults = defaults or {}
+        self.tagged = any(field.name == 'technology_tags' for field in model._meta.many_to_many)
+        # auto_now/auto_now_add fields aren't editable but are part of the content
+        self.timestamps = [
+            field.name for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        ]
+        self.fields = {
+            field.name: field for field in model._meta.concrete_fields
+            if (field.editable or field.name in self.timestamps) and not field.primary_key
+        }
+        # `project_id` -> `project`
+        self.attnames = {
+            field.attname: name for name, field in self.fields.items() if field.attname != name
+        }
+        self.has_updated_at = any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+    def field_name(self, name):
+        return self.attnames.get(name, name)
+
+    @property
+    def label(self):
+        return self.model._meta.label_lower
+
+    def get_key(self, obj):
+        return tuple(getattr(obj, name) for name in self.key)
+
+    def key_filter(self, keys):
+        if len(self.key) == 1:
+            return Q(**{f'{self.key[0]}__in': [key[0] for key in keys]})
+        condition = Q(pk__in=[])
+        for key in keys:
+            condition |= Q(**dict(zip(self.key, key)))
+        return condition
+
+
+# In dependency order: portfolio items before the testimonials that refer to them
+CONTENT_MODELS = [
+    ContentModel(CompanyInfo, key=['id'], derived=['values_list'], defaults={'id': 1}),
+    ContentModel(Service, key=['slug'], derived=['slug', 'technologies_list', 'process_steps_list']),
+    ContentModel(Portfolio, key=['slug'], derived=['slug', 'technologies_list']),
+    ContentModel(
+        Testimonial, key=['client_name', 'client_company'],
+        foreign_keys={'project': (Portfolio, 'slug')}, unique_key=False
+    ),
+    ContentModel(TeamMember, key=['name'], derived=['skills_list'], unique_key=False),
+    ContentModel(JobOpening, key=['slug'], derived=['slug', 'requirements_list', 'benefits_list']),
+    ContentModel(BlogPost, key=['slug'], derived=['slug']),
+]
+CONTENT_MODELS_BY_LABEL = {content_model.label: content_model for content_model in CONTENT_MODELS}
+
+
+def export_ndjson(stream, labels=None, batch_size=1000):
+    """Write the content of `labels` (default: every content model) to `stream`"""
+    counts = {}
+    for content_model in CONTENT_MODELS:
+        if labels and content_model.label not in labels:
+            continue
+        queryset = content_model.model.objects.order_by('pk')
+        for name in content_model.foreign_keys:
+            queryset = queryset.select_related(name)
+        count = 0
+        for obj in queryset.iterator(chunk_size=batch_size):
+            fields = {} if content_model.unique_key else {'id': obj.pk}
+            for name, field in content_model.fields.items():
+                if name in content_model.foreign_keys:
+                    related = getattr(obj, name)
+                    fields[name] = getattr(related, content_model.foreign_keys[name][1]) if related else None
+                elif isinstance(field, models.FileField):
+                    fields[name] = getattr(obj, name).name or ''
+                elif name in content_model.timestamps:
+                    # DjangoJSONEncoder drops the microseconds, which would
+                    # make every re-imported row look changed
+                    value = getattr(obj, name)
+                    fields[name] = value.isoformat() if value else None
+                else:
+                    fields[name] = getattr(obj, field.attname)
+            stream.write(json.dumps({'model': content_model.label, 'fields': fields}, cls=DjangoJSONEncoder))
+            stream.write('\n')
+            count += 1
+        counts[content_model.label] = count
+    return counts
+
+
+def read_records(stream):
+    """Yield (label, fields) from an NDJSON stream or a Django fixture"""
+    first = stream.read(1)
+    while first.isspace():
+        first = stream.read(1)
+    if first == '[':
+        yield from read_fixture(json.loads(first + stream.read()))
+        return
+    line_number = 1
+    line = first + stream.readline()
+    while line:
+        if line.strip():
+            try:
+                record = json.loads(line)
+                yield record['model'].lower(), record['fields']
+            except (ValueError, KeyError, AttributeError) as exc:
+                raise ContentImportError(f'Line {line_number}: {exc}')
+        line = stream.readline()
+        line_number += 1
+
+
+def read_fixture(objects):
+    """Convert fixture records, replacing portfolio pks with slugs"""
+    slugs = {
+        obj['pk']: obj['fields'].get('slug') or None
+        for obj in objects if obj['model'].lower() == 'core.portfolio'
+    }
+    missing = [pk for pk, slug in slugs.items() if slug is None]
+    slugs.update(Portfolio.objects.filter(pk__in=missing).values_list('pk', 'slug'))
+    for obj in objects:
+        label = obj['model'].lower()
+        fields = dict(obj['fields'])
+        if obj.get('pk') is not None:
+            fields.setdefault('id', obj['pk'])
+        if label == 'core.testimonial':
+            # Fixtures written by dumpdata use the name, hand-written ones the attname
+            project = fields.pop('project_id', None)
+            project = fields.get('project', project)
+            if project is not None:
+                fields['project'] = slugs.get(project)
+        yield label, fields
+
+
+class NdjsonImporter:
+    def __init__(self, batch_size=500, rebuild_search_index=True):
+        self.batch_size = batch_size
+        self.rebuild_search_index = rebuild_search_index
+        self.pending = {content_model.label: [] for content_model in CONTENT_MODELS}
+        self.stats = {
+            content_model.label: {'created': 0, 'updated': 0, 'unchanged': 0}
+            for content_model in CONTENT_MODELS
+        }
+        self.tag_ids = set()
+
+    def run(self, records):
+        for label, fields in records:
+            content_model = CONTENT_MODELS_BY_LABEL.get(label)
+            if content_model is None:
+                raise ContentImportError(f'{label} is not an importable model')
+            self.pending[label].append(fields)
+            if len(self.pending[label]) >= self.batch_size:
+                self.flush(content_model)
+        for content_model in CONTENT_MODELS:
+            self.flush(content_model)
+        self.finish()
+        return self.stats
+
+    def flush(self, content_model):
+        records = self.pending[content_model.label]
+        if not records:
+            return
+        # Objects referred to by this batch must exist first
+        for name, (related_model, key) in content_model.foreign_keys.items():
+            for other in CONTENT_MODELS:
+                if other.model is related_model:
+                    self.flush(other)
+        self.pending[content_model.label] = []
+        self.import_batch(content_model, records)
+
+    def build(self, content_model, fields):
+        """An unsaved instance holding `fields`, and the names that were given"""
+        values = {}
+        for name, value in {**fields, **content_model.defaults}.items():
+            if content_model.field_name(name) in content_model.foreign_keys:
+                values[name] = value
+            elif name in content_model.timestamps and value is None:
+                # Left to auto_now/auto_now_add
+                continue
+            elif name in content_model.fields:
+                try:
+                    values[name] = content_model.fields[name].to_python(value)
+                except ValidationError as exc:
+                    raise ContentImportError(f'{content_model.label} {name}: {"; ".join(exc.messages)}')
+            elif name == 'id':
+                # Only used to tell rows with the same natural key apart
+                values[name] = value
+        obj = content_model.model(**{
+            name: value for name, value in values.items()
+            if content_model.field_name(name) not in content_model.foreign_keys
+            and (name != 'id' or name in content_model.defaults)
+        })
+        if hasattr(obj, 'set_derived_fields'):
+            obj.set_derived_fields()
+        return obj, values
+
+    def resolve_foreign_keys(self, content_model, batch):
+        for name, (related_model, key) in content_model.foreign_keys.items():
+            attname = content_model.fields[name].attname
+            # By natural key under the field name, by pk under the attname
+            for given, lookup in ((name, key), (attname, 'pk')):
+                wanted = {values[given] for obj, values in batch if values.get(given)}
+                found = dict(
+                    related_model.objects.filter(**{f'{lookup}__in': wanted}).values_list(lookup, 'pk')
+                )
+                missing = wanted - found.keys()
+                if missing:
+                    raise ContentImportError(
+                        f'{content_model.label} {given}: no {related_model._meta.label_lower} '
+                        f'with {lookup} {", ".join(sorted(map(str, missing)))}'
+                    )
+                for obj, values in batch:
+                    if given in values:
+                        setattr(obj, attname, found.get(values[given]))
+
+    def import_batch(self, content_model, records):
+        model = content_model.model
+        # The last record wins when a key (and id) appears twice
+        batch = {}
+        for fields in records:
+            obj, values = self.build(content_model, fields)
+            batch[(content_model.get_key(obj), values.get('id'))] = (obj, values)
+        self.resolve_foreign_keys(content_model, batch.values())
+
+        existing = {}
+        for obj in model.objects.filter(content_model.key_filter({key for key, pk in batch})):
+            existing.setdefault(content_model.get_key(obj), []).append(obj)
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        update_fields = set()
+        matched = set()
+        for (key, pk), (obj, values) in batch.items():
+            current = self.match(content_model, key, pk, existing.get(key, []))
+            if current is not None:
+                if current.pk in matched:
+                    raise ContentImportError(
+                        f'{content_model.label} {self.describe(content_model, key)}: '
+                        f'several records match row {current.pk}'
+                    )
+                matched.add(current.pk)
+            if current is None:
+                to_create.append((obj, values))
+                continue
+            given = [
+                name for name in dict.fromkeys(map(content_model.field_name, values))
+                if name in content_model.fields
+            ]
+            names = given + content_model.derived
+            attnames = [model._meta.get_field(name).attname for name in names]
+            before = [getattr(current, attname) for attname in attnames]
+            for name in given:
+                attname = model._meta.get_field(name).attname
+                setattr(current, attname, getattr(obj, attname))
+            if hasattr(current, 'set_derived_fields'):
+                current.set_derived_fields()
+            if [getattr(current, attname) for attname in attnames] == before:
+                self.stats[content_model.label]['unchanged'] += 1
+                continue
+            update_fields.update(names)
+            if content_model.has_updated_at and 'updated_at' not in given:
+                # bulk_update skips auto_now
+                current.updated_at = now
+            to_update.append(current)
+
+        if to_update:
+            if content_model.has_updated_at:
+                update_fields.add('updated_at')
+            model.objects.bulk_update(to_update, sorted(update_fields), batch_size=self.batch_size)
+        created = self.create(content_model, to_create)
+        self.stats[content_model.label]['created'] += len(created)
+        self.stats[content_model.label]['updated'] += len(to_update)
+        if content_model.tagged:
+            self.sync_tags(content_model, created + to_update)
+
+    def create(self, content_model, batch):
+        """bulk_create the (obj, values) pairs, keeping the timestamps they give"""
+        objects = [obj for obj, values in batch]
+        # bulk_create sets auto_now/auto_now_add fields to the current time
+        given = [
+            (obj, {name: getattr(obj, name) for name in content_model.timestamps if name in values})
+            for obj, values in batch
+        ]
+        created = content_model.model.objects.bulk_create(objects, batch_size=self.batch_size)
+        restored = {}
+        for obj, timestamps in given:
+            if timestamps and obj.pk is not None:
+                for name, value in timestamps.items():
+                    setattr(obj, name, value)
+                restored.setdefault(tuple(sorted(timestamps)), []).append(obj)
+        for names, objects in restored.items():
+            content_model.model.objects.bulk_update(objects, names, batch_size=self.batch_size)
+        return created
+
+    def match(self, content_model, key, pk, candidates):
+        """The row a record with natural key `key` (and id `pk`) updates, or None"""
+        for candidate in candidates:
+            if candidate.pk == pk:
+                return candidate
+        if len(candidates) > 1:
+            raise ContentImportError(
+                f'{content_model.label} {self.describe(content_model, key)} matches '
+                f'{len(candidates)} rows (ids {", ".join(str(row.pk) for row in candidates)}); '
+                'give the id of the one to update'
+            )
+        return candidates[0] if candidates else None
+
+    def describe(self, content_model, key):
+        return ', '.join(f'{name}={value!r}' for name, value in zip(content_model.key, key))
+
+    def sync_tags(self, content_model, objects):
+        """Bulk version of models.sync_technology_tags"""
+        model = content_model.model
+        if any(obj.pk is None for obj in objects):
+            # Databases that don't return ids from bulk_create
+            ids = dict(model.objects.filter(slug__in=[obj.slug for obj in objects]).values_list('slug', 'pk'))
+            for obj in objects:
+                obj.pk = ids[obj.slug]
+        through = model.technology_tags.through
+        column = f'{model._meta.model_name}_id'
+        previous = through.objects.filter(**{f'{column}__in': [obj.pk for obj in objects]})
+        self.tag_ids.update(previous.values_list('technology_id', flat=True))
+        previous.delete()
+
+        names = {name for obj in objects for name in obj.technologies_list}
+        tags = {tag.slug: tag.pk for tag in Technology.from_names(names)}
+        self.tag_ids.update(tags.values())
+        rows = {}
+        for obj in objects:
+            for name in obj.technologies_list:
+                tag_id = tags.get(technology_slug(name))
+                if tag_id:
+                    rows[(obj.pk, tag_id)] = through(**{column: obj.pk, 'technology_id': tag_id})
+        through.objects.bulk_create(rows.values(), batch_size=self.batch_size)
+
+    def finish(self):
+        Technology.refresh_counts(self.tag_ids)
+        changed = [
+            CONTENT_MODELS_BY_LABEL[label].model for label, counts in self.stats.items()
+            if counts['created'] or counts['updated']
+        ]
+        if self.tag_ids:
+            changed.append(Technology)
+        for model in changed:
+            bump_version(model)
+            schedule_refresh(model)
+        if changed and self.rebuild_search_index:
+            search_index.rebuild()
+
+
+def import_ndjson(stream, batch_size=500, rebuild_search_index=True):
+    """Upsert every record in `stream`; returns created/updated counts per model"""
+    return NdjsonImporter(batch_size, rebuild_search_index).run(read_records(stream))
@@ -0,0 +1,136 @@
+"""
+Bulk changes to the `order` column of services, portfolio items,
+testimonials and team members.
+
+`apply_order()` takes a full ordering (a list of ids) and numbers the rows
+`gap`, `2 * gap`, ... with a single bulk_update. `move()` places one row
+after another and, while there is room between the new neighbours' values,
+only changes that row; otherwise it renumbers everything once. Leaving
+CONTENT_ORDER_GAP between rows means most drag-and-drop moves write one row.
+
+Both bypass the model signals, so cache versions and the API snapshot are
+refreshed once per call instead of once per row.
+
+ReorderMixin adds them to a viewset as a staff-only `POST .../reorder/`.
+"""
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .cache import bump_version
+from .serializers import ReorderSerializer
+
+
+class OrderingError(ValueError):
+    """Ids that don't fit the model being reordered"""
+
+
+def get_gap(gap=None):
+    return settings.CONTENT_ORDER_GAP if gap is None else gap
+
+
+def changed(model):
+    """Invalidate once for the whole batch"""
+    # core.snapshots imports the views, which use ReorderMixin
+    from .snapshots import schedule_refresh
+
+    bump_version(model)
+    # Again once committed, as the post_save signal handler does
+    transaction.on_commit(lambda: bump_version(model))
+    schedule_refresh(model)
+
+
+def apply_order(model, ids, gap=None):
+    """
+    Number the rows in `ids` in that order; returns the number changed.
+    `ids` must list every row of the model, so none is left in between.
+    """
+    gap = get_gap(gap)
+    if len(set(ids)) != len(ids):
+        raise OrderingError('Each id may only appear once.')
+    with transaction.atomic():
+        objects = model.objects.select_for_update().only('pk', 'order').in_bulk()
+        missing = [pk for pk in ids if pk not in objects]
+        if missing:
+            raise OrderingError(f'Unknown ids: {", ".join(map(str, missing))}')
+        left_out = sorted(objects.keys() - set(ids))
+        if left_out:
+            raise OrderingError(f'Missing ids: {", ".join(map(str, left_out))}')
+        to_update = []
+        for position, pk in enumerate(ids, 1):
+            obj = objects[pk]
+            if obj.order != position * gap:
+                obj.order = position * gap
+                to_update.append(obj)
+        # One UPDATE ... SET order = CASE id WHEN ... END per batch
+        model.objects.bulk_update(to_update, ['order'], batch_size=500)
+        if to_update:
+            changed(model)
+    return len(to_update)
+
+
+def move(model, pk, after=None, gap=None):
+    """
+    Place row `pk` right after row `after` (first when None) in
+    (order, id) order; returns the number of rows changed
+    """
+    gap = get_gap(gap)
+    if after == pk:
+        return 0
+    with transaction.atomic():
+        # Lock every row before looking at the neighbours, so a concurrent
+        # move can't change them in between
+        rows = list(model.objects.select_for_update().order_by('order', 'pk').values_list('pk', 'order'))
+        ids = [row_pk for row_pk, order in rows if row_pk != pk]
+        if len(ids) == len(rows):
+            raise OrderingError(f'Unknown id: {pk}')
+        if after is None:
+            position = 0
+        elif after in ids:
+            position = ids.index(after) + 1
+        else:
+            raise OrderingError(f'Unknown id: {after}')
+        orders = [order for row_pk, order in rows if row_pk != pk]
+        previous = orders[position - 1] if position else None
+        following = orders[position] if position < len(orders) else None
+
+        if previous is None and following is None:
+            return 0
+        if previous is None:
+            order = following - gap
+        elif following is None:
+            order = previous + gap
+        elif following - previous >= 2:
+            order = (previous + following) // 2
+        else:
+            # No room between the neighbours: renumber everything
+            ids.insert(position, pk)
+            return apply_order(model, ids, gap)
+        model.objects.filter(pk=pk).update(order=order)
+        changed(model)
+    return 1
+
+
+class ReorderMixin:
+    """
+    `POST <list url>/reorder/` for staff, with `{"ids": [...]}` (the full
+    new ordering, every row included) or `{"move": id, "after": id or
+    null}`. Applies to all rows of the model, including inactive ones.
+    """
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser], pagination_class=None)
+    def reorder(self, request):
+        params = ReorderSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        model = self.queryset.model
+        try:
+            if 'ids' in data:
+                updated = apply_order(model, data['ids'])
+            else:
+                updated = move(model, data['move'], data['after'])
+        except OrderingError as exc:
+            raise serializers.ValidationError({'ids' if 'ids' in data else 'move': str(exc)})
+        return Response({'updated': updated})
@@ -0,0 +1,217 @@
+"""
+Opt-in keyset (cursor) pagination.
+
+Page-number pagination issues a COUNT(*) per request and OFFSET scans that
+get slower the deeper the page. Viewsets using KeysetOrPageNumberPagination
+keep page-number behaviour by default and switch to keyset pagination with
+`?pagination=cursor` (or when a `cursor` is given): the next page is found
+with a WHERE clause on the last row's ordering values, which the composite
+indexes in core.models serve directly.
+
+The paginators also provide `apaginate_queryset`, which evaluates the page
+with the async ORM for the views in core.async_views.
+
+EstimatedCountPaginator is a Django Paginator for the admin changelists of
+large tables.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over `view.keyset_ordering`.
+
+    The ordering must end with a unique field (normally `id` or `-id`) so
+    every row has a distinct position. NULL sorts as the largest value (first
+    when descending), matching PostgreSQL's default and its plain indexes.
+    An `?ordering=` other than (the start of) that ordering is rejected with
+    400 rather than silently ignored.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page([obj async for obj in queryset])
+
+    def get_page_queryset(self, queryset, request, view):
+        """Return the (unevaluated) queryset for the page plus one row"""
+        self.request = request
+        self.ordering = view.keyset_ordering
+        self.check_ordering(request)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering
+        ]
+
+        queryset = queryset.order_by(*[
+            self.get_order_by(name, field) for name, field in zip(self.ordering, self.fields)
+        ])
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.get_position_filter(self.decode_cursor(encoded)))
+
+        return queryset[:self.page_size + 1]
+
+    def check_ordering(self, request):
+        param = request.query_params.get(api_settings.ORDERING_PARAM)
+        if not param:
+            return
+        requested = [term.strip() for term in param.split(',') if term.strip()]
+        if requested != self.ordering[:len(requested)]:
+            raise ValidationError({api_settings.ORDERING_PARAM: [
+                f'Not supported with pagination=cursor, which always orders by '
+                f'{",".join(self.ordering)}. Use page-number pagination for other orderings.'
+            ]})
+
+    def set_page(self, page):
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_order_by(self, name, field):
+        expression = F(field.attname)
+        if name.startswith('-'):
+            return expression.desc(nulls_first=True) if field.null else expression.desc()
+        return expression.asc(nulls_last=True) if field.null else expression.asc()
+
+    def get_position_filter(self, values):
+        """Build the WHERE clause selecting rows that sort after `values`"""
+        position = Q(pk__in=[])
+        equal = Q()
+        for name, field, value in zip(self.ordering, self.fields, values):
+            descending = name.startswith('-')
+            if value is None:
+                # NULL is the largest value: descending, every non-NULL row
+                # follows it; ascending, nothing does.
+                if descending:
+                    position |= equal & Q(**{f'{field.attname}__isnull': False})
+                equal &= Q(**{f'{field.attname}__isnull': True})
+                continue
+            after = Q(**{f"{field.attname}__{'lt' if descending else 'gt'}": value})
+            if field.null and not descending:
+                after |= Q(**{f'{field.attname}__isnull': True})
+            position |= equal & after
+            equal &= Q(**{field.attname: value})
+        return position
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self.fields:
+            value = getattr(obj, field.attname)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            values.append(value)
+        raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, 'pagination', 'cursor')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """DRF's PageNumberPagination, plus an async ORM variant"""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        self.page.object_list = [obj async for obj in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        return list(self.page)
+
+
+class KeysetOrPageNumberPagination(BasePagination):
+    """Page-number pagination unless the client asks for keyset pagination"""
+    mode_query_param = 'pagination'
+
+    def select_paginator(self, request):
+        params = request.query_params
+        if params.get(self.mode_query_param) == 'cursor' or KeysetPagination.cursor_query_param in params:
+            self.paginator = KeysetPagination()
+        else:
+            self.paginator = AsyncPageNumberPagination()
+        return self.paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.select_paginator(request).paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await self.select_paginator(request).apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the number of rows from the PostgreSQL planner's
+    estimate instead of a COUNT(*) once there are many of them, so paging
+    through a large filtered changelist doesn't scan every matching row.
+    The page count is then approximate. Small results and other databases
+    are counted exactly.
+    """
+    # Estimates below this are counted exactly
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate_count()
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+    def estimate_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or connections[queryset.db].vendor != 'postgresql':
+            return None
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
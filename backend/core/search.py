@@ -0,0 +1,317 @@
+"""
+In-process inverted index for the cross-model /api/search/ endpoint.
+
+Every public service, portfolio item, blog post and job opening is a
+document; each token maps to the documents containing it with a weight that
+depends on the field it appears in. The index is built from the database
+once, persisted to SEARCH_INDEX_PATH and then kept up to date from model
+save/delete signals (see core/signals.py). Other worker processes notice the
+persisted file changing and reload it instead of rebuilding.
+
+Every worker keeps its own copy in memory, so an update is a
+read-modify-write of the file: it takes an exclusive flock on
+`<SEARCH_INDEX_PATH>.lock`, reloads the file if another process replaced it,
+applies the change and atomically replaces the file before unlocking.
+"""
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+from django.conf import settings
+from django.utils.html import escape
+
+from .models import BlogPost, JobOpening, Portfolio, Service
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has in is it of on or that the to was '
+    'we with you your our'.split()
+)
+SNIPPET_LENGTH = 160
+
+
+class SearchSource:
+    """How one model is turned into search documents"""
+
+    def __init__(self, type, model, filters, fields):
+        self.type = type
+        self.model = model
+        self.filters = filters
+        # (field name, weight) pairs
+        self.fields = fields
+
+    def get_queryset(self):
+        return self.model.objects.filter(**self.filters).only(
+            'pk', 'slug', *[name for name, weight in self.fields]
+        )
+
+    def is_public(self, instance):
+        return all(getattr(instance, name) == value for name, value in self.filters.items())
+
+    def to_document(self, instance):
+        return {
+            'type': self.type,
+            'id': instance.pk,
+            'slug': instance.slug,
+            'title': instance.title,
+            'fields': {name: getattr(instance, name) or '' for name, weight in self.fields},
+        }
+
+
+SOURCES = [
+    SearchSource('service', Service, {'is_active': True}, [
+        ('title', 3.0), ('technologies', 2.0), ('short_description', 1.0),
+    ]),
+    SearchSource('portfolio', Portfolio, {'is_active': True}, [
+        ('title', 3.0), ('technologies', 2.0), ('client_company', 1.5), ('short_description', 1.0),
+    ]),
+    SearchSource('post', BlogPost, {'is_published': True}, [
+        ('title', 3.0), ('category', 2.0), ('excerpt', 1.0), ('content', 0.5),
+    ]),
+    SearchSource('job', JobOpening, {'is_active': True}, [
+        ('title', 3.0), ('department', 2.0), ('location', 1.0), ('description', 0.5),
+    ]),
+]
+SOURCES_BY_MODEL = {source.model: source for source in SOURCES}
+SOURCES_BY_TYPE = {source.type: source for source in SOURCES}
+
+
+def tokenize(text):
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def highlight(text, terms, prefix=None):
+    """Return an HTML-escaped snippet of text with matches wrapped in <mark>"""
+    patterns = [re.escape(term) + r'\b' for term in terms]
+    if prefix:
+        patterns.append(re.escape(prefix) + r'\w*')
+    regex = re.compile(r'\b(?:%s)' % '|'.join(patterns), re.IGNORECASE)
+    match = regex.search(text)
+    if match is None:
+        return None
+    start = max(0, match.start() - SNIPPET_LENGTH // 4)
+    end = start + SNIPPET_LENGTH
+    snippet = text[start:end]
+    parts = []
+    position = 0
+    for found in regex.finditer(snippet):
+        parts.append(escape(snippet[position:found.start()]))
+        parts.append('<mark>%s</mark>' % escape(found.group()))
+        position = found.end()
+    parts.append(escape(snippet[position:]))
+    return ('…' if start else '') + ''.join(parts) + ('…' if end < len(text) else '')
+
+
+def file_version(stat):
+    return (stat.st_ino, stat.st_mtime_ns)
+
+
+class SearchIndex:
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.RLock()
+        self._lock_file = None
+        # (inode, mtime) of the file last loaded or written: os.replace()
+        # gives every version a new inode, even within one mtime tick
+        self._loaded_version = None
+        self.documents = {}
+        self.postings = {}
+        self._vocabulary = None
+
+    @property
+    def path(self):
+        return self._path or getattr(settings, 'SEARCH_INDEX_PATH', None)
+
+    @contextmanager
+    def _exclusive(self):
+        """Lock out other threads and, through the lock file, other processes"""
+        with self._lock:
+            path = self.path
+            if self._lock_file is not None or not path or fcntl is None:
+                # Already held by this thread, or nothing to share
+                yield
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(f'{path}.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_file = lock_file
+                try:
+                    yield
+                finally:
+                    self._lock_file = None
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # Building and incremental updates
+
+    def _add(self, document):
+        key = f"{document['type']}:{document['id']}"
+        self._remove(key)
+        self.documents[key] = document
+        source = SOURCES_BY_TYPE[document['type']]
+        for name, weight in source.fields:
+            for token in tokenize(document['fields'][name]):
+                postings = self.postings.setdefault(token, {})
+                postings[key] = postings.get(key, 0.0) + weight
+        self._vocabulary = None
+
+    def _remove(self, key):
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+        for token in set(tokenize(' '.join(document['fields'].values()))):
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self.postings[token]
+        self._vocabulary = None
+
+    def rebuild(self):
+        """Rebuild the whole index from the database and persist it"""
+        with self._exclusive():
+            self.documents = {}
+            self.postings = {}
+            for source in SOURCES:
+                for instance in source.get_queryset().iterator():
+                    self._add(source.to_document(instance))
+            self.save()
+
+    def update_instance(self, instance):
+        source = SOURCES_BY_MODEL[type(instance)]
+        with self._exclusive():
+            self.ensure_loaded()
+            if source.is_public(instance):
+                self._add(source.to_document(instance))
+            else:
+                self._remove(f'{source.type}:{instance.pk}')
+            self.save()
+
+    def remove(self, model, pk):
+        source = SOURCES_BY_MODEL[model]
+        with self._exclusive():
+            self.ensure_loaded()
+            self._remove(f'{source.type}:{pk}')
+            self.save()
+
+    # Persistence
+
+    def save(self):
+        path = self.path
+        if not path:
+            return
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as fh:
+            json.dump({'documents': self.documents, 'postings': self.postings}, fh)
+        os.replace(tmp_path, path)
+        self._loaded_version = file_version(os.stat(path))
+
+    def ensure_loaded(self):
+        """Load the persisted index, reloading it if another process changed it"""
+        with self._lock:
+            path = self.path
+            try:
+                version = file_version(os.stat(path)) if path else None
+            except FileNotFoundError:
+                version = None
+            if version is None:
+                if self._loaded_version is None:
+                    self.rebuild()
+                    self._loaded_version = self._loaded_version or 0
+                return
+            if version == self._loaded_version:
+                return
+            with open(path) as fh:
+                # Read the version of the file actually opened
+                version = file_version(os.fstat(fh.fileno()))
+                data = json.load(fh)
+            self.documents = data['documents']
+            self.postings = data['postings']
+            self._vocabulary = None
+            self._loaded_version = version
+
+    # Querying
+
+    def _expand_prefix(self, prefix):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect_left(self._vocabulary, prefix)
+        tokens = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        return tokens
+
+    def search(self, query, types=None, limit=20):
+        self.ensure_loaded()
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        # The last term also matches as a prefix, for search-as-you-type.
+        prefix = terms[-1] if len(terms[-1]) > 2 else None
+        complete = terms[:-1] if prefix else terms
+        term_groups = [[term] for term in complete]
+        if prefix:
+            term_groups.append(self._expand_prefix(prefix))
+
+        total = len(self.documents) or 1
+        scores = {}
+        matched = {}
+        for group in term_groups:
+            group_scores = {}
+            for token in group:
+                postings = self.postings.get(token, {})
+                idf = math.log(1 + total / len(postings)) if postings else 0
+                for key, weight in postings.items():
+                    group_scores[key] = max(group_scores.get(key, 0.0), weight * idf)
+            for key, score in group_scores.items():
+                scores[key] = scores.get(key, 0.0) + score
+                matched[key] = matched.get(key, 0) + 1
+
+        results = []
+        for key, score in scores.items():
+            document = self.documents[key]
+            if types and document['type'] not in types:
+                continue
+            # Favour documents that match every term
+            results.append((score * matched[key] / len(term_groups), key))
+        results.sort(reverse=True)
+
+        return [
+            self._result(self.documents[key], score, complete, prefix)
+            for score, key in results[:limit]
+        ]
+
+    def _result(self, document, score, terms, prefix):
+        highlights = {}
+        for name, text in document['fields'].items():
+            snippet = highlight(text, terms, prefix)
+            if snippet is not None:
+                highlights[name] = snippet
+        return {
+            'type': document['type'],
+            'id': document['id'],
+            'slug': document['slug'],
+            'title': document['title'],
+            'score': round(score, 4),
+            'highlights': highlights,
+        }
+
+
+search_index = SearchIndex()
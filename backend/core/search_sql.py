@@ -0,0 +1,52 @@
+"""
+PostgreSQL full-text search triggers, shared by the migrations that add a
+`search_vector` column (0003 for the public search, 0012 for the contact
+archive, 0013 for the admin).
+
+A trigger keeps each row's weighted tsvector up to date on insert and
+update, and a GIN index makes it searchable. `documents` lists
+(table, [(column, weight), ...]) per table. Migrations that already ran
+depend on this SQL, so change it only in ways that leave their result the
+same. Other databases have no triggers and are skipped.
+"""
+
+
+def search_document_sql(columns):
+    """The weighted tsvector expression over NEW.<column> for a trigger"""
+    return ' || '.join(
+        f"setweight(to_tsvector('pg_catalog.english', coalesce(NEW.{column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def create_search_triggers(schema_editor, documents):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns in documents:
+        schema_editor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {search_document_sql(columns)};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+        # Fire the trigger once for existing rows
+        schema_editor.execute(f'UPDATE {table} SET search_vector = NULL')
+        schema_editor.execute(
+            f'CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)'
+        )
+
+
+def drop_search_triggers(schema_editor, documents):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns in documents:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector_gin')
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector_update()')
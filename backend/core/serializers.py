@@ -1,91 +1,193 @@
+from datetime import timedelta
+from html import unescape
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
 from rest_framework import serializers
-from .models import Service, Portfolio, Testimonial, Contact, CompanyInfo, TeamMember
-from .models import JobOpening, BlogPost
+from .fieldsets import SparseFieldsSerializerMixin
+from .jobs import enqueue
+from .models import Service, Portfolio, Testimonial, Contact, CompanyInfo, TeamMember, Technology
+from .models import JobOpening, BlogPost, ArchivedContact
+
+
+class ImageSrcsetField(serializers.ReadOnlyField):
+    """srcset strings for each image field and format, from image_derivatives"""
+    def __init__(self, **kwargs):
+        kwargs['source'] = 'image_derivatives'
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        request = self.context.get('request')
+        srcsets = {}
+        for field, entry in (value or {}).items():
+            srcsets[field] = {}
+            for fmt, variants in entry['variants'].items():
+                candidates = []
+                for width, name in variants:
+                    url = default_storage.url(name)
+                    if request is not None:
+                        url = request.build_absolute_uri(url)
+                    candidates.append(f'{url} {width}w')
+                srcsets[field][fmt] = ', '.join(candidates)
+        return srcsets
+
+
+EXCERPT_LENGTH = 200
+# Characters of the (possibly HTML) source read for an excerpt, leaving
+# room for the markup that is stripped
+EXCERPT_SOURCE_LENGTH = EXCERPT_LENGTH * 5
+
+
+class TechnologySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Technology
+        fields = ['name', 'slug']
+
+
+class ExcerptField(serializers.ReadOnlyField):
+    """
+    Plain-text excerpt from a `Substr(..., 1, EXCERPT_SOURCE_LENGTH + 1)`
+    annotation (see the list querysets in core/views.py): tags are stripped
+    and entities decoded, then the text is cut at a word boundary
+    """
+    def to_representation(self, value):
+        value = value or ''
+        cut = len(value) > EXCERPT_SOURCE_LENGTH
+        if cut:
+            value = value[:EXCERPT_SOURCE_LENGTH]
+            tag_start = value.rfind('<')
+            if tag_start > value.rfind('>'):
+                # A tag cut in half by the Substr
+                value = value[:tag_start]
+        # A space for every tag, so paragraphs and list items don't run together
+        text = ' '.join(unescape(strip_tags(value.replace('<', ' <'))).split())
+        if len(text) <= EXCERPT_LENGTH and not cut:
+            return text
+        return text[:EXCERPT_LENGTH].rsplit(' ', 1)[0].rstrip(',.;:') + '…'
 
 
-class ServiceSerializer(serializers.ModelSerializer):
-    technologies_list = serializers.SerializerMethodField()
-    process_steps_list = serializers.SerializerMethodField()
+class ServiceSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    image_srcsets = ImageSrcsetField()
+    expandable_fields = {'technology_tags': (TechnologySerializer, {'many': True})}
     
     class Meta:
         model = Service
         fields = [
             'id', 'title', 'slug', 'short_description', 'full_description',
-            'icon', 'image', 'technologies', 'technologies_list',
+            'icon', 'image', 'image_srcsets', 'technologies', 'technologies_list',
             'process_steps', 'process_steps_list', 'pricing_info',
             'order', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['slug', 'created_at', 'updated_at']
+
+
+class ServiceListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    """Service list view: without the full description and raw process steps"""
+    image_srcsets = ImageSrcsetField()
+    expandable_fields = {'technology_tags': (TechnologySerializer, {'many': True})}
     
-    def get_technologies_list(self, obj):
-        if obj.technologies:
-            return [tech.strip() for tech in obj.technologies.split(',')]
-        return []
-    
-    def get_process_steps_list(self, obj):
-        if obj.process_steps:
-            return [step.strip() for step in obj.process_steps.split('\n') if step.strip()]
-        return []
+    class Meta:
+        model = Service
+        fields = [
+            'id', 'title', 'slug', 'short_description',
+            'icon', 'image', 'image_srcsets', 'technologies', 'technologies_list',
+            'process_steps_list', 'pricing_info', 'order', 'is_active'
+        ]
 
 
-class PortfolioSerializer(serializers.ModelSerializer):
-    technologies_list = serializers.SerializerMethodField()
+class PortfolioSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    image_srcsets = ImageSrcsetField()
     testimonials = serializers.SerializerMethodField()
+    expandable_fields = {'technology_tags': (TechnologySerializer, {'many': True})}
     
     class Meta:
         model = Portfolio
         fields = [
             'id', 'title', 'slug', 'client_name', 'client_company',
             'short_description', 'challenge', 'solution', 'result',
-            'thumbnail', 'image1', 'image2', 'image3',
+            'thumbnail', 'image1', 'image2', 'image3', 'image_srcsets',
             'technologies', 'technologies_list', 'live_url', 'github_url',
             'status', 'project_date', 'featured', 'order', 'is_active',
             'testimonials', 'created_at', 'updated_at'
         ]
         read_only_fields = ['slug', 'created_at', 'updated_at']
     
-    def get_technologies_list(self, obj):
-        if obj.technologies:
-            return [tech.strip() for tech in obj.technologies.split(',')]
-        return []
-    
     def get_testimonials(self, obj):
-        testimonials = obj.testimonials.filter(is_active=True)
+        # Use the prefetched list from PortfolioViewSet when available
+        testimonials = getattr(obj, 'active_testimonials', None)
+        if testimonials is None:
+            testimonials = obj.testimonials.filter(is_active=True).select_related('project')
         return TestimonialSerializer(testimonials, many=True).data
 
 
-class PortfolioListSerializer(serializers.ModelSerializer):
+class PortfolioListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """Simplified serializer for portfolio list view"""
-    technologies_list = serializers.SerializerMethodField()
+    image_srcsets = ImageSrcsetField()
+    expandable_fields = {'technology_tags': (TechnologySerializer, {'many': True})}
     
     class Meta:
         model = Portfolio
         fields = [
             'id', 'title', 'slug', 'client_company', 'short_description',
-            'thumbnail', 'technologies', 'technologies_list', 'live_url',
+            'thumbnail', 'image_srcsets', 'technologies', 'technologies_list', 'live_url',
             'status', 'project_date', 'featured'
         ]
-    
-    def get_technologies_list(self, obj):
-        if obj.technologies:
-            return [tech.strip() for tech in obj.technologies.split(',')]
-        return []
 
 
-class TestimonialSerializer(serializers.ModelSerializer):
+class TestimonialSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     project_title = serializers.CharField(source='project.title', read_only=True)
+    image_srcsets = ImageSrcsetField()
+    expandable_fields = {'project': (PortfolioListSerializer, {})}
     
     class Meta:
         model = Testimonial
         fields = [
             'id', 'client_name', 'client_position', 'client_company',
-            'client_country', 'client_photo', 'review', 'rating',
+            'client_country', 'client_photo', 'image_srcsets', 'review', 'rating',
             'project', 'project_title', 'video_url', 'source', 'source_url',
             'featured', 'order', 'is_active', 'created_at'
         ]
         read_only_fields = ['created_at']
 
 
+class ContactStatsQuerySerializer(serializers.Serializer):
+    """Query parameters of /api/contact/stats/"""
+    # Longest range, in days, so the response stays small
+    MAX_DAYS = 3 * 366
+    
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    interval = serializers.ChoiceField(choices=['day', 'week', 'month'], default='week')
+    inquiry_type = serializers.ChoiceField(choices=Contact.INQUIRY_TYPE, required=False)
+    status = serializers.ChoiceField(choices=Contact.STATUS_CHOICES, required=False)
+    
+    def validate(self, data):
+        data.setdefault('end', timezone.localdate())
+        data.setdefault('start', data['end'] - timedelta(days=89))
+        if data['start'] > data['end']:
+            raise serializers.ValidationError({'start': 'Must not be after end.'})
+        if (data['end'] - data['start']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'start': f'The range is limited to {self.MAX_DAYS} days.'})
+        return data
+
+
+class ReorderSerializer(serializers.Serializer):
+    """
+    Body of the reorder actions: either `ids`, the full new ordering, or
+    `move` with the id to place `after` (null for first)
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, required=False)
+    move = serializers.IntegerField(required=False)
+    after = serializers.IntegerField(required=False, allow_null=True, default=None)
+    
+    def validate(self, data):
+        if ('ids' in data) == ('move' in data):
+            raise serializers.ValidationError('Give either ids or move.')
+        return data
+
+
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
@@ -97,15 +199,25 @@ class ContactSerializer(serializers.ModelSerializer):
         read_only_fields = ['status', 'submitted_at']
     
     def create(self, validated_data):
-        # Here you can add email notification logic
-        contact = Contact.objects.create(**validated_data)
-        # TODO: Send email notification to admin
+        with transaction.atomic():
+            contact = Contact.objects.create(**validated_data)
+            # Emails are sent by the job worker, not inside the request
+            enqueue('contact.notify_admin', {'contact_id': contact.pk})
+            enqueue('contact.auto_reply', {'contact_id': contact.pk})
         return contact
 
 
-class CompanyInfoSerializer(serializers.ModelSerializer):
-    values_list = serializers.SerializerMethodField()
-    
+class ArchivedContactSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedContact
+        fields = [
+            'id', 'name', 'email', 'phone', 'company',
+            'inquiry_type', 'subject', 'message', 'budget', 'timeline',
+            'status', 'admin_notes', 'submitted_at', 'updated_at', 'archived_at'
+        ]
+
+
+class CompanyInfoSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CompanyInfo
         fields = [
@@ -116,34 +228,21 @@ class CompanyInfoSerializer(serializers.ModelSerializer):
             'whatsapp_number', 'telegram_username', 'calendly_url',
             'google_maps_embed', 'meta_description', 'meta_keywords'
         ]
-    
-    def get_values_list(self, obj):
-        if obj.values:
-            return [value.strip() for value in obj.values.split('\n') if value.strip()]
-        return []
 
 
-class TeamMemberSerializer(serializers.ModelSerializer):
-    skills_list = serializers.SerializerMethodField()
+class TeamMemberSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    image_srcsets = ImageSrcsetField()
     
     class Meta:
         model = TeamMember
         fields = [
-            'id', 'name', 'position', 'bio', 'photo',
+            'id', 'name', 'position', 'bio', 'photo', 'image_srcsets',
             'linkedin_url', 'github_url', 'twitter_url',
             'skills', 'skills_list', 'order', 'is_active'
         ]
-    
-    def get_skills_list(self, obj):
-        if obj.skills:
-            return [skill.strip() for skill in obj.skills.split(',')]
-        return []
 
 
-class JobOpeningSerializer(serializers.ModelSerializer):
-    requirements_list = serializers.SerializerMethodField()
-    benefits_list = serializers.SerializerMethodField()
-
+class JobOpeningSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = JobOpening
         fields = [
@@ -152,17 +251,38 @@ class JobOpeningSerializer(serializers.ModelSerializer):
             'requirements_list', 'benefits', 'benefits_list', 'is_active'
         ]
 
-    def get_requirements_list(self, obj):
-        return obj.requirements_list()
 
-    def get_benefits_list(self, obj):
-        return obj.benefits_list()
+class JobOpeningListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    """Job opening list view: an excerpt instead of the description and lists"""
+    excerpt = ExcerptField()
+    
+    class Meta:
+        model = JobOpening
+        fields = [
+            'id', 'title', 'slug', 'department', 'location', 'employment_type',
+            'salary', 'experience', 'posted_at', 'excerpt', 'is_active'
+        ]
+
+
+class BlogPostSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    image_srcsets = ImageSrcsetField()
+
+    class Meta:
+        model = BlogPost
+        fields = [
+            'id', 'title', 'slug', 'excerpt', 'content', 'author', 'featured_image', 'image_srcsets',
+            'category', 'published_at', 'is_published', 'read_time'
+        ]
+
 
+class BlogPostListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    """Blog post list view: the excerpt (or the start of the post) without the content"""
+    image_srcsets = ImageSrcsetField()
+    excerpt = ExcerptField(source='summary')
 
-class BlogPostSerializer(serializers.ModelSerializer):
     class Meta:
         model = BlogPost
         fields = [
-            'id', 'title', 'slug', 'excerpt', 'content', 'author', 'featured_image',
+            'id', 'title', 'slug', 'excerpt', 'author', 'featured_image', 'image_srcsets',
             'category', 'published_at', 'is_published', 'read_time'
         ]
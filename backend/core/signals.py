@@ -0,0 +1,98 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .images import IMAGE_FIELDS, needs_processing, schedule_derivative_cleanup, schedule_image_processing
+from .models import Contact, ContactDailyStat, Portfolio, Service, Technology
+from .search import SOURCES_BY_MODEL, search_index
+from .snapshots import SNAPSHOT_MODELS, schedule_refresh
+
+# Every model a cached response depends on; every cached endpoint is also
+# snapshotted, so these are the snapshot's dependencies. Contacts, jobs and
+# the like aren't cached, and bumping their versions would only add writes
+# to the CacheVersion table.
+CACHED_MODELS = SNAPSHOT_MODELS
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender, **kwargs):
+    """Bump the cache version of any model a cached response depends on"""
+    if sender not in CACHED_MODELS:
+        return
+    bump_version(sender)
+    # Bump again once committed, so anything cached by a concurrent request
+    # that still read the old row isn't served under the new version
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_api_snapshot(sender, raw=False, **kwargs):
+    if sender._meta.app_label != 'core' or raw:
+        return
+    schedule_refresh(sender)
+
+
+@receiver(post_save)
+def index_saved_instance(sender, instance, raw=False, **kwargs):
+    if sender not in SOURCES_BY_MODEL or raw:
+        return
+    transaction.on_commit(lambda: search_index.update_instance(instance))
+
+
+@receiver(post_delete)
+def unindex_deleted_instance(sender, instance, **kwargs):
+    if sender not in SOURCES_BY_MODEL:
+        return
+    # The instance's pk is cleared once the delete finishes, so pass it now
+    transaction.on_commit(lambda pk=instance.pk: search_index.remove(sender, pk))
+
+
+@receiver(pre_delete, sender=Service)
+@receiver(pre_delete, sender=Portfolio)
+def remember_technology_tags(sender, instance, **kwargs):
+    # The M2M rows are gone by post_delete, so note the tags now
+    instance._technology_tag_ids = set(instance.technology_tags.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Portfolio)
+def recount_technology_tags(sender, instance, **kwargs):
+    Technology.refresh_counts(getattr(instance, '_technology_tag_ids', set()))
+
+
+@receiver(post_save)
+def process_uploaded_images(sender, instance, raw=False, **kwargs):
+    if sender not in IMAGE_FIELDS or raw:
+        return
+    if needs_processing(instance):
+        schedule_image_processing(instance)
+
+
+@receiver(post_delete)
+def delete_image_derivatives(sender, instance, **kwargs):
+    if sender not in IMAGE_FIELDS:
+        return
+    schedule_derivative_cleanup(instance)
+
+
+@receiver(post_save, sender=Contact)
+def count_saved_contact(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_stat_key', None)
+    current = instance.stat_key()
+    if raw or previous == current:
+        return
+    changes = {current: 1}
+    if previous:
+        changes[previous] = -1
+    ContactDailyStat.apply(changes)
+    instance._stat_key = current
+
+
+@receiver(post_delete, sender=Contact)
+def uncount_deleted_contact(sender, instance, **kwargs):
+    key = getattr(instance, '_stat_key', None) or instance.stat_key()
+    if key:
+        ContactDailyStat.apply({key: -1})
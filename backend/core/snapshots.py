@@ -0,0 +1,165 @@
+"""
+Static JSON snapshot of the public read-only API.
+
+Every list, featured and detail endpoint is rendered through the normal
+request stack and written below API_SNAPSHOT_ROOT in the same URL layout
+(`/api/services/` -> `api/services/index.json`), together with pre-compressed
+`.gz` and, when the `brotli` package is installed, `.br` copies. nginx serves
+these for plain GET requests and proxies everything else to Django (see
+deploy/nginx-site.conf).
+
+Files are only rewritten when their content changes. After a model is saved
+or deleted, only the endpoints that depend on it (their `cache_models`) are
+re-rendered, from a background job (see core/signals.py and core/tasks.py).
+"""
+import gzip
+import os
+import shutil
+import tempfile
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+
+from .jobs import enqueue
+from .models import BackgroundJob, CompanyInfo, Portfolio, Service, Testimonial
+from .views import (
+    BlogPostViewSet, CompanyInfoViewSet, JobOpeningViewSet, PortfolioViewSet,
+    ServiceViewSet, TeamMemberViewSet, TestimonialViewSet
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+INDEX_FILE = 'index.json'
+
+# (router basename, viewset) for every snapshotted viewset
+SNAPSHOT_VIEWSETS = [
+    ('service', ServiceViewSet),
+    ('portfolio', PortfolioViewSet),
+    ('testimonial', TestimonialViewSet),
+    ('company-info', CompanyInfoViewSet),
+    ('team', TeamMemberViewSet),
+    ('job', JobOpeningViewSet),
+    ('post', BlogPostViewSet),
+]
+HOME_MODELS = [CompanyInfo, Service, Portfolio, Testimonial]
+
+
+def get_dependencies(viewset):
+    return set(getattr(viewset, 'cache_models', None) or [viewset.queryset.model])
+
+
+SNAPSHOT_MODELS = set(HOME_MODELS).union(
+    *[get_dependencies(viewset) for basename, viewset in SNAPSHOT_VIEWSETS]
+)
+
+
+class SnapshotWriter:
+    def __init__(self, root=None, base_url=None):
+        self.root = root or settings.API_SNAPSHOT_ROOT
+        base_url = urlsplit(base_url or settings.API_SNAPSHOT_BASE_URL)
+        self.secure = base_url.scheme == 'https'
+        self.client = Client(HTTP_HOST=base_url.netloc, HTTP_ACCEPT='application/json')
+        self.stats = {'written': 0, 'unchanged': 0, 'removed': 0}
+
+    def export(self, models=None):
+        """
+        Render every endpoint, or only those depending on one of `models`,
+        and return counts of written, unchanged and removed files
+        """
+        models = set(models) if models is not None else None
+        if models is None or models & set(HOME_MODELS):
+            self.write_path(reverse('home'))
+        for basename, viewset in SNAPSHOT_VIEWSETS:
+            if models is None or models & get_dependencies(viewset):
+                self.export_viewset(basename, viewset)
+        return self.stats
+
+    def export_viewset(self, basename, viewset):
+        list_path = reverse(f'{basename}-list')
+        self.write_path(list_path)
+        if hasattr(viewset, 'featured'):
+            self.write_path(reverse(f'{basename}-featured'))
+
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        lookups = {
+            str(value)
+            for value in viewset.queryset.values_list(viewset.lookup_field, flat=True)
+        }
+        for value in sorted(lookups):
+            self.write_path(reverse(f'{basename}-detail', kwargs={lookup_url_kwarg: value}))
+        self.prune(list_path, lookups | {'featured'})
+
+    def get_directory(self, path):
+        return os.path.join(self.root, path.strip('/'))
+
+    def write_path(self, path):
+        response = self.client.get(path, secure=self.secure)
+        if response.status_code == 404:
+            self.remove_directory(self.get_directory(path))
+            return
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+
+        directory = self.get_directory(path)
+        filename = os.path.join(directory, INDEX_FILE)
+        content = response.content
+        try:
+            with open(filename, 'rb') as fh:
+                if fh.read() == content:
+                    self.stats['unchanged'] += 1
+                    return
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(directory, exist_ok=True)
+        # Compressed copies first, so nginx never pairs a new index.json
+        # with a stale .gz/.br
+        self.write_file(filename + '.gz', gzip.compress(content, mtime=0))
+        if brotli is not None:
+            self.write_file(filename + '.br', brotli.compress(content))
+        self.write_file(filename, content)
+        self.stats['written'] += 1
+
+    def write_file(self, filename, content):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, filename)
+
+    def prune(self, list_path, keep):
+        """Remove detail snapshots of objects that are gone or no longer public"""
+        directory = self.get_directory(list_path)
+        try:
+            entries = os.listdir(directory)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            path = os.path.join(directory, entry)
+            if entry not in keep and os.path.isdir(path):
+                self.remove_directory(path)
+
+    def remove_directory(self, directory):
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+            self.stats['removed'] += 1
+
+
+def export_snapshot(models=None, root=None, base_url=None):
+    return SnapshotWriter(root, base_url).export(models)
+
+
+def schedule_refresh(model):
+    """Queue an incremental refresh of the snapshots that depend on `model`"""
+    if not settings.API_SNAPSHOT_ROOT or model not in SNAPSHOT_MODELS:
+        return
+    payload = {'models': [model._meta.label]}
+    # One pending refresh per model is enough, however many rows changed
+    pending = BackgroundJob.objects.filter(name='snapshot.refresh', status='pending', payload=payload)
+    if not pending.exists():
+        enqueue('snapshot.refresh', payload)
@@ -0,0 +1,63 @@
+"""Background tasks run by the job queue (see core/jobs.py)"""
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .jobs import task
+from .models import CompanyInfo, Contact
+from .snapshots import export_snapshot
+
+
+def get_notification_recipients():
+    if settings.CONTACT_NOTIFICATION_EMAILS:
+        return settings.CONTACT_NOTIFICATION_EMAILS
+    company_email = CompanyInfo.objects.values_list('email', flat=True).first()
+    return [company_email] if company_email else []
+
+
+@task('contact.notify_admin')
+def notify_admin(contact_id):
+    """Email the team about a new contact submission"""
+    contact = Contact.objects.filter(pk=contact_id).first()
+    recipients = get_notification_recipients()
+    if contact is None or not recipients:
+        return
+    send_mail(
+        subject=f'New {contact.get_inquiry_type_display()} inquiry: {contact.subject}',
+        message=(
+            f'From: {contact.name} <{contact.email}>\n'
+            f'Phone: {contact.phone or "-"}\n'
+            f'Company: {contact.company or "-"}\n'
+            f'Budget: {contact.budget or "-"}\n'
+            f'Timeline: {contact.timeline or "-"}\n\n'
+            f'{contact.message}'
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=recipients,
+    )
+
+
+@task('contact.auto_reply')
+def auto_reply(contact_id):
+    """Confirm receipt to the person who submitted the contact form"""
+    contact = Contact.objects.filter(pk=contact_id).first()
+    if contact is None:
+        return
+    company_name = CompanyInfo.objects.values_list('company_name', flat=True).first() or 'TeamError'
+    send_mail(
+        subject=f'We received your message: {contact.subject}',
+        message=(
+            f'Hi {contact.name},\n\n'
+            f'Thank you for contacting {company_name}. We have received your message '
+            f'and will get back to you soon.\n\n'
+            f'{company_name}'
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[contact.email],
+    )
+
+
+@task('snapshot.refresh')
+def refresh_snapshot(models):
+    """Re-render the static API snapshot files that depend on `models`"""
+    export_snapshot([apps.get_model(label) for label in models])
@@ -0,0 +1,26 @@
+"""
+Test runner keeping the test suite away from files the app writes at
+runtime.
+
+Saving content updates the search index on disk (see core/search.py), so
+every test run gets its own SEARCH_INDEX_PATH in a temporary directory
+instead of rewriting the real index.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._runtime_dir = tempfile.TemporaryDirectory()
+        self._search_index_path = settings.SEARCH_INDEX_PATH
+        settings.SEARCH_INDEX_PATH = os.path.join(self._runtime_dir.name, 'search_index.json')
+
+    def teardown_test_environment(self, **kwargs):
+        settings.SEARCH_INDEX_PATH = self._search_index_path
+        self._runtime_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,3 +1,1574 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection
+from django.db.models import F, Sum
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve
+from django.utils import timezone
+from PIL import Image
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .archive import archive_contacts
+from .benchmarks import SCALES, SEED_USERNAME, flush_dataset, get_routes, run_benchmarks, seed_dataset
+from .cache import bump_version, get_stats, get_versions
+from .models import (
+    ArchivedContact, BackgroundJob, BlogPost, CacheVersion, CompanyInfo, Contact, ContactDailyStat, JobOpening, Portfolio, Service, TeamMember, Technology,
+    Testimonial
+)
+from .images import process_instance_images
+from .jobs import enqueue, run_pending, task
+from .metrics import registry
+from .ordering import apply_order, move
+from .pagination import EstimatedCountPaginator
+from .ndjson import ContentImportError, export_ndjson, import_ndjson
+from .search import SearchIndex, search_index
+from .snapshots import export_snapshot
+from .throttling import get_cache as get_throttle_cache
+from . import views
+
+
+def make_portfolio(**kwargs):
+    defaults = {
+        'title': 'Project',
+        'short_description': 'Short description',
+        'challenge': 'Challenge',
+        'solution': 'Solution',
+        'result': 'Result',
+        'thumbnail': 'portfolio/thumbnails/project.jpg',
+        'technologies': 'Django, React',
+        'project_date': date(2025, 1, 1),
+    }
+    defaults.update(kwargs)
+    return Portfolio.objects.create(**defaults)
+
+
+def make_testimonial(**kwargs):
+    defaults = {
+        'client_name': 'Client',
+        'client_position': 'CEO',
+        'client_company': 'Acme',
+        'review': 'Great work',
+    }
+    defaults.update(kwargs)
+    return Testimonial.objects.create(**defaults)
+
+
+def make_service(**kwargs):
+    defaults = {
+        'title': 'Web Development',
+        'short_description': 'Short description',
+        'full_description': 'Full description',
+        'icon': 'fas fa-code',
+        'technologies': 'Django, React',
+    }
+    defaults.update(kwargs)
+    return Service.objects.create(**defaults)
+
+
+@override_settings(API_CACHE_VERSION_STORE='cache')
+class PortfolioDetailQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_detail_query_count_independent_of_testimonials(self):
+        portfolio = make_portfolio(title='Case Study')
+        url = f'/api/portfolio/{portfolio.slug}/'
+
+        # Conditional GET validator, portfolio, prefetched testimonials
+        make_testimonial(project=portfolio)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['testimonials']), 1)
+
+        for i in range(5):
+            make_testimonial(project=portfolio, client_name=f'Client {i}')
+        make_testimonial(project=portfolio, is_active=False)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['testimonials']), 6)
+        self.assertEqual(response.data['testimonials'][0]['project_title'], 'Case Study')
+
+
+@override_settings(API_CACHE_VERSION_STORE='cache')
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list_is_served_from_cache(self):
+        make_service()
+        response = self.client.get('/api/services/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/services/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(get_stats()['hits'], 1)
+        self.assertEqual(get_stats()['misses'], 1)
+
+    def test_query_params_are_part_of_the_key(self):
+        make_service()
+        self.client.get('/api/services/')
+        response = self.client.get('/api/services/?search=nothing')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_save_and_delete_invalidate(self):
+        service = make_service()
+        self.client.get('/api/services/')
+
+        service.title = 'Mobile Apps'
+        service.save()
+        response = self.client.get('/api/services/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Mobile Apps')
+
+        service.delete()
+        response = self.client.get('/api/services/')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_dependent_model_invalidates(self):
+        portfolio = make_portfolio(featured=True)
+        make_testimonial(project=portfolio, featured=True)
+        self.client.get('/api/testimonials/featured/')
+
+        portfolio.title = 'Renamed'
+        portfolio.save()
+        response = self.client.get('/api/testimonials/featured/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['project_title'], 'Renamed')
+
+
+@override_settings(API_CACHE_VERSION_STORE='database')
+class CacheVersionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_versions_survive_a_process_local_cache(self):
+        version, = get_versions([Service])
+        bump_version(Service)
+        # Another worker's local cache never saw the bump
+        cache.clear()
+        self.assertEqual(get_versions([Service]), [version + 1])
+        self.assertEqual(CacheVersion.objects.get(label='core.service').version, version + 1)
+
+    def test_uncached_models_leave_the_versions_alone(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/contact/', {
+                'name': 'Ana', 'email': 'ana@example.com', 'subject': 'Hello',
+                'message': 'Hi', 'inquiry_type': 'general',
+            })
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(CacheVersion.objects.exists())
+
+    def test_change_in_another_worker_invalidates(self):
+        make_service()
+        self.client.get('/api/services/')
+        # What a save in another worker leaves behind: the row and the counter
+        Service.objects.update(title='Mobile Apps')
+        CacheVersion.objects.filter(label='core.service').update(version=F('version') + 1)
+        response = self.client.get('/api/services/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Mobile Apps')
+
+
+@override_settings(API_CACHE_VERSION_STORE='cache')
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list_etag_round_trip(self):
+        make_service()
+        response = self.client.get('/api/services/')
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        response = self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_a_row_is_deactivated(self):
+        make_service()
+        hidden = make_service(title='Mobile Apps')
+        etag = self.client.get('/api/services/')['ETag']
+        # updated_at of the remaining rows doesn't move
+        Service.objects.filter(pk=hidden.pk).update(is_active=False)
+        bump_version(Service)
+        response = self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_portfolio_detail_etag_covers_testimonials(self):
+        project = make_portfolio()
+        testimonial = make_testimonial(project=project)
+        url = f'/api/portfolio/{project.slug}/'
+        etag = self.client.get(url)['ETag']
+        testimonial.review = 'Even better'
+        testimonial.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(API_CACHE_TIMEOUT=0)
+    def test_not_modified_on_cache_miss_skips_serialization(self):
+        service = make_service()
+        url = f'/api/services/{service.slug}/'
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_change_invalidates_etag(self):
+        service = make_service()
+        url = f'/api/services/{service.slug}/'
+        etag = self.client.get(url)['ETag']
+
+        service.short_description = 'Changed'
+        service.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_blog_post_edit_invalidates_etag(self):
+        post = BlogPost.objects.create(
+            title='Post', content='Body', is_published=True, published_at=timezone.now()
+        )
+        url = f'/api/posts/{post.slug}/'
+        etag = self.client.get(url)['ETag']
+
+        post.content = 'Edited'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['content'], 'Edited')
+
+    def test_missing_object_is_404(self):
+        response = self.client.get('/api/services/missing/')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(API_CACHE_VERSION_STORE='cache')
+class HomeEndpointTests(TestCase):
+    def setUp(self):
+        CompanyInfo.objects.create()
+        cache.clear()
+        self.client = APIClient()
+
+    def test_home_uses_fixed_number_of_queries(self):
+        make_service()
+        for i in range(3):
+            portfolio = make_portfolio(title=f'Project {i}', featured=True)
+            make_testimonial(project=portfolio, featured=True)
+
+        # company info, services, portfolio, testimonials
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/home/')
+        self.assertEqual(len(response.data['services']), 1)
+        self.assertEqual(len(response.data['featured_portfolio']), 3)
+        self.assertEqual(len(response.data['featured_testimonials']), 3)
+        self.assertIn('company_name', response.data['company_info'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/home/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_home_is_invalidated_by_any_section(self):
+        service = make_service()
+        etag = self.client.get('/api/home/')['ETag']
+        self.assertEqual(
+            self.client.get('/api/home/', HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        service.title = 'Renamed'
+        service.save()
+        response = self.client.get('/api/home/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['services'][0]['title'], 'Renamed')
+
+
+class SearchFallbackTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_blog_search_matches_content(self):
+        now = timezone.now()
+        BlogPost.objects.create(
+            title='Scaling Django', content='Notes on connection pooling', is_published=True,
+            published_at=now
+        )
+        BlogPost.objects.create(
+            title='React hooks', content='State management', is_published=True, published_at=now
+        )
+        response = self.client.get('/api/posts/', {'search': 'pooling'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Scaling Django')
+
+    def test_service_search_keeps_default_ordering(self):
+        make_service(title='Web Apps', technologies='Django', order=2)
+        make_service(title='APIs', technologies='Django REST', order=1)
+        make_service(title='Mobile', technologies='Flutter', order=0)
+        response = self.client.get('/api/services/', {'search': 'django'})
+        titles = [item['title'] for item in response.data['results']]
+        self.assertEqual(titles, ['APIs', 'Web Apps'])
+
+
+class UnifiedSearchTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.index_path = os.path.join(tmpdir.name, 'index.json')
+        settings_override = override_settings(SEARCH_INDEX_PATH=self.index_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+
+        make_service(title='Django Development', technologies='Django, PostgreSQL')
+        make_portfolio(title='Shop', technologies='React, Django')
+        BlogPost.objects.create(
+            title='Scaling Django', content='Connection pooling with <pgbouncer>',
+            is_published=True, published_at=timezone.now()
+        )
+        BlogPost.objects.create(title='Draft about Django', content='Unpublished')
+        JobOpening.objects.create(title='Backend Engineer', description='Work on our Django API')
+        search_index.rebuild()
+
+    def test_results_are_ranked_and_typed(self):
+        response = self.client.get('/api/search/', {'q': 'django'})
+        self.assertEqual(response.data['count'], 4)
+        results = response.data['results']
+        self.assertEqual({r['type'] for r in results}, {'service', 'portfolio', 'post', 'job'})
+        # Title matches outrank body matches
+        self.assertEqual(results[-1]['type'], 'job')
+        self.assertIn('<mark>Django</mark>', results[0]['highlights']['title'])
+
+    def test_type_filter_and_prefix_match(self):
+        response = self.client.get('/api/search/', {'q': 'pool', 'type': 'post'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(
+            response.data['results'][0]['highlights']['content'],
+            'Connection <mark>pooling</mark> with &lt;pgbouncer&gt;'
+        )
+
+    def test_incremental_updates_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            service = make_service(title='Flutter Apps', technologies='Flutter')
+        self.assertEqual(self.client.get('/api/search/', {'q': 'flutter'}).data['count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service.is_active = False
+            service.save()
+        self.assertEqual(self.client.get('/api/search/', {'q': 'flutter'}).data['count'], 0)
+
+    def test_other_processes_reload_persisted_index(self):
+        other = SearchIndex(path=self.index_path)
+        self.assertEqual(len(other.search('scaling')), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.filter(title='Scaling Django').get().delete()
+        self.assertEqual(other.search('scaling'), [])
+
+    def test_updates_from_two_processes_are_both_kept(self):
+        first = SearchIndex(path=self.index_path)
+        second = SearchIndex(path=self.index_path)
+        first.search('scaling')
+        second.search('scaling')
+        now = timezone.now()
+        # Saved without signals, as if in two other workers
+        kotlin = BlogPost.objects.bulk_create([
+            BlogPost(title='Kotlin tips', slug='kotlin-tips', content='Coroutines', is_published=True, published_at=now)
+        ])[0]
+        swift = BlogPost.objects.bulk_create([
+            BlogPost(title='Swift tips', slug='swift-tips', content='Actors', is_published=True, published_at=now)
+        ])[0]
+        first.update_instance(kotlin)
+        # Reloads what the first process wrote before adding its own change
+        second.update_instance(swift)
+        persisted = SearchIndex(path=self.index_path)
+        self.assertEqual(len(persisted.search('kotlin')), 1)
+        self.assertEqual(len(persisted.search('swift')), 1)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def collect(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return seen
+
+    def test_contacts_walk_all_pages_with_ties(self):
+        for i in range(25):
+            Contact.objects.create(
+                name=f'Person {i}', email=f'p{i}@example.com', subject='Hi', message='Hello'
+            )
+        # Give many rows the same timestamp to exercise the id tie-breaker
+        Contact.objects.filter(id__lte=15).update(submitted_at=timezone.now())
+        expected = list(Contact.objects.order_by('-submitted_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.collect('/api/contact/?pagination=cursor'), expected)
+
+    def test_blog_posts_with_null_dates_sort_first(self):
+        now = timezone.now()
+        for i in range(12):
+            BlogPost.objects.create(
+                title=f'Post {i}', content='Body', is_published=True,
+                published_at=None if i % 4 == 0 else now
+            )
+        ids = self.collect('/api/posts/?pagination=cursor')
+        self.assertEqual(len(ids), 12)
+        self.assertEqual(len(set(ids)), 12)
+        null_ids = set(BlogPost.objects.filter(published_at__isnull=True).values_list('id', flat=True))
+        self.assertEqual(set(ids[:3]), null_ids)
+
+    def test_portfolio_keyset_matches_default_ordering(self):
+        for i in range(15):
+            make_portfolio(title=f'Project {i}', featured=i % 3 == 0, order=i % 2)
+        expected = list(
+            Portfolio.objects.order_by('-featured', 'order', '-project_date', 'id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(self.collect('/api/portfolio/?pagination=cursor'), expected)
+
+    def test_page_number_mode_is_default(self):
+        make_portfolio()
+        response = self.client.get('/api/portfolio/')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get('/api/contact/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unsupported_ordering_is_rejected(self):
+        make_portfolio()
+        response = self.client.get('/api/posts/?pagination=cursor&ordering=published_at')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+        # The keyset ordering itself is fine
+        response = self.client.get('/api/posts/?pagination=cursor&ordering=-published_at')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/portfolio/?pagination=cursor&ordering=order')
+        self.assertEqual(response.status_code, 400)
+        # Page-number pagination still follows ?ordering=
+        self.assertEqual(self.client.get('/api/portfolio/?ordering=order').status_code, 200)
+
+
+class ListIndexUsageTests(TestCase):
+    """Every public list query is served by one of the partial indexes"""
+    expected_indexes = {
+        views.ServiceViewSet: 'service_active_order_idx',
+        views.PortfolioViewSet: 'portfolio_active_order_idx',
+        views.TestimonialViewSet: 'testimonial_active_order_idx',
+        views.TeamMemberViewSet: 'teammember_active_order_idx',
+        views.JobOpeningViewSet: 'jobopening_active_posted_idx',
+        views.BlogPostViewSet: 'blogpost_published_idx',
+    }
+
+    def get_list_queryset(self, viewset_class):
+        view = viewset_class()
+        view.action = 'list'
+        view.request = Request(APIRequestFactory().get('/'))
+        view.format_kwarg = None
+        view.kwargs = {}
+        return view.filter_queryset(view.get_queryset())
+
+    def test_list_queries_use_indexes(self):
+        if connection.vendor == 'postgresql':
+            # Tables are tiny in tests, so the planner would always prefer a
+            # sequential scan otherwise.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for viewset_class, index_name in self.expected_indexes.items():
+            with self.subTest(viewset=viewset_class.__name__):
+                plan = self.get_list_queryset(viewset_class).explain()
+                self.assertIn(index_name, plan)
+
+
+class StructuredFieldTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_lists_are_parsed_on_save(self):
+        service = make_service(technologies='Django, React, ,', process_steps='Plan\n\nBuild\n')
+        self.assertEqual(service.technologies_list, ['Django', 'React'])
+        self.assertEqual(service.process_steps_list, ['Plan', 'Build'])
+        self.assertEqual(
+            sorted(service.technology_tags.values_list('slug', flat=True)), ['django', 'react']
+        )
+
+        job = JobOpening.objects.create(title='Engineer', description='Job', requirements='Python\nSQL')
+        self.assertEqual(job.requirements_list, ['Python', 'SQL'])
+
+    def test_tags_are_shared_and_follow_edits(self):
+        service = make_service(technologies='Django, React')
+        portfolio = make_portfolio(technologies='react')
+        self.assertEqual(
+            list(portfolio.technology_tags.all()), list(service.technology_tags.filter(slug='react'))
+        )
+
+        portfolio.technologies = 'Vue'
+        portfolio.save()
+        self.assertEqual(list(portfolio.technology_tags.values_list('slug', flat=True)), ['vue'])
+
+    def test_tech_filter(self):
+        make_portfolio(title='Shop', technologies='React, Django')
+        make_portfolio(title='Blog', technologies='Django')
+        response = self.client.get('/api/portfolio/', {'tech': ['django', 'react']})
+        self.assertEqual([item['title'] for item in response.data['results']], ['Shop'])
+        self.assertEqual(response.data['results'][0]['technologies_list'], ['React', 'Django'])
+
+
+@override_settings(API_CACHE_VERSION_STORE='cache')
+class TechnologyFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.shop = make_portfolio(title='Shop', technologies='React, Django')
+        make_portfolio(title='Blog', technologies='Django')
+        make_portfolio(title='Hidden', technologies='Vue', is_active=False)
+
+    def facets(self, response):
+        return {tag['slug']: tag['count'] for tag in response.data['facets']['tech']}
+
+    def test_unfiltered_facets_use_precomputed_counts(self):
+        # list, facets (no GROUP BY), plus the conditional GET validator
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/portfolio/')
+        self.assertEqual(self.facets(response), {'django': 2, 'react': 1})
+        # Sparse fieldsets don't filter either
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/portfolio/', {'fields': 'title,slug', 'expand': 'testimonials'})
+        self.assertFalse([query for query in captured.captured_queries if 'GROUP BY' in query['sql']])
+        self.assertEqual(self.facets(response), {'django': 2, 'react': 1})
+
+    def test_filtered_facets_count_matching_items(self):
+        response = self.client.get('/api/portfolio/', {'tech': 'react'})
+        self.assertEqual(self.facets(response), {'django': 1, 'react': 1})
+
+    def test_counts_follow_edits_and_deletes(self):
+        self.shop.is_active = False
+        self.shop.save()
+        self.assertEqual(Technology.objects.get(slug='react').portfolio_count, 0)
+
+        Portfolio.objects.get(title='Blog').delete()
+        self.assertEqual(Technology.objects.get(slug='django').portfolio_count, 0)
+        self.assertEqual(self.facets(self.client.get('/api/portfolio/')), {})
+
+    def test_counts_follow_bulk_updates(self):
+        Portfolio.objects.filter(is_active=True).update(is_active=False)
+        self.assertEqual(Technology.objects.get(slug='django').portfolio_count, 0)
+
+        hidden = Portfolio.objects.get(title='Hidden')
+        hidden.is_active = True
+        Portfolio.objects.bulk_update([hidden], ['is_active'])
+        self.assertEqual(Technology.objects.get(slug='vue').portfolio_count, 1)
+
+    def test_symbols_get_their_own_tags(self):
+        make_portfolio(title='Engine', technologies='C, C++, C#, F#, .NET')
+        self.assertEqual(
+            set(Technology.objects.values_list('slug', flat=True)),
+            {'react', 'django', 'vue', 'c', 'c-plus-plus', 'c-sharp', 'f-sharp', 'dot-net'}
+        )
+        response = self.client.get('/api/portfolio/', {'tech': 'c-sharp'})
+        self.assertEqual([item['title'] for item in response.data['results']], ['Engine'])
+
+
+def make_image(name='photo.png', size=(800, 600)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.media_root = tmpdir.name
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_DERIVATIVES_ASYNC=False,
+            IMAGE_DERIVATIVE_WIDTHS=[320, 640, 1024],
+            IMAGE_DERIVATIVE_FORMATS=['webp'],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.client = APIClient()
+
+    def test_upload_generates_width_bounded_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            member = TeamMember.objects.create(name='Ana', position='Dev', photo=make_image())
+        member.refresh_from_db()
+        entry = member.image_derivatives['photo']
+        # No upscaling beyond the 800px original
+        self.assertEqual([width for width, name in entry['variants']['webp']], [320, 640, 800])
+        for width, name in entry['variants']['webp']:
+            with Image.open(os.path.join(self.media_root, name)) as derived:
+                self.assertEqual(derived.format, 'WEBP')
+                self.assertEqual(derived.width, width)
+
+        response = self.client.get('/api/team/')
+        srcset = response.data['results'][0]['image_srcsets']['photo']['webp']
+        self.assertIn('-320w.webp 320w', srcset)
+        self.assertTrue(srcset.startswith('http://testserver/media/team/_derived/'))
+
+    def test_processing_is_idempotent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            member = TeamMember.objects.create(name='Ana', position='Dev', photo=make_image())
+        name = TeamMember.objects.get().image_derivatives['photo']['variants']['webp'][0][1]
+        path = os.path.join(self.media_root, name)
+        mtime = os.stat(path).st_mtime_ns
+
+        process_instance_images(TeamMember, member.pk)
+        TeamMember.objects.filter(pk=member.pk).update(image_derivatives={})
+        process_instance_images(TeamMember, member.pk)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        self.assertIn('photo', TeamMember.objects.get().image_derivatives)
+
+    def test_missing_original_is_skipped(self):
+        member = TeamMember.objects.create(name='Ana', position='Dev', photo='team/missing.png')
+        with self.assertLogs('core.images', 'WARNING'):
+            process_instance_images(TeamMember, member.pk)
+        self.assertEqual(TeamMember.objects.get().image_derivatives, {})
+
+    def derived_files(self, member):
+        member.refresh_from_db()
+        return [
+            os.path.join(self.media_root, name)
+            for width, name in member.image_derivatives['photo']['variants']['webp']
+        ]
+
+    def test_same_stem_different_extension(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            png = TeamMember.objects.create(name='Ana', position='Dev', photo=make_image('photo.png'))
+            jpg = TeamMember.objects.create(name='Bob', position='Dev', photo=make_image('photo.jpg'))
+        self.assertFalse(set(self.derived_files(png)) & set(self.derived_files(jpg)))
+
+    def test_replaced_and_deleted_images_lose_their_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            member = TeamMember.objects.create(name='Ana', position='Dev', photo=make_image())
+        old_files = self.derived_files(member)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member.photo = make_image('portrait.png')
+            member.save()
+        new_files = self.derived_files(member)
+        self.assertFalse(any(os.path.exists(path) for path in old_files))
+        self.assertTrue(all(os.path.exists(path) for path in new_files))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member.delete()
+        self.assertFalse(any(os.path.exists(path) for path in new_files))
+
+
+_flaky_calls = []
+
+
+@task('tests.flaky')
+def flaky_task(fail_times):
+    _flaky_calls.append(fail_times)
+    if len(_flaky_calls) <= fail_times:
+        raise RuntimeError('boom')
+
+
+@override_settings(CONTACT_NOTIFICATION_EMAILS=['team@example.com'], JOB_RETRY_DELAY=30)
+class BackgroundJobTests(TestCase):
+    def setUp(self):
+        _flaky_calls.clear()
+        get_throttle_cache().clear()
+        self.client = APIClient()
+
+    def test_contact_submission_enqueues_emails(self):
+        response = self.client.post('/api/contact/', {
+            'name': 'Ana', 'email': 'ana@example.com', 'subject': 'New site',
+            'message': 'Hello', 'inquiry_type': 'quote',
+        })
+        self.assertEqual(response.status_code, 201)
+        # Nothing is sent inside the request
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(BackgroundJob.objects.values_list('name', flat=True)),
+            ['contact.auto_reply', 'contact.notify_admin']
+        )
+
+        self.assertEqual(run_pending(), 2)
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertEqual(recipients, ['ana@example.com', 'team@example.com'])
+        self.assertFalse(BackgroundJob.objects.exclude(status='succeeded').exists())
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = enqueue('tests.flaky', {'fail_times': 1})
+        with self.assertLogs('core.jobs', 'WARNING'):
+            self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+        # Not due yet
+        self.assertEqual(run_pending(), 0)
+
+        BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.attempts, 2)
+
+    def test_job_is_dead_lettered_after_max_attempts(self):
+        job = enqueue('tests.flaky', {'fail_times': 5}, max_attempts=2)
+        with self.assertLogs('core.jobs', 'WARNING'):
+            run_pending()
+            BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'dead')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(len(_flaky_calls), 2)
+
+    def test_admin_retries_only_dead_jobs(self):
+        dead = enqueue('tests.flaky')
+        succeeded = enqueue('tests.flaky')
+        BackgroundJob.objects.filter(pk=dead.pk).update(status='dead', attempts=5)
+        BackgroundJob.objects.filter(pk=succeeded.pk).update(status='succeeded', attempts=1)
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(admin)
+        response = self.client.post('/admin/core/backgroundjob/', {
+            'action': 'retry_jobs', '_selected_action': [dead.pk, succeeded.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            dict(BackgroundJob.objects.values_list('pk', 'status')),
+            {dead.pk: 'pending', succeeded.pk: 'succeeded'}
+        )
+
+    def test_worker_refreshes_connections_between_polls(self):
+        module = 'core.management.commands.run_jobs'
+        with mock.patch(f'{module}.run_pending', side_effect=[0, 1, KeyboardInterrupt]), \
+                mock.patch(f'{module}.close_old_connections') as close_old_connections, \
+                mock.patch(f'{module}.time.sleep'):
+            call_command('run_jobs', stdout=StringIO())
+        self.assertEqual(close_old_connections.call_count, 3)
+
+
+# Root URLconf for AsyncReadApiTests: only the async read-only endpoints
+urlpatterns = [path('api/', include('core.async_urls'))]
+
+
+class AsyncReadApiTests(TestCase):
+    """The async views must return exactly what the sync views return"""
+
+    def setUp(self):
+        CompanyInfo.objects.create()
+        service = make_service(technologies='Django, React')
+        make_service(title='Mobile Apps', technologies='Flutter')
+        project = make_portfolio(title='Shop', featured=True)
+        make_portfolio(title='Blog')
+        make_testimonial(project=project, featured=True)
+        TeamMember.objects.create(name='Ana', position='Dev')
+        self.service_slug = service.slug
+        self.project_slug = project.slug
+        self.client = APIClient()
+
+    async def assert_same_as_sync(self, url):
+        await cache.aclear()
+        expected = await sync_to_async(self.client.get)(url)
+        await cache.aclear()
+        with override_settings(ROOT_URLCONF=__name__):
+            response = await AsyncClient().get(url)
+            self.assertEqual(response.status_code, expected.status_code, url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(json.loads(response.content), expected.json(), url)
+            # A repeated request is served from the shared response cache
+            cached = await AsyncClient().get(url, headers={'if-none-match': response['ETag']})
+            self.assertEqual(cached.status_code, 304)
+
+    async def test_matches_sync_responses(self):
+        for url in [
+            '/api/services/',
+            '/api/services/?tech=django',
+            f'/api/services/{self.service_slug}/',
+            '/api/portfolio/',
+            '/api/portfolio/?pagination=cursor',
+            '/api/portfolio/featured/',
+            f'/api/portfolio/{self.project_slug}/',
+            '/api/testimonials/featured/',
+            '/api/team/',
+            '/api/home/',
+        ]:
+            await self.assert_same_as_sync(url)
+
+    async def test_company_info_matches_sync_response(self):
+        expected = await sync_to_async(self.client.get)('/api/company-info/')
+        with override_settings(ROOT_URLCONF=__name__):
+            response = await AsyncClient().get('/api/company-info/')
+            self.assertEqual(json.loads(response.content), expected.json())
+            self.assertEqual(response['ETag'], expected['ETag'])
+            cached = await AsyncClient().get('/api/company-info/', headers={'if-none-match': response['ETag']})
+            self.assertEqual(cached.status_code, 304)
+
+    async def test_not_found(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            response = await AsyncClient().get('/api/services/missing/')
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(json.loads(response.content), {'detail': 'No Service matches the given query.'})
+            response = await AsyncClient().get('/api/portfolio/?page=9')
+            self.assertEqual(response.status_code, 404)
+
+    def test_routes_are_named_like_the_sync_routes(self):
+        # So request metrics label both the same way
+        for url, name in [
+            ('/api/home/', 'home'),
+            ('/api/services/', 'service-list'),
+            (f'/api/services/{self.service_slug}/', 'service-detail'),
+            ('/api/portfolio/featured/', 'portfolio-featured'),
+        ]:
+            self.assertEqual(resolve(url, urlconf=__name__).view_name, name)
+            self.assertEqual(resolve(url).view_name, name)
+
+
+@override_settings(API_CACHE_VERSION_STORE='cache')
+class CompanyInfoSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CompanyInfo.objects.create(company_name='TeamError')
+        self.client = APIClient()
+
+    def test_steady_state_needs_no_queries(self):
+        CompanyInfo.prewarm()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/company-info/')
+        self.assertEqual(response.data['company_name'], 'TeamError')
+
+    def test_conditional_get(self):
+        CompanyInfo.prewarm()
+        etag = self.client.get('/api/company-info/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/company-info/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        info = CompanyInfo.load()
+        info.company_name = 'Team Error Ltd'
+        info.save()
+        response = self.client.get('/api/company-info/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_save_invalidates_snapshot(self):
+        info = CompanyInfo.load()
+        info.company_name = 'Team Error Ltd'
+        info.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(CompanyInfo.load().company_name, 'Team Error Ltd')
+        with self.assertNumQueries(0):
+            CompanyInfo.load()
+
+    def test_returns_copies(self):
+        CompanyInfo.load().company_name = 'Changed'
+        self.assertEqual(CompanyInfo.load().company_name, 'TeamError')
+
+    @override_settings(API_CACHE_VERSION_STORE='')
+    def test_default_settings_need_no_queries(self):
+        # The local-memory cache keeps the versions in the database, which
+        # isn't read for every request either
+        CompanyInfo.prewarm()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/company-info/')
+        self.assertEqual(response.data['company_name'], 'TeamError')
+
+        # A save in another worker shows up once the snapshot expires
+        CompanyInfo.objects.update(company_name='Team Error Ltd')
+        CacheVersion.objects.filter(label='core.companyinfo').update(version=F('version') + 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(CompanyInfo.load().company_name, 'TeamError')
+        with override_settings(COMPANY_INFO_MAX_AGE=0):
+            self.assertEqual(CompanyInfo.load().company_name, 'Team Error Ltd')
+
+        # One in this worker right away
+        info = CompanyInfo.load()
+        info.company_name = 'TeamError'
+        info.save()
+        self.assertEqual(CompanyInfo.load().company_name, 'TeamError')
+
+    def test_snapshot_expires(self):
+        CompanyInfo.load()
+        CompanyInfo.objects.update(company_name='Team Error Ltd')
+        self.assertEqual(CompanyInfo.load().company_name, 'TeamError')
+        with override_settings(COMPANY_INFO_MAX_AGE=0):
+            self.assertEqual(CompanyInfo.load().company_name, 'Team Error Ltd')
+
+
+class ApiSnapshotTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = tmpdir.name
+        settings_override = override_settings(
+            API_SNAPSHOT_ROOT=self.root, API_SNAPSHOT_BASE_URL='https://testserver'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        CompanyInfo.objects.create()
+        self.service = make_service()
+        make_portfolio(title='Shop', featured=True)
+
+    def read(self, path, suffix=''):
+        with open(os.path.join(self.root, path, 'index.json' + suffix), 'rb') as fh:
+            return fh.read()
+
+    def test_export_writes_every_endpoint(self):
+        stats = export_snapshot()
+        self.assertEqual(stats['removed'], 0)
+        response = APIClient().get(f'/api/services/{self.service.slug}/', secure=True)
+        content = self.read(f'api/services/{self.service.slug}')
+        self.assertEqual(json.loads(content), response.json())
+        self.assertEqual(gzip.decompress(self.read(f'api/services/{self.service.slug}', '.gz')), content)
+        for path in ['api/home', 'api/services', 'api/portfolio', 'api/portfolio/featured',
+                     'api/portfolio/shop', 'api/testimonials/featured', 'api/company-info/1',
+                     'api/team', 'api/jobs', 'api/posts']:
+            self.assertTrue(self.read(path), path)
+
+    def test_incremental_refresh(self):
+        export_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.title = 'Web Apps'
+            self.service.save()
+        # Queued once when the service was created; the save is deduplicated
+        self.assertEqual(
+            BackgroundJob.objects.filter(
+                name='snapshot.refresh', payload={'models': ['core.Service']}
+            ).count(),
+            1
+        )
+        stats = export_snapshot([Service])
+        # home, the service list and the service detail
+        self.assertEqual(stats['written'], 3)
+        self.assertEqual(json.loads(self.read(f'api/services/{self.service.slug}'))['title'], 'Web Apps')
+
+        Service.objects.filter(pk=self.service.pk).update(is_active=False)
+        stats = export_snapshot([Service])
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'api/services', self.service.slug)))
+        self.assertEqual(stats['removed'], 1)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.project = make_portfolio(title='Shop')
+        make_testimonial(project=self.project)
+
+    def test_fields_and_omit(self):
+        response = self.client.get('/api/portfolio/?fields=title,slug')
+        self.assertEqual(set(response.data['results'][0]), {'title', 'slug'})
+        response = self.client.get('/api/portfolio/?omit=technologies,technologies_list')
+        self.assertNotIn('technologies', response.data['results'][0])
+        self.assertIn('title', response.data['results'][0])
+
+    def test_omitted_columns_are_not_loaded(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/portfolio/shop/?omit=challenge,solution,result,testimonials')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('challenge', response.data)
+        sql = ' '.join(query['sql'] for query in captured.captured_queries)
+        self.assertNotIn('"challenge"', sql)
+        # The testimonials prefetch is skipped too
+        self.assertNotIn('core_testimonial', sql)
+
+    def test_expand(self):
+        response = self.client.get('/api/testimonials/?expand=project')
+        self.assertEqual(response.data['results'][0]['project']['slug'], 'shop')
+        response = self.client.get('/api/portfolio/?expand=technology_tags&fields=technology_tags')
+        self.assertEqual(
+            response.data['results'][0]['technology_tags'],
+            [{'name': 'Django', 'slug': 'django'}, {'name': 'React', 'slug': 'react'}]
+        )
+
+
+class ListSerializerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.content = ' '.join(['word'] * 500)
+        BlogPost.objects.create(
+            title='Long post', content=self.content, is_published=True, published_at=timezone.now()
+        )
+        BlogPost.objects.create(
+            title='Summarised', excerpt='Short summary', content=self.content,
+            is_published=True, published_at=timezone.now() - timezone.timedelta(days=1)
+        )
+        JobOpening.objects.create(title='Engineer', description=self.content, requirements='Python\nSQL')
+
+    def test_blog_list_skips_content(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, 200)
+        sql = ' '.join(query['sql'] for query in captured.captured_queries)
+        # Only the first EXCERPT_SOURCE_LENGTH + 1 characters are read
+        sql = sql.replace('SUBSTR("core_blogpost"."content", 1, 1001)', '')
+        self.assertNotIn('"core_blogpost"."content"', sql)
+
+        long_post, summarised = response.data['results']
+        self.assertNotIn('content', long_post)
+        self.assertTrue(long_post['excerpt'].endswith('…'))
+        self.assertLessEqual(len(long_post['excerpt']), 201)
+        self.assertEqual(summarised['excerpt'], 'Short summary')
+
+        detail = self.client.get('/api/posts/long-post/')
+        self.assertEqual(detail.data['content'], self.content)
+
+    def test_excerpt_of_html_content_is_plain_text(self):
+        paragraphs = ''.join(
+            f'<p class="lead">Part {i} &amp; <a href="https://example.com/{i}">more</a></p>' for i in range(40)
+        )
+        BlogPost.objects.create(
+            title='Html post', content=paragraphs, is_published=True,
+            published_at=timezone.now() + timezone.timedelta(days=1)
+        )
+        excerpt = self.client.get('/api/posts/').data['results'][0]['excerpt']
+        self.assertTrue(excerpt.startswith('Part 0 & more Part 1 & more'))
+        self.assertNotIn('<', excerpt)
+        self.assertTrue(excerpt.endswith('…'))
+        self.assertLessEqual(len(excerpt), 201)
+
+    def test_job_and_service_lists(self):
+        response = self.client.get('/api/jobs/')
+        job = response.data['results'][0]
+        self.assertNotIn('requirements_list', job)
+        self.assertTrue(job['excerpt'].startswith('word word'))
+        self.assertEqual(self.client.get('/api/jobs/engineer/').data['requirements_list'], ['Python', 'SQL'])
+
+        make_service()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/services/')
+        sql = ' '.join(query['sql'] for query in captured.captured_queries)
+        self.assertNotIn('"full_description"', sql)
+        self.assertNotIn('full_description', response.data['results'][0])
+        self.assertIn('full_description', self.client.get('/api/services/web-development/').data)
+
+
+@override_settings(API_CACHE_VERSION_STORE='cache')
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.client = APIClient()
+        make_service()
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        self.client = APIClient()
+        response = self.client.get('/api/services/')
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="[1-9]\d* queries", render;dur=[\d.]+, total;dur=[\d.]+$'
+        )
+
+    def test_prometheus_endpoint(self):
+        self.client.get('/api/services/')
+        self.client.get('/api/services/')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('core_http_responses_total{route="service-list",method="GET",status="200"} 2', body)
+        self.assertIn('core_http_request_duration_seconds_count{route="service-list",method="GET"} 2', body)
+        self.assertIn('core_http_response_size_bytes_bucket{route="service-list",method="GET",le="+Inf"} 2', body)
+        # The first request ran queries; the second was a cache hit
+        self.assertIn('core_http_db_queries_bucket{route="service-list",method="GET",le="0"} 1', body)
+
+
+# As benchmark_api runs by default, without the response cache
+@override_settings(API_CACHE_TIMEOUT=0)
+class BenchmarkSuiteTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_override = override_settings(SEARCH_INDEX_PATH=os.path.join(tmpdir.name, 'index.json'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_every_route_with_constant_queries(self):
+        CompanyInfo.objects.create()
+        seed_dataset(SCALES['tiny'], rebuild_search_index=False)
+        routes = get_routes()
+        self.assertTrue({'home', 'post-list', 'post-detail', 'portfolio-featured'} <= dict(routes).keys())
+        small = run_benchmarks(requests=1, routes=routes)
+
+        # Reseeding replaces the synthetic rows rather than adding to them
+        seed_dataset({name: count * 3 for name, count in SCALES['tiny'].items()}, rebuild_search_index=False)
+        self.assertEqual(Contact.objects.count(), SCALES['tiny']['contacts'] * 3)
+        large = run_benchmarks(requests=1, routes=get_routes())
+
+        for name, result in large['routes'].items():
+            self.assertEqual(result['status'], 200, name)
+            # Measured on the uncached path: the warm-up requests must not
+            # have filled the response cache
+            self.assertEqual(result['cache_hits'], 0, name)
+            # No query count grows with the number of rows
+            self.assertEqual(result['queries'], small['routes'][name]['queries'], name)
+        # The temporary staff user is gone again
+        self.assertFalse(get_user_model().objects.filter(username=SEED_USERNAME).exists())
+
+        flush_dataset(rebuild_search_index=False)
+        self.assertFalse(Contact.objects.exists())
+        self.assertFalse(Service.objects.exists())
+
+    def test_commands_refuse_to_run_without_debug(self):
+        for command in ['seed_benchmark_data', 'benchmark_api', 'benchmark_contact_archive']:
+            with self.assertRaisesMessage(CommandError, 'DEBUG is off'):
+                call_command(command, stdout=StringIO())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+@override_settings(SEARCH_INDEX_PATH='')
+class ContentImportTests(TestCase):
+    def import_lines(self, *records, batch_size=500):
+        stream = StringIO(''.join(json.dumps(record) + '\n' for record in records))
+        return import_ndjson(stream, batch_size=batch_size)
+
+    def test_upsert_with_slug_foreign_keys(self):
+        portfolio = {
+            'model': 'core.portfolio',
+            'fields': {
+                'title': 'Shop Rebuild', 'short_description': 'Short', 'challenge': 'C',
+                'solution': 'S', 'result': 'R', 'thumbnail': 'portfolio/thumbnails/shop.jpg',
+                'technologies': 'Django, React', 'project_date': '2025-01-01',
+            },
+        }
+        testimonial = {
+            'model': 'core.testimonial',
+            'fields': {
+                'client_name': 'Ann', 'client_position': 'CEO', 'client_company': 'Acme',
+                'review': 'Great', 'project': 'shop-rebuild',
+            },
+        }
+        other = {'model': 'core.testimonial', 'fields': {**testimonial['fields'], 'client_name': 'Bob'}}
+        # The testimonial batch fills up while the portfolio item it refers
+        # to is still pending; that one is written first
+        stats = self.import_lines(portfolio, testimonial, other, batch_size=2)
+        self.assertEqual(stats['core.portfolio']['created'], 1)
+        project = Portfolio.objects.get(slug='shop-rebuild')
+        self.assertEqual(project.technologies_list, ['Django', 'React'])
+        self.assertEqual(set(project.technology_tags.values_list('slug', flat=True)), {'django', 'react'})
+        self.assertEqual(Technology.objects.get(slug='django').portfolio_count, 1)
+        self.assertEqual(Testimonial.objects.get(client_name='Ann').project, project)
+        self.assertEqual(stats['core.testimonial']['created'], 2)
+
+        # Re-importing is a no-op; changed fields update in place
+        stats = self.import_lines(portfolio, testimonial)
+        self.assertEqual(stats['core.portfolio'], {'created': 0, 'updated': 0, 'unchanged': 1})
+        portfolio['fields']['technologies'] = 'Django'
+        stats = self.import_lines(portfolio)
+        self.assertEqual(stats['core.portfolio']['updated'], 1)
+        project.refresh_from_db()
+        self.assertEqual(list(project.technology_tags.values_list('slug', flat=True)), ['django'])
+        self.assertEqual(Portfolio.objects.count(), 1)
+
+        with self.assertRaises(ContentImportError):
+            self.import_lines({'model': 'core.testimonial', 'fields': {**testimonial['fields'], 'project': 'nope'}})
+
+    def test_export_round_trip(self):
+        make_service()
+        make_testimonial(project=make_portfolio(title='Shop'))
+        output = StringIO()
+        export_ndjson(output)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(records[-1]['fields']['project'], 'shop')
+        self.assertNotIn('technologies_list', records[0]['fields'])
+
+        Testimonial.objects.all().delete()
+        Portfolio.objects.all().delete()
+        stats = import_ndjson(StringIO(output.getvalue()))
+        self.assertEqual(stats['core.service']['unchanged'], 1)
+        self.assertEqual(Testimonial.objects.get().project.slug, 'shop')
+
+    def test_round_trip_keeps_foreign_keys_and_timestamps(self):
+        project = make_portfolio(title='Shop')
+        testimonial = make_testimonial(project=project)
+        job = JobOpening.objects.create(title='Engineer', description='D')
+        past = timezone.now() - timedelta(days=30)
+        Testimonial.objects.filter(pk=testimonial.pk).update(created_at=past, updated_at=past)
+        JobOpening.objects.filter(pk=job.pk).update(posted_at=past)
+        output = StringIO()
+        export_ndjson(output)
+        Testimonial.objects.all().delete()
+        JobOpening.objects.all().delete()
+        Portfolio.objects.all().delete()
+
+        import_ndjson(StringIO(output.getvalue()))
+        project = Portfolio.objects.get()
+        imported = Testimonial.objects.get()
+        self.assertEqual(imported.project_id, project.pk)
+        self.assertEqual((imported.created_at, imported.updated_at), (past, past))
+        self.assertEqual(JobOpening.objects.get().posted_at, past)
+        self.assertEqual(project.created_at, Portfolio.objects.get().created_at)
+
+    def test_fixture_foreign_keys_by_attname(self):
+        fixture = json.dumps([
+            {'model': 'core.portfolio', 'pk': 7, 'fields': {
+                'title': 'Shop', 'slug': 'shop', 'short_description': 'S', 'challenge': 'C',
+                'solution': 'S', 'result': 'R', 'thumbnail': 'portfolio/thumbnails/shop.jpg',
+                'technologies': 'Django', 'project_date': '2025-01-01',
+            }},
+            {'model': 'core.testimonial', 'pk': 3, 'fields': {
+                'client_name': 'Ann', 'client_position': 'CEO', 'client_company': 'Acme',
+                'review': 'Great', 'project_id': 7,
+                'created_at': '2024-06-01T10:00:00Z', 'updated_at': '2024-06-02T10:00:00Z',
+            }},
+        ])
+        import_ndjson(StringIO(fixture))
+        testimonial = Testimonial.objects.get()
+        self.assertEqual(testimonial.project.slug, 'shop')
+        self.assertEqual(testimonial.created_at.isoformat(), '2024-06-01T10:00:00+00:00')
+        self.assertEqual(testimonial.updated_at.isoformat(), '2024-06-02T10:00:00+00:00')
+
+        # In NDJSON the attname takes a pk of this database
+        record = {'model': 'core.testimonial', 'fields': {
+            'id': testimonial.pk, 'client_name': 'Ann', 'client_company': 'Acme', 'project_id': None,
+        }}
+        self.import_lines(record)
+        self.assertIsNone(Testimonial.objects.get().project)
+        record['fields']['project_id'] = 999
+        with self.assertRaisesMessage(ContentImportError, 'project_id'):
+            self.import_lines(record)
+
+    def test_rows_sharing_a_natural_key_are_matched_by_id(self):
+        project = make_portfolio(title='Shop')
+        first = make_testimonial(project=project, client_name='Ann', client_company='Acme', review='First')
+        second = make_testimonial(project=project, client_name='Ann', client_company='Acme', review='Second')
+        output = StringIO()
+        export_ndjson(output, labels={'core.testimonial'})
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([record['fields']['id'] for record in records], [first.pk, second.pk])
+
+        records[1]['fields']['review'] = 'Second, edited'
+        stats = self.import_lines(*records)
+        self.assertEqual(stats['core.testimonial'], {'created': 0, 'updated': 1, 'unchanged': 1})
+        self.assertEqual(Testimonial.objects.get(pk=first.pk).review, 'First')
+        self.assertEqual(Testimonial.objects.get(pk=second.pk).review, 'Second, edited')
+
+        # Without an id there is no telling which of the two is meant
+        del records[0]['fields']['id']
+        with self.assertRaisesMessage(ContentImportError, 'matches 2 rows'):
+            self.import_lines(records[0])
+        self.assertEqual(Testimonial.objects.get(pk=first.pk).review, 'First')
+
+
+@override_settings(CONTACT_RATE_LIMITS={'ip': '3/hour', 'email': '2/hour'})
+class ContactThrottleTests(TestCase):
+    def setUp(self):
+        get_throttle_cache().clear()
+        self.client = APIClient()
+
+    def submit(self, number, email='ana@example.com', ip='10.0.0.1'):
+        return self.client.post('/api/contact/', {
+            'name': 'Ana', 'email': email, 'subject': 'Hello',
+            'message': f'Message {number}', 'inquiry_type': 'general',
+        }, REMOTE_ADDR=ip)
+
+    def test_flood_from_one_address_is_throttled(self):
+        codes = [self.submit(i, email=f'user{i}@example.com').status_code for i in range(5)]
+        self.assertEqual(codes, [201, 201, 201, 429, 429])
+        with self.assertNumQueries(0):
+            response = self.submit(9, email='other@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Contact.objects.count(), 3)
+        # Other clients are unaffected
+        self.assertEqual(self.submit(10, email='new@example.com', ip='10.0.0.2').status_code, 201)
+
+    def test_email_is_limited_across_addresses(self):
+        codes = [self.submit(i, ip=f'10.0.0.{i + 1}').status_code for i in range(3)]
+        self.assertEqual(codes, [201, 201, 429])
+        self.assertEqual(self.submit(3, email='ANA@example.com ', ip='10.0.1.1').status_code, 429)
+
+    def test_duplicate_is_rejected_without_queries(self):
+        self.assertEqual(self.submit(1).status_code, 201)
+        with self.assertNumQueries(0):
+            response = self.client.post('/api/contact/', {
+                'name': 'Ana', 'email': 'Ana@Example.com', 'subject': 'hello',
+                'message': '  message   1 ', 'inquiry_type': 'general',
+            }, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_failed_submission_can_be_retried(self):
+        with mock.patch.object(views.ContactViewSet, 'perform_create', side_effect=DatabaseError('down')):
+            with self.assertRaises(DatabaseError):
+                self.submit(1)
+        self.assertEqual(Contact.objects.count(), 0)
+        self.assertEqual(self.submit(1).status_code, 201)
+
+
+class ContactStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_authenticate(admin)
+
+    def make_contact(self, day, inquiry_type='quote', status='new'):
+        contact = Contact.objects.create(
+            name='Ana', email='ana@example.com', subject='Hi', message='Hello',
+            inquiry_type=inquiry_type, status=status
+        )
+        Contact.objects.filter(pk=contact.pk).update(submitted_at=timezone.make_aware(datetime(2026, 10, day, 12)))
+        return contact
+
+    def counts(self):
+        return {
+            (stat.day.day, stat.inquiry_type, stat.status): stat.count
+            for stat in ContactDailyStat.objects.filter(count__gt=0)
+        }
+
+    def test_rollups_follow_saves_and_deletes(self):
+        contact = Contact.objects.create(
+            name='Ana', email='ana@example.com', subject='Hi', message='Hello', inquiry_type='quote'
+        )
+        today = timezone.localdate()
+        self.assertEqual(ContactDailyStat.objects.get().count, 1)
+
+        contact = Contact.objects.get(pk=contact.pk)
+        contact.status = 'responded'
+        contact.save()
+        self.assertEqual(
+            dict(ContactDailyStat.objects.filter(day=today).values_list('status', 'count')),
+            {'new': 0, 'responded': 1}
+        )
+        contact.admin_notes = 'Called back'
+        contact.save()
+        contact.delete()
+        self.assertFalse(ContactDailyStat.objects.filter(count__gt=0).exists())
+
+    def test_backfill_matches_contacts(self):
+        for day, inquiry_type, status in [(5, 'quote', 'new'), (5, 'quote', 'new'), (6, 'support', 'closed')]:
+            self.make_contact(day, inquiry_type, status)
+        ContactDailyStat.objects.all().delete()
+        call_command('backfill_contact_stats', stdout=StringIO())
+        self.assertEqual(self.counts(), {(5, 'quote', 'new'): 2, (6, 'support', 'closed'): 1})
+
+    def test_stats_endpoint(self):
+        for day, inquiry_type, status in [
+            (5, 'quote', 'new'), (6, 'quote', 'new'), (7, 'quote', 'closed'), (14, 'support', 'new'),
+        ]:
+            self.make_contact(day, inquiry_type, status)
+        ContactDailyStat.rebuild()
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/contact/stats/?start=2026-10-01&end=2026-10-31')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(data['by_inquiry_type'], {'consultation': 0, 'quote': 3, 'support': 1, 'general': 0})
+        self.assertEqual(data['by_status']['new'], 3)
+        # 2026-10-05 is a Monday
+        self.assertEqual(
+            [(row['period'], row['inquiry_type'], row['status'], row['count']) for row in data['series']],
+            [
+                ('2026-10-05', 'quote', 'closed', 1),
+                ('2026-10-05', 'quote', 'new', 2),
+                ('2026-10-12', 'support', 'new', 1),
+            ]
+        )
+
+        response = self.client.get(
+            '/api/contact/stats/?start=2026-10-06&end=2026-10-31&interval=month&inquiry_type=quote'
+        )
+        self.assertEqual(response.json()['series'], [
+            {'period': '2026-10-01', 'inquiry_type': 'quote', 'status': 'closed', 'count': 1},
+            {'period': '2026-10-01', 'inquiry_type': 'quote', 'status': 'new', 'count': 1},
+        ])
+        self.assertEqual(self.client.get('/api/contact/stats/?start=2026-11-01&end=2026-10-01').status_code, 400)
+
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get('/api/contact/stats/').status_code, (401, 403))
+
+
+@override_settings(CONTACT_ARCHIVE_AFTER_DAYS=365, CONTACT_ARCHIVE_STATUSES=['closed', 'responded'])
+class ContactArchiveTests(TestCase):
+    def make_contact(self, days_ago, status, email='ana@example.com'):
+        contact = Contact.objects.create(
+            name='Ana', email=email, subject='Website rebuild', message='Hello', status=status
+        )
+        Contact.objects.filter(pk=contact.pk).update(submitted_at=timezone.now() - timedelta(days=days_ago))
+        return Contact.objects.get(pk=contact.pk)
+
+    def test_old_closed_contacts_are_moved_in_batches(self):
+        old = [self.make_contact(400 + i, 'closed', email=f'old{i}@example.com') for i in range(5)]
+        responded = self.make_contact(500, 'responded')
+        kept = [self.make_contact(400, 'new'), self.make_contact(30, 'closed')]
+        ContactDailyStat.rebuild()
+        stats_before = self.stat_counts()
+
+        # Interrupted after one batch; the next run picks up the rest
+        self.assertEqual(archive_contacts(batch_size=2, max_batches=1), 2)
+        self.assertEqual(archive_contacts(batch_size=2), 4)
+        self.assertEqual(archive_contacts(batch_size=2), 0)
+
+        self.assertEqual(set(Contact.objects.values_list('pk', flat=True)), {contact.pk for contact in kept})
+        archived = ArchivedContact.objects.get(pk=old[0].pk)
+        self.assertEqual((archived.email, archived.submitted_at), (old[0].email, old[0].submitted_at))
+        self.assertEqual(ArchivedContact.objects.get(pk=responded.pk).status, 'responded')
+        # Archived submissions still count in the inbox stats
+        self.assertEqual(self.stat_counts(), stats_before)
+        ContactDailyStat.rebuild()
+        self.assertEqual(self.stat_counts(), stats_before)
+
+    def stat_counts(self):
+        return dict(ContactDailyStat.objects.values_list('status').annotate(total=Sum('count')))
+
+    def test_archive_endpoint(self):
+        self.make_contact(400, 'closed', email='ana@example.com')
+        self.make_contact(401, 'closed', email='bob@example.com')
+        call_command('archive_contacts', stdout=StringIO())
+
+        client = APIClient()
+        self.assertIn(client.get('/api/contact-archive/').status_code, (401, 403))
+        client.force_authenticate(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x'))
+        response = client.get('/api/contact-archive/?email=bob@example.com')
+        self.assertEqual([item['email'] for item in response.json()['results']], ['bob@example.com'])
+        response = client.get('/api/contact-archive/?search=bob&pagination=cursor')
+        self.assertEqual([item['email'] for item in response.json()['results']], ['bob@example.com'])
+        self.assertEqual(client.get('/api/contact/').json()['count'], 0)
+
+
+class LargeTableAdminTests(TestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(admin)
+
+    def test_bulk_status_action_updates_in_one_query(self):
+        contacts = [
+            Contact.objects.create(name=f'C{i}', email='c@example.com', subject='Hi', message='Hello')
+            for i in range(5)
+        ]
+        selected = [contact.pk for contact in contacts[:4]]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post('/admin/core/contact/', {
+                'action': 'mark_closed', '_selected_action': selected,
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            sum(query['sql'].startswith('UPDATE "core_contact"') for query in captured.captured_queries), 1
+        )
+        self.assertEqual(Contact.objects.filter(status='closed').count(), 4)
+        self.assertEqual(
+            dict(ContactDailyStat.objects.values_list('status', 'count')), {'new': 1, 'closed': 4}
+        )
+
+    def test_changelists_query_count_is_constant(self):
+        project = make_portfolio(title='Shop')
+        make_testimonial(project=project)
+        Contact.objects.create(name='Ana', email='ana@example.com', subject='Hi', message='Hello')
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/admin/core/testimonial/')
+            self.client.get('/admin/core/contact/?q=ana')
+        for i in range(10):
+            make_testimonial(client_name=f'Client {i}', project=make_portfolio(title=f'Project {i}'))
+            Contact.objects.create(name='Ana', email=f'ana{i}@example.com', subject='Hi', message='Hello')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/admin/core/testimonial/')
+            self.assertContains(response, 'Project 9')
+            self.client.get('/admin/core/contact/?q=ana')
+        self.assertEqual(len(large), len(small))
+
+    def test_estimated_count_paginator(self):
+        class Estimated(EstimatedCountPaginator):
+            def estimate_count(self):
+                return 250000
+
+        self.assertEqual(Estimated(Contact.objects.all(), 100).count, 250000)
+        self.assertEqual(EstimatedCountPaginator(Contact.objects.all(), 100).count, 0)
+
+
+@override_settings(CONTENT_ORDER_GAP=10)
+class ReorderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser('admin', 'admin@example.com', 'secret')
+        )
+        self.services = [make_service(title=f'Service {i}', order=0) for i in range(4)]
+
+    def titles(self):
+        return [item['title'] for item in self.client.get('/api/services/').json()['results']]
+
+    def test_full_ordering_is_one_update_and_one_invalidation(self):
+        self.titles()  # cached
+        ids = [service.pk for service in reversed(self.services)]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post('/api/services/reorder/', {'ids': ids}, format='json')
+        self.assertEqual(response.json(), {'updated': 4})
+        self.assertEqual(
+            sum(query['sql'].startswith('UPDATE "core_service"') for query in captured.captured_queries), 1
+        )
+        self.assertEqual(list(Service.objects.order_by('pk').values_list('order', flat=True)), [40, 30, 20, 10])
+        self.assertEqual(self.titles(), ['Service 3', 'Service 2', 'Service 1', 'Service 0'])
+
+        # Unchanged rows aren't written
+        self.assertEqual(apply_order(Service, ids), 0)
+
+    def test_move_changes_one_row_while_there_is_room(self):
+        apply_order(Service, [service.pk for service in self.services])
+        first, second, third, fourth = self.services
+        response = self.client.post(
+            '/api/services/reorder/', {'move': fourth.pk, 'after': first.pk}, format='json'
+        )
+        self.assertEqual(response.json(), {'updated': 1})
+        self.assertEqual(self.titles(), ['Service 0', 'Service 3', 'Service 1', 'Service 2'])
+        self.assertEqual(move(Service, third.pk, after=None), 1)
+        self.assertEqual(Service.objects.get(pk=third.pk).order, 0)
+
+        # No room between 10 and 11: everything is renumbered once
+        Service.objects.filter(pk=fourth.pk).update(order=11)
+        self.assertEqual(move(Service, second.pk, after=first.pk), 4)
+        self.assertEqual(list(Service.objects.values_list('order', flat=True)), [10, 20, 30, 40])
+        self.assertEqual(self.titles(), ['Service 2', 'Service 0', 'Service 1', 'Service 3'])
+
+    def test_invalid_requests(self):
+        partial = [service.pk for service in self.services[:3]]
+        for body in ({'ids': [1, 1]}, {'ids': [999]}, {'ids': partial}, {}, {'move': 999}):
+            response = self.client.post('/api/services/reorder/', body, format='json')
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/services/reorder/', {'ids': partial}, format='json')
+        self.assertEqual(response.json(), {'ids': f'Missing ids: {self.services[3].pk}'})
+        self.client.force_authenticate(None)
+        response = self.client.post('/api/services/reorder/', {'ids': [self.services[0].pk]}, format='json')
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_admin_move_to_top(self):
+        self.client.force_login(get_user_model().objects.get(username='admin'))
+        response = self.client.post('/admin/core/service/', {
+            'action': 'move_to_top', '_selected_action': [self.services[2].pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.titles()[0], 'Service 2')
@@ -0,0 +1,134 @@
+"""
+Abuse protection for the public contact form.
+
+ContactViewSet.create is guarded by two token buckets, one per client IP
+and one per email address, and by a short-lived fingerprint of every
+accepted submission so an identical message (a double click, a replayed
+request) is rejected instead of stored twice. Bucket state and
+fingerprints live in their own cache (CONTACT_THROTTLE_CACHE_ALIAS), which
+is shared between workers when REDIS_URL is set, and all three checks run
+before the serializer validates anything or the database is touched.
+
+A bucket holds up to N tokens for a rate of "N/period" and refills
+continuously at N per period, so a client can send a short burst and is
+then limited to the average rate. Reading and writing a bucket isn't
+atomic; under heavy concurrency a few requests more than the limit may
+get through, as with DRF's own throttles.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+from .cache import KEY_PREFIX
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_cache():
+    return caches[getattr(settings, 'CONTACT_THROTTLE_CACHE_ALIAS', 'default')]
+
+
+def parse_rate(rate):
+    """'5/hour' -> (5, 3600)"""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class TokenBucket:
+    def __init__(self, key, capacity, period, cache=None):
+        self.key = key
+        self.capacity = capacity
+        self.period = period
+        self.refill_rate = capacity / period
+        self.cache = cache or get_cache()
+
+    def consume(self):
+        """Take a token; returns (allowed, seconds until the next token)"""
+        now = time.time()
+        state = self.cache.get(self.key)
+        tokens, updated = state if state else (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+        if tokens < 1:
+            return False, (1 - tokens) / self.refill_rate
+        # Expires once the bucket would be full again
+        self.cache.set(self.key, (tokens - 1, now), self.period)
+        return True, None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """DRF throttle backed by a TokenBucket per get_bucket_id()"""
+    # Key of the rate in settings.CONTACT_RATE_LIMITS
+    scope = None
+
+    def get_bucket_id(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        rate = settings.CONTACT_RATE_LIMITS.get(self.scope)
+        bucket_id = self.get_bucket_id(request, view) if rate else None
+        if bucket_id is None:
+            return True
+        capacity, period = parse_rate(rate)
+        bucket = TokenBucket(f'{KEY_PREFIX}:throttle:{self.scope}:{bucket_id}', capacity, period)
+        allowed, self.wait_time = bucket.consume()
+        return allowed
+
+    def wait(self):
+        return self.wait_time
+
+
+class ContactIPThrottle(TokenBucketThrottle):
+    scope = 'ip'
+
+    def get_bucket_id(self, request, view):
+        # The client address, behind REST_FRAMEWORK['NUM_PROXIES'] proxies
+        return self.get_ident(request) or None
+
+
+def get_field(data, name):
+    value = data.get(name) if hasattr(data, 'get') else None
+    return value if isinstance(value, str) else ''
+
+
+def digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+class ContactEmailThrottle(TokenBucketThrottle):
+    scope = 'email'
+
+    def get_bucket_id(self, request, view):
+        email = get_field(request.data, 'email').strip().lower()
+        return digest(email) if email else None
+
+
+class DuplicateSubmission(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'This message has already been received.'
+    default_code = 'duplicate_submission'
+
+
+def submission_fingerprint(data):
+    """Hash of the sender and message, ignoring case and whitespace"""
+    parts = [' '.join(get_field(data, name).lower().split()) for name in ('email', 'subject', 'message')]
+    return f'{KEY_PREFIX}:contact:{digest(chr(0).join(parts))}'
+
+
+def is_duplicate(fingerprint):
+    return get_cache().get(fingerprint) is not None
+
+
+def remember_submission(fingerprint):
+    """Record an accepted submission; False if an identical one got there first"""
+    return get_cache().add(fingerprint, True, settings.CONTACT_DUPLICATE_WINDOW)
+
+
+def forget_submission(fingerprint):
+    """Undo remember_submission() for a submission that wasn't saved after all"""
+    get_cache().delete(fingerprint)
@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ServiceViewSet, PortfolioViewSet, TestimonialViewSet,
-    ContactViewSet, CompanyInfoViewSet, TeamMemberViewSet,
-    JobOpeningViewSet, BlogPostViewSet
+    ContactViewSet, ArchivedContactViewSet, CompanyInfoViewSet, TeamMemberViewSet,
+    JobOpeningViewSet, BlogPostViewSet, HomeView, SearchView, CacheStatsView,
+    MetricsView
 )
 
 router = DefaultRouter()
@@ -11,11 +13,20 @@ router.register(r'services', ServiceViewSet, basename='service')
 router.register(r'portfolio', PortfolioViewSet, basename='portfolio')
 router.register(r'testimonials', TestimonialViewSet, basename='testimonial')
 router.register(r'contact', ContactViewSet, basename='contact')
+router.register(r'contact-archive', ArchivedContactViewSet, basename='contact-archive')
 router.register(r'company-info', CompanyInfoViewSet, basename='company-info')
 router.register(r'team', TeamMemberViewSet, basename='team')
 router.register(r'jobs', JobOpeningViewSet, basename='job')
 router.register(r'posts', BlogPostViewSet, basename='post')
 
 urlpatterns = [
+    path('home/', HomeView.as_view(), name='home'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_READ_API:
+    # Serve the read-only endpoints from the async views (for ASGI servers)
+    urlpatterns = [path('', include('core.async_urls'))] + urlpatterns
@@ -1,79 +1,155 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from django.db.models import F, Prefetch, Sum, TextField, Value
+from django.db.models.functions import Coalesce, NullIf, Substr, TruncMonth, TruncWeek
+from django.http import HttpResponse
 from .models import Service, Portfolio, Testimonial, Contact, CompanyInfo, TeamMember
+from .models import ArchivedContact, ContactDailyStat
 from .serializers import (
-    ServiceSerializer, PortfolioSerializer, PortfolioListSerializer,
-    TestimonialSerializer, ContactSerializer, CompanyInfoSerializer, TeamMemberSerializer
+    ServiceSerializer, ServiceListSerializer, PortfolioSerializer, PortfolioListSerializer,
+    TestimonialSerializer, ContactSerializer, ContactStatsQuerySerializer, ArchivedContactSerializer,
+    CompanyInfoSerializer, TeamMemberSerializer
 )
 from .models import JobOpening, BlogPost
-from .serializers import JobOpeningSerializer, BlogPostSerializer
+from .serializers import (
+    EXCERPT_SOURCE_LENGTH, JobOpeningSerializer, JobOpeningListSerializer,
+    BlogPostSerializer, BlogPostListSerializer
+)
+from .cache import CachedResponseMixin, cache_response, get_stats
+from .conditional import Validators, make_etag
+from .fieldsets import SparseFieldsetMixin, is_field_selected
+from .filters import FullTextSearchFilter, TechnologyFacetMixin, TechnologyFilter
+from .metrics import PROMETHEUS_CONTENT_TYPE, registry
+from .ordering import ReorderMixin
+from .search import SOURCES_BY_TYPE, search_index
+from .throttling import (
+    ContactEmailThrottle, ContactIPThrottle, DuplicateSubmission, forget_submission, is_duplicate,
+    remember_submission, submission_fingerprint
+)
+from .pagination import KeysetOrPageNumberPagination
 
 
-class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
+class ServiceViewSet(
+    CachedResponseMixin, TechnologyFacetMixin, SparseFieldsetMixin, ReorderMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     API endpoint for services
     list: Get all active services
     retrieve: Get a specific service by slug or id
     """
-    queryset = Service.objects.filter(is_active=True)
+    queryset = Service.objects.filter(is_active=True).defer('search_vector')
     serializer_class = ServiceSerializer
     lookup_field = 'slug'
-    filter_backends = [SearchFilter, OrderingFilter]
+    filter_backends = [TechnologyFilter, OrderingFilter, FullTextSearchFilter]
     search_fields = ['title', 'short_description', 'technologies']
+    facet_count_field = 'service_count'
+    facet_related_name = 'services'
     ordering_fields = ['order', 'title', 'created_at']
     ordering = ['order']
+    # Large text columns the list serializer doesn't use
+    list_deferred_fields = ['full_description', 'process_steps', 'meta_description']
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.defer(*self.list_deferred_fields)
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ServiceListSerializer
+        return ServiceSerializer
 
 
-class PortfolioViewSet(viewsets.ReadOnlyModelViewSet):
+class PortfolioViewSet(
+    CachedResponseMixin, TechnologyFacetMixin, SparseFieldsetMixin, ReorderMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     API endpoint for portfolio items
     list: Get all active portfolio items
     retrieve: Get a specific portfolio item by slug or id
     featured: Get featured portfolio items for homepage
     """
-    queryset = Portfolio.objects.filter(is_active=True)
+    queryset = Portfolio.objects.filter(is_active=True).defer('search_vector')
+    featured_serializer_class = PortfolioListSerializer
+    cache_models = [Portfolio, Testimonial]
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ['-featured', 'order', '-project_date', 'id']
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, TechnologyFilter, OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['status', 'featured']
     search_fields = ['title', 'client_company', 'technologies', 'short_description']
+    facet_count_field = 'portfolio_count'
+    facet_related_name = 'portfolio_items'
     ordering_fields = ['project_date', 'order']
     ordering = ['-featured', 'order', '-project_date']
+    list_deferred_fields = ['challenge', 'solution', 'result']
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.defer(*self.list_deferred_fields)
+        if self.action == 'retrieve' and is_field_selected(self.request, 'testimonials'):
+            # Load active testimonials (and their project) in one extra query
+            # instead of one per portfolio item; see PortfolioSerializer.
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'testimonials',
+                    queryset=Testimonial.objects.filter(is_active=True).select_related('project'),
+                    to_attr='active_testimonials'
+                )
+            )
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
             return PortfolioListSerializer
         return PortfolioSerializer
     
+    def get_featured_queryset(self):
+        return self.queryset.filter(featured=True)[:6]
+    
     @action(detail=False, methods=['get'])
+    @cache_response
     def featured(self, request):
         """Get featured portfolio items for homepage"""
-        featured_items = self.queryset.filter(featured=True)[:6]
-        serializer = PortfolioListSerializer(featured_items, many=True)
+        serializer = self.featured_serializer_class(self.get_featured_queryset(), many=True)
         return Response(serializer.data)
 
 
-class TestimonialViewSet(viewsets.ReadOnlyModelViewSet):
+class TestimonialViewSet(
+    CachedResponseMixin, SparseFieldsetMixin, ReorderMixin, viewsets.ReadOnlyModelViewSet
+):
     """
     API endpoint for testimonials
     list: Get all active testimonials
     retrieve: Get a specific testimonial
     featured: Get featured testimonials for homepage
     """
-    queryset = Testimonial.objects.filter(is_active=True)
+    queryset = Testimonial.objects.filter(is_active=True).select_related('project')
     serializer_class = TestimonialSerializer
+    featured_serializer_class = TestimonialSerializer
+    cache_models = [Testimonial, Portfolio]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['rating', 'featured', 'source']
     ordering_fields = ['rating', 'created_at', 'order']
     ordering = ['-featured', 'order', '-created_at']
     
+    def get_featured_queryset(self):
+        return self.queryset.filter(featured=True)[:6]
+    
     @action(detail=False, methods=['get'])
+    @cache_response
     def featured(self, request):
         """Get featured testimonials for homepage"""
-        featured_testimonials = self.queryset.filter(featured=True)[:6]
-        serializer = self.serializer_class(featured_testimonials, many=True)
+        serializer = self.featured_serializer_class(self.get_featured_queryset(), many=True)
         return Response(serializer.data)
 
 
@@ -85,16 +161,35 @@ class ContactViewSet(viewsets.ModelViewSet):
     """
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ['-submitted_at', '-id']
     
     def get_queryset(self):
         # In production, add authentication check here
         # For now, return all for admin access
         return self.queryset
     
+    def get_throttles(self):
+        if self.action == 'create':
+            return [ContactIPThrottle(), ContactEmailThrottle()]
+        return super().get_throttles()
+    
     def create(self, request, *args, **kwargs):
+        # Checked before validation, so a repeated message costs no queries
+        fingerprint = submission_fingerprint(request.data)
+        if is_duplicate(fingerprint):
+            raise DuplicateSubmission()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        if not remember_submission(fingerprint):
+            # An identical request was accepted in the meantime
+            raise DuplicateSubmission()
+        try:
+            self.perform_create(serializer)
+        except Exception:
+            # Nothing was saved, so a retry isn't a duplicate
+            forget_submission(fingerprint)
+            raise
         
         return Response(
             {
@@ -103,6 +198,60 @@ class ContactViewSet(viewsets.ModelViewSet):
             },
             status=status.HTTP_201_CREATED
         )
+    
+    @action(detail=False, permission_classes=[IsAdminUser], pagination_class=None)
+    def stats(self, request):
+        """
+        Submissions per day/week/month, inquiry type and status, from the
+        daily rollups in ContactDailyStat.
+        Query params: start, end (dates; default the last 90 days),
+        interval (day, week or month; default week), inquiry_type, status
+        """
+        params = ContactStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        rollups = ContactDailyStat.objects.filter(day__range=(query['start'], query['end']))
+        for name in ('inquiry_type', 'status'):
+            if name in query:
+                rollups = rollups.filter(**{name: query[name]})
+        period = {'day': F('day'), 'week': TruncWeek('day'), 'month': TruncMonth('day')}[query['interval']]
+        rows = (
+            rollups.order_by().values('inquiry_type', 'status', period=period)
+            .annotate(count=Sum('count')).filter(count__gt=0)
+            .order_by('period', 'inquiry_type', 'status')
+        )
+        
+        series = list(rows)
+        by_inquiry_type = dict.fromkeys((choice for choice, label in Contact.INQUIRY_TYPE), 0)
+        by_status = dict.fromkeys((choice for choice, label in Contact.STATUS_CHOICES), 0)
+        for row in series:
+            by_inquiry_type[row['inquiry_type']] = by_inquiry_type.get(row['inquiry_type'], 0) + row['count']
+            by_status[row['status']] = by_status.get(row['status'], 0) + row['count']
+        return Response({
+            'start': query['start'],
+            'end': query['end'],
+            'interval': query['interval'],
+            'total': sum(by_status.values()),
+            'by_inquiry_type': by_inquiry_type,
+            'by_status': by_status,
+            'series': series,
+        })
+
+
+class ArchivedContactViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for archived contact submissions (admin only)
+    list: Search with ?search=, filter by email, inquiry_type and status
+    """
+    queryset = ArchivedContact.objects.all()
+    serializer_class = ArchivedContactSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ['-submitted_at', '-id']
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
+    filterset_fields = ['email', 'inquiry_type', 'status']
+    search_fields = ['name', 'email', 'company', 'subject', 'message']
+    ordering_fields = ['submitted_at']
 
 
 class CompanyInfoViewSet(viewsets.ReadOnlyModelViewSet):
@@ -112,14 +261,23 @@ class CompanyInfoViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = CompanyInfo.objects.all()
     serializer_class = CompanyInfoSerializer
     
+    def get_validators(self, request, data):
+        # CompanyInfo.load() serves a snapshot without touching the
+        # database, and so must the ETag: it hashes the payload itself
+        # rather than the cache versions the other endpoints use
+        return Validators(make_etag(self.basename, request.get_full_path(), data))
+    
     def list(self, request, *args, **kwargs):
         """Return the singleton company info"""
         company_info = CompanyInfo.load()
-        serializer = self.serializer_class(company_info)
-        return Response(serializer.data)
+        data = self.get_serializer(company_info).data
+        validators = self.get_validators(request, data)
+        return validators.not_modified(request) or validators.apply(Response(data))
 
 
-class TeamMemberViewSet(viewsets.ReadOnlyModelViewSet):
+class TeamMemberViewSet(
+    CachedResponseMixin, SparseFieldsetMixin, ReorderMixin, viewsets.ReadOnlyModelViewSet
+):
     """
     API endpoint for team members
     """
@@ -128,19 +286,141 @@ class TeamMemberViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ['order', 'name']
 
 
-class JobOpeningViewSet(viewsets.ReadOnlyModelViewSet):
+class JobOpeningViewSet(CachedResponseMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoint for job openings"""
     queryset = JobOpening.objects.filter(is_active=True)
     serializer_class = JobOpeningSerializer
     lookup_field = 'slug'
+    timestamp_field = 'posted_at'
     ordering = ['-posted_at']
+    list_deferred_fields = ['description', 'requirements', 'benefits', 'requirements_list', 'benefits_list']
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Only the start of the description is read, for the excerpt
+            queryset = queryset.defer(*self.list_deferred_fields).annotate(
+                excerpt=Substr('description', 1, EXCERPT_SOURCE_LENGTH + 1)
+            )
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return JobOpeningListSerializer
+        return JobOpeningSerializer
 
 
-class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
+class BlogPostViewSet(CachedResponseMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoint for blog posts"""
-    queryset = BlogPost.objects.filter(is_published=True)
+    queryset = BlogPost.objects.filter(is_published=True).defer('search_vector')
     serializer_class = BlogPostSerializer
     lookup_field = 'slug'
-    filter_backends = [SearchFilter, OrderingFilter]
+    timestamp_field = 'published_at'
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ['-published_at', '-id']
+    filter_backends = [OrderingFilter, FullTextSearchFilter]
     search_fields = ['title', 'excerpt', 'content', 'category']
     ordering_fields = ['published_at']
+    list_deferred_fields = ['content']
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Posts without an excerpt fall back to the start of the content
+            queryset = queryset.defer(*self.list_deferred_fields).annotate(
+                summary=Coalesce(
+                    NullIf(F('excerpt'), Value('')),
+                    Substr('content', 1, EXCERPT_SOURCE_LENGTH + 1),
+                    output_field=TextField()
+                )
+            )
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return BlogPostListSerializer
+        return BlogPostSerializer
+
+
+class HomeView(APIView):
+    """
+    API endpoint for the homepage
+    Returns company info, services, featured portfolio items and featured
+    testimonials in one payload, using one query per section.
+    """
+    basename = 'home'
+    cache_models = [CompanyInfo, Service, Portfolio, Testimonial]
+
+    def get_cache_models(self):
+        return self.cache_models
+
+    def get_validators(self, request, *versions):
+        # Every section is covered by the cache versions, so they alone are
+        # a sufficient validator and no query is needed.
+        return Validators(make_etag(self.basename, request.get_full_path(), *versions))
+
+    def get_section_querysets(self):
+        return {
+            'services': Service.objects.filter(is_active=True).defer(
+                'search_vector', *ServiceViewSet.list_deferred_fields
+            ),
+            'featured_portfolio': Portfolio.objects.filter(is_active=True, featured=True)[:6],
+            'featured_testimonials': (
+                Testimonial.objects.filter(is_active=True, featured=True)
+                .select_related('project')[:6]
+            ),
+        }
+
+    def serialize(self, request, company_info, sections):
+        context = {'request': request}
+        return {
+            'company_info': CompanyInfoSerializer(company_info).data,
+            'services': ServiceListSerializer(sections['services'], many=True, context=context).data,
+            'featured_portfolio': PortfolioListSerializer(sections['featured_portfolio'], many=True).data,
+            'featured_testimonials': TestimonialSerializer(
+                sections['featured_testimonials'], many=True
+            ).data,
+        }
+
+    @cache_response
+    def get(self, request):
+        return Response(self.serialize(request, CompanyInfo.load(), self.get_section_querysets()))
+
+
+class SearchView(APIView):
+    """
+    API endpoint for searching services, portfolio items, blog posts and
+    job openings at once
+    Query params: q (required), type (repeatable), limit (default 20)
+    """
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        types = [t for t in request.query_params.getlist('type') if t in SOURCES_BY_TYPE]
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            limit = 20
+        results = search_index.search(query, types=types, limit=max(limit, 1)) if query else []
+        return Response({
+            'query': query,
+            'count': len(results),
+            'results': results,
+        })
+
+
+class CacheStatsView(APIView):
+    """Response cache hit/miss counters (admin only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class MetricsView(APIView):
+    """Per-route request metrics in the Prometheus text format (admin only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -32,6 +32,16 @@ const api = axios.create({
   },
 });
 
+// Homepage API (company info, services, featured portfolio & testimonials)
+export const homeAPI = {
+  get: () => api.get('/home/'),
+};
+
+// Site-wide search API
+export const searchAPI = {
+  search: (q, params) => api.get('/search/', { params: { q, ...params } }),
+};
+
 // Services API
 export const servicesAPI = {
   getAll: () => api.get('/services/'),